@@ -35,10 +35,130 @@ class Settings(BaseSettings):
     
     # AI Settings
     OLLAMA_API_URL: str = "http://localhost:11434"
+    # Optional pool of model servers, e.g. '["http://box-a:11434", "http://box-b:11434"]';
+    # falls back to OLLAMA_API_URL when empty
+    OLLAMA_API_URLS: List[str] = []
+    OLLAMA_HEALTH_CHECK_INTERVAL: float = 15.0  # Seconds between /api/tags probes
+    OLLAMA_EJECT_AFTER_FAILURES: int = 3  # Consecutive failures before a backend is ejected
+    OLLAMA_MODEL: str = "gemma3n:e2b"
+    OLLAMA_STRUCTURED_OUTPUT: bool = True  # Send JSON schemas as "format"; False sends plain "json"
+    OLLAMA_POOL_LIMIT: int = 32  # Total pooled connections to the model server(s)
+    OLLAMA_POOL_LIMIT_PER_HOST: int = 8
+    OLLAMA_KEEPALIVE_TIMEOUT: float = 60.0  # Seconds an idle connection is kept open
+    OLLAMA_CONNECT_TIMEOUT: float = 10.0
+
+    # Model residency: warm-up, keep_alive and idle unloading of secondary models
+    OLLAMA_WARMUP_ON_STARTUP: bool = True
+    OLLAMA_WARMUP_MODELS: List[str] = []  # Defaults to [OLLAMA_MODEL]
+    OLLAMA_KEEP_ALIVE: str = "30m"  # keep_alive for OLLAMA_MODEL; "-1m" (or "-1") pins it in memory
+    OLLAMA_SECONDARY_KEEP_ALIVE: str = "5m"  # keep_alive for every other model
+    OLLAMA_SECONDARY_IDLE_UNLOAD_SECONDS: float = 120.0  # Idle time before a secondary model is unloaded
+
     AI_MODEL_PATH: str = "./models/gemma_2b_quantized.tflite"
     AI_MAX_TOKENS: int = 512
     AI_TEMPERATURE: float = 0.7
-    
+
+    # AI response cache (in-memory LRU in front of a SQLite store)
+    AI_CACHE_ENABLED: bool = True
+    AI_CACHE_DB_PATH: str = "./data/ai_response_cache.db"
+    AI_CACHE_MEMORY_ENTRIES: int = 256
+    AI_CACHE_TTL_SECONDS: int = 60 * 60 * 24 * 7  # 7 days
+    AI_CACHE_MAX_ROWS: int = 5000
+
+    # LLM admission control: concurrency cap, per-priority queue bounds and deadlines
+    LLM_MAX_CONCURRENCY: int = 1  # Generations run at once, summed over all backends
+    LLM_QUEUE_LIMIT_INTERACTIVE: int = 30
+    LLM_QUEUE_LIMIT_TASK: int = 30
+    LLM_QUEUE_LIMIT_BACKGROUND: int = 100
+    LLM_QUEUE_TIMEOUT_INTERACTIVE: float = 20.0  # Seconds a call may wait in the queue
+    LLM_QUEUE_TIMEOUT_TASK: float = 30.0
+    LLM_QUEUE_TIMEOUT_BACKGROUND: float = 600.0
+
+    # Load-adaptive degradation: compact prompt -> lower num_predict -> small model -> fallback
+    LLM_DEGRADE_ENABLED: bool = True
+    LLM_DEGRADE_QUEUE_THRESHOLDS: List[int] = [2, 4, 8, 16]  # Queued foreground calls that enable each step
+    LLM_DEGRADE_SLOWDOWN_THRESHOLDS: List[float] = [1.5, 2.0, 3.0, 4.0]  # p95 of latency / call site median that enable each step
+    LLM_DEGRADE_WINDOW_SECONDS: float = 60.0  # Latency samples considered for the percentiles
+    LLM_DEGRADE_BASELINE_SAMPLES: int = 200  # Successful calls per call site the median baseline is taken over
+    LLM_DEGRADE_NUM_PREDICT: int = 160  # Token cap from the second step on
+    LLM_SMALL_MODEL: str = ""  # Model used from the third step on; empty keeps OLLAMA_MODEL
+
+    # Hedged interactive requests: a second backend gets a copy when the first token is late
+    LLM_HEDGE_ENABLED: bool = True
+    LLM_HEDGE_PERCENTILE: float = 90.0  # Time-to-first-token percentile used as the hedge delay
+    LLM_HEDGE_MIN_DELAY: float = 0.5
+    LLM_HEDGE_MAX_DELAY: float = 8.0  # Also used until enough samples were seen
+    LLM_HEDGE_MAX_RATIO: float = 0.1  # Hedges allowed per request
+
+    # Request deadlines (a client's X-Request-Timeout header can only shorten them)
+    REQUEST_DEADLINE_TASK_SECONDS: float = 120.0
+    REQUEST_DEADLINE_VOICE_SECONDS: float = 60.0
+    REQUEST_DEADLINE_CHAT_SECONDS: float = 60.0
+    DISCONNECT_POLL_INTERVAL: float = 0.5  # Seconds between client disconnect checks
+
+    # Circuit breaker around the model server(s)
+    LLM_BREAKER_WINDOW: int = 20  # Recent calls considered for the failure rate
+    LLM_BREAKER_FAILURE_RATE: float = 0.5  # Failure share that opens the circuit
+    LLM_BREAKER_MIN_CALLS: int = 5  # Calls needed in the window before it can open
+    LLM_BREAKER_OPEN_SECONDS: float = 30.0  # Time before a half-open probe is allowed
+
+    # Batch task generation across many lessons
+    BATCH_GENERATION_CONCURRENCY: int = 2  # Lessons generated in parallel per batch
+    BATCH_GENERATION_MAX_LESSONS: int = 200
+    BATCH_GENERATION_KEEP_JOBS: int = 50  # Finished jobs kept for progress polling
+    MULTI_TASK_MAX_COUNT: int = 10  # Tasks one model call may generate for a lesson
+
+    # Background pre-generation of AI tasks per lesson/grade
+    TASK_POOL_ENABLED: bool = True
+    TASK_POOL_DEPTH: int = 3  # Ready tasks kept per lesson/grade
+    TASK_POOL_REFILL_CONCURRENCY: int = 1  # Parallel background generations
+    TASK_POOL_IDLE_SECONDS: float = 5.0  # Quiet time before background work runs
+
+    # Lesson chunk retrieval: prompts carry only the lesson chunks relevant to the question
+    LESSON_CHUNK_WORDS: int = 60  # Target chunk size, whole sentences are never split
+    LESSON_CONTEXT_TOP_K: int = 4  # Most relevant chunks considered per prompt
+    LESSON_CONTEXT_TOKEN_BUDGET: int = 300  # Approximate prompt tokens spent on lesson text
+
+    # Background lesson summaries, used as the default lesson context of prompts
+    LESSON_SUMMARY_ENABLED: bool = True
+    LESSON_SUMMARY_MAX_WORDS: int = 80
+    LESSON_SUMMARY_MAX_TERMS: int = 8
+    LESSON_SUMMARY_INTERVAL_SECONDS: float = 300.0  # How often lessons are checked for new revisions
+    LESSON_SUMMARY_IDLE_SECONDS: float = 5.0  # Quiet time before a summary is generated
+
+    # Multi-turn tutoring chat; sessions live in memory and reuse Ollama's context between turns
+    TUTOR_SESSION_TTL_SECONDS: float = 30 * 60  # Idle time before a session expires
+    TUTOR_MAX_SESSIONS: int = 200  # Least recently used sessions are dropped beyond this
+    TUTOR_MAX_CONTEXT_TOKENS: int = 2048  # Longer contexts are dropped and rebuilt from recent turns
+    TUTOR_HISTORY_TURNS: int = 6  # Turns re-sent as text when the context is rebuilt
+
+    # Speech-to-text: "google" (online), "vosk" (offline, CPU) or "stub" (fixed text, for tests)
+    STT_ENGINE: str = "google"
+    STT_LANGUAGE: str = "en-US"
+    STT_VOSK_MODEL_PATH: str = "./models/vosk-model-small-en-us-0.15"  # Loaded once at startup
+    STT_WORKERS: int = 2  # Recognitions run at once
+    STT_STUB_TEXT: str = "What do plants need to grow?"
+
+    # Audio decoding/resampling in a bounded process pool, off the event loop
+    AUDIO_DECODE_WORKERS: int = 2
+    AUDIO_DECODE_MAX_PENDING: int = 8  # Decodes running or queued before uploads get a 503
+
+    # Streaming voice Q&A over WebSocket; energy VAD on 16 kHz PCM finds the end of speech
+    VOICE_STREAM_VAD_THRESHOLD: float = 500.0  # Minimum frame RMS (16-bit) counted as speech
+    VOICE_STREAM_VAD_NOISE_RATIO: float = 3.0  # Speech must also be this many times the noise floor
+    VOICE_STREAM_MIN_SPEECH_MS: int = 200  # Speech needed before an utterance starts
+    VOICE_STREAM_END_SILENCE_MS: int = 700  # Silence that ends an utterance
+    VOICE_STREAM_MAX_SECONDS: float = 30.0  # Longer utterances are cut and answered
+
+    # Text-to-speech (gTTS) and the cache of synthesized clips, a memory LRU over files on disk
+    TTS_LANGUAGE: str = "en"
+    TTS_VOICE: str = "com"  # gTTS accent, the Google Translate domain (e.g. "co.uk", "com.au")
+    TTS_CACHE_ENABLED: bool = True
+    TTS_CACHE_DIR: str = "./data/tts_cache"
+    TTS_CACHE_MEMORY_MB: int = 32
+    TTS_CACHE_DISK_MB: int = 512  # Least recently used clips are deleted beyond this
+    TTS_PRESYNTHESIZE_ON_STARTUP: bool = True  # Synthesize the fixed answers and errors in the background
+
     # File uploads
     UPLOAD_DIR: str = "./uploads"
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
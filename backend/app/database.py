@@ -62,9 +62,13 @@ async def get_async_db():
 
 # Initialize database
 async def init_db():
-    """Initialize database tables"""
+    """Initialize database tables, including tables added since the database was created"""
+    # Declared on the Base in app.base, not the one above
+    from .models import LessonSummary
+
     async with async_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(LessonSummary.__table__.create, checkfirst=True)
 
 # Close database connections
 async def close_db():
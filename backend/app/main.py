@@ -12,9 +12,21 @@ from contextlib import asynccontextmanager
 
 from .database import init_db, close_db, get_async_db
 from .models import User, UserPoints
-from .routers import auth, parent, task, lesson, notification, chat_message, voice_qna, user_progress, dashboard
+from .routers import auth, parent, task, lesson, notification, chat_message, voice_qna, user_progress, dashboard, ai_status, tutor
 from .core.config import settings
-from .services.ai_service_bkp import AIService
+from .services.ai_service import AIService
+from .services.audio_decode import AudioDecodePool
+from .services.llm_scheduler import LLMScheduler
+from .services.model_residency import ModelResidencyManager
+from .services.ollama_client import OllamaClient
+from .services.batch_generation import BatchTaskGenerator
+from .services.lesson_summary import LessonSummaryJob
+from .services.response_cache import ResponseCache
+from .services.stt import STTRunner
+from .services.tts_cache import TTSCache
+from .services.task_pool import TaskPregenerationPool
+from .services.tutor_chat import TutorChatService
+from .services.voice_qna_service import VoiceQnAService
 
 
 
@@ -29,8 +41,56 @@ async def lifespan(app: FastAPI):
     # Initialize Database
     await init_db()
     
-    # Initialize AI Service
-    app.state.ai_service = AIService()
+    # Initialize the shared, connection-pooled Ollama client behind the LLM
+    # scheduler, and the AI Service
+    app.state.llm_scheduler = LLMScheduler()
+    app.state.ollama_client = OllamaClient(scheduler=app.state.llm_scheduler)
+    await app.state.ollama_client.start()
+
+    # Warm the model(s) in the background and unload idle secondary models
+    app.state.model_residency = ModelResidencyManager(app.state.ollama_client)
+    app.state.ollama_client.residency = app.state.model_residency
+    await app.state.model_residency.start(warmup=settings.OLLAMA_WARMUP_ON_STARTUP)
+
+    app.state.response_cache = ResponseCache() if settings.AI_CACHE_ENABLED else None
+    app.state.ai_service = AIService(
+        client=app.state.ollama_client,
+        cache=app.state.response_cache
+    )
+
+    app.state.batch_generator = BatchTaskGenerator(app.state.ai_service)
+    app.state.tutor_chat = TutorChatService(app.state.ollama_client)
+
+    # Voice Q&A decodes uploads in a bounded process pool, recognizes
+    # speech with the engine from STT_ENGINE, its model loaded once here,
+    # and caches synthesized answers; the fixed phrases are synthesized now
+    app.state.audio_decoder = AudioDecodePool()
+    app.state.audio_decoder.start()
+    app.state.stt = STTRunner()
+    await app.state.stt.start()
+    app.state.tts_cache = None
+    if settings.TTS_CACHE_ENABLED:
+        app.state.tts_cache = TTSCache()
+        await app.state.tts_cache.start()
+    app.state.voice_qna = VoiceQnAService(
+        client=app.state.ollama_client,
+        decoder=app.state.audio_decoder,
+        stt=app.state.stt,
+        tts_cache=app.state.tts_cache
+    )
+    await app.state.voice_qna.start()
+
+    # Summarize new and changed lessons in the background
+    app.state.lesson_summaries = None
+    if settings.LESSON_SUMMARY_ENABLED:
+        app.state.lesson_summaries = LessonSummaryJob(app.state.ai_service)
+        await app.state.lesson_summaries.start()
+
+    # Start the background pool of pre-generated lesson tasks
+    app.state.task_pool = None
+    if settings.TASK_POOL_ENABLED:
+        app.state.task_pool = TaskPregenerationPool(app.state.ai_service)
+        await app.state.task_pool.start()
     
     # Initialize Redis Connection using REDIS_URL from settings
     # try:
@@ -54,6 +114,18 @@ async def lifespan(app: FastAPI):
     # if hasattr(app.state, 'redis_client') and app.state.redis_client:
     #     await app.state.redis_client.close()
     #     print("INFO:     Redis connection closed.")
+    if app.state.task_pool is not None:
+        await app.state.task_pool.stop()
+    await app.state.batch_generator.stop()
+    if app.state.lesson_summaries is not None:
+        await app.state.lesson_summaries.stop()
+    await app.state.voice_qna.stop()
+    app.state.audio_decoder.close()
+    app.state.stt.close()
+    await app.state.model_residency.stop()
+    await app.state.ollama_client.close()
+    if app.state.response_cache is not None:
+        app.state.response_cache.close()
     await close_db()
 
 
@@ -82,8 +154,10 @@ app.include_router(lesson.router, prefix="/api", tags=["Lessons"])
 app.include_router(notification.router, prefix="/api/notifications", tags=["Notifications"])
 app.include_router(chat_message.router, prefix="/api/chat_messages", tags=["ChatMessages"])
 app.include_router(voice_qna.router, prefix="/api", tags=["Voice Q&A"])
+app.include_router(tutor.router, prefix="/api/tutor", tags=["Tutor"])
 app.include_router(user_progress.router, prefix="/api/progress", tags=["Progress"])
 app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"])
+app.include_router(ai_status.router, prefix="/api/ai", tags=["AI"])
 
 # --- Root and Health Check Endpoints ---
 @app.get("/")
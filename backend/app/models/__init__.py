@@ -2,6 +2,7 @@
 from .achievement import Achievement
 from .content import Content
 from .lesson import Lesson
+from .lesson_summary import LessonSummary
 from .parent_child import ParentChild
 from .task import Task
 from .token_blacklist import TokenBlacklist
@@ -16,6 +17,7 @@ __all__ = [
     "Achievement",
     "Content",
     "Lesson",
+    "LessonSummary",
     "ParentChild",
     "Task",
     "TokenBlacklist",
@@ -10,4 +10,5 @@ class Lesson(Base):
     grade = Column(Integer, index=True)
     title = Column(String, index=True)
     content = Column(Text)
-    tasks = relationship("Task", back_populates="lesson")
\ No newline at end of file
+    tasks = relationship("Task", back_populates="lesson")
+    summary = relationship("LessonSummary", back_populates="lesson", uselist=False, cascade="all, delete-orphan")
\ No newline at end of file
@@ -0,0 +1,27 @@
+# File: backend/app/models/lesson_summary.py
+
+import datetime
+import json
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from ..base import Base
+
+class LessonSummary(Base):
+    __tablename__ = "lesson_summaries"
+
+    lesson_id    = Column(Integer, ForeignKey("lessons.id"), primary_key=True)
+    content_hash = Column(String(64), nullable=False)  # Lesson revision the summary was made from
+    summary      = Column(Text, nullable=False)
+    key_terms    = Column(Text, nullable=False, default="[]")  # JSON list of strings
+    model        = Column(String)
+    updated_at   = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+    lesson = relationship("Lesson", back_populates="summary")
+
+    @property
+    def terms(self):
+        try:
+            return json.loads(self.key_terms or "[]")
+        except ValueError:
+            return []
@@ -0,0 +1,35 @@
+# File: backend/app/routers/ai_status.py
+
+from fastapi import APIRouter, Request
+
+from app.services.lesson_index import lesson_index
+
+router = APIRouter()
+
+@router.get("/metrics")
+async def get_ai_metrics(request: Request):
+    """Runtime metrics of the shared AI components (connection pool, caches, models)."""
+    state = request.app.state
+    cache = getattr(state, "response_cache", None)
+    task_pool = getattr(state, "task_pool", None)
+    lesson_summaries = getattr(state, "lesson_summaries", None)
+    tts_cache = getattr(state, "tts_cache", None)
+    return {
+        "ollama_client": state.ollama_client.stats(),
+        "llm_scheduler": state.llm_scheduler.stats(),
+        "llm_telemetry": state.ollama_client.telemetry.stats(),
+        "model_residency": state.model_residency.stats(),
+        "response_cache": cache.stats() if cache is not None else None,
+        "task_pool": task_pool.stats() if task_pool is not None else None,
+        "lesson_index": lesson_index.stats(),
+        "lesson_summaries": lesson_summaries.stats() if lesson_summaries is not None else None,
+        "tutor_chat": state.tutor_chat.stats(),
+        "audio_decode": state.audio_decoder.stats(),
+        "stt": state.stt.stats(),
+        "tts_cache": tts_cache.stats() if tts_cache is not None else None,
+    }
+
+@router.get("/degradation")
+async def get_degradation_status(request: Request):
+    """Current step of the load-adaptive degradation ladder, its signals and thresholds."""
+    return request.app.state.ollama_client.degradation.stats()
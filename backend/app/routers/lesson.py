@@ -1,14 +1,22 @@
 # File: backend/app/routers/lesson.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, List, Optional
+import json
 
-from app.database import get_db
+from app.database import get_db, SessionLocal
 from app.models.lesson import Lesson
 from app.models.task import Task
-from app.schemas.task import TaskOut
+from app.schemas.task import TaskOut, BatchTaskGenerationRequest, BatchTaskGenerationStatus
+from app.core.config import settings
 from app.services.ai_service import AIService
+from app.services.batch_generation import BatchTaskGenerator
+from app.services.lesson_index import lesson_index
+from app.services.task_pool import TaskPregenerationPool
+from app.utils.cancellation import request_deadline, run_until_disconnect
+from app.utils.dependencies import get_ai_service, get_task_pool, get_batch_generator
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,8 +24,20 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.post("/lessons/{lesson_id}/generate-task", response_model=TaskOut)
-async def generate_task_for_lesson(lesson_id: int, db: Session = Depends(get_db)):
-    """Generate an AI-powered task for a specific lesson."""
+async def generate_task_for_lesson(
+    lesson_id: int,
+    request: Request,
+    fresh: bool = False,
+    db: Session = Depends(get_db),
+    ai_service: AIService = Depends(get_ai_service),
+    task_pool: Optional[TaskPregenerationPool] = Depends(get_task_pool)
+):
+    """Generate an AI-powered task for a specific lesson.
+
+    A pre-generated task is served from the background pool when one is ready.
+    Pass ``fresh=true`` to skip the pool and response cache and ask the model
+    for a new task. Generation is cancelled if the client disconnects.
+    """
     
     # Get the lesson first
     lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
@@ -25,20 +45,28 @@ async def generate_task_for_lesson(lesson_id: int, db: Session = Depends(get_db)
         raise HTTPException(status_code=404, detail="Lesson not found")
 
     try:
-        # Initialize AI service
-        ai_service = AIService()
-        
-        # Prepare lesson content for AI
-        lesson_text = lesson.content or lesson.title or "General learning activity"
+        # Prepare lesson content for AI: only the chunks most relevant to the lesson topic
+        lesson_text = lesson_index.context_for(lesson)
         grade_level = getattr(lesson, 'grade', None) or getattr(lesson, 'grade_level', None)
         
         logger.info(f"Generating task for lesson {lesson_id}: {lesson.title} for grade {grade_level}")
         
-        # Try to generate task with AI
-        task_data = await ai_service.generate_task_with_ollama(
-            lesson_content=lesson_text,
-            grade_level=grade_level
-        )
+        # Take a ready task from the pre-generation pool (this also queues a refill)
+        task_data = None
+        if task_pool is not None and not fresh:
+            task_data = task_pool.take(lesson_id, grade_level, lesson_text)
+
+        # Otherwise generate one with AI
+        if not task_data:
+            task_data = await run_until_disconnect(
+                request,
+                ai_service.generate_task_with_ollama(
+                    lesson_content=lesson_text,
+                    grade_level=grade_level,
+                    use_cache=not fresh
+                ),
+                request_deadline(request, settings.REQUEST_DEADLINE_TASK_SECONDS)
+            )
         
         # If AI generation fails, use fallback
         if not task_data:
@@ -64,15 +92,17 @@ async def generate_task_for_lesson(lesson_id: int, db: Session = Depends(get_db)
         logger.info(f"Successfully created AI task {db_task.id} for lesson {lesson_id}")
         return db_task
         
+    except HTTPException:
+        # Client disconnected; nobody is waiting for a fallback task
+        raise
     except Exception as e:
         logger.error(f"Error generating task for lesson {lesson_id}: {e}")
         db.rollback()
         
         # Create a simple fallback task even if everything fails
         try:
-            ai_service = AIService()
             fallback_data = ai_service.generate_fallback_task(
-                lesson_text=lesson.content or lesson.title,
+                lesson_content=lesson.content or lesson.title,
                 grade_level=getattr(lesson, 'grade', None)
             )
             
@@ -98,6 +128,182 @@ async def generate_task_for_lesson(lesson_id: int, db: Session = Depends(get_db)
                 detail="Failed to generate task. Please try again later."
             )
 
+@router.post("/lessons/{lesson_id}/generate-tasks", response_model=List[TaskOut])
+async def generate_tasks_for_lesson(
+    lesson_id: int,
+    request: Request,
+    count: int = Query(5, ge=1, le=settings.MULTI_TASK_MAX_COUNT),
+    db: Session = Depends(get_db),
+    ai_service: AIService = Depends(get_ai_service)
+):
+    """Generate up to ``count`` different AI tasks for a lesson with a single model call.
+
+    Fewer tasks are returned when some generated entries fail validation; if
+    the model is unavailable or none are usable, one fallback task is created.
+    """
+    lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
+    if not lesson:
+        raise HTTPException(status_code=404, detail="Lesson not found")
+
+    lesson_text = lesson_index.context_for(lesson)
+    grade_level = getattr(lesson, 'grade', None)
+
+    tasks_data = await run_until_disconnect(
+        request,
+        ai_service.generate_tasks_with_ollama(
+            lesson_content=lesson_text,
+            grade_level=grade_level,
+            count=count
+        ),
+        request_deadline(request, settings.REQUEST_DEADLINE_TASK_SECONDS)
+    )
+    if not tasks_data:
+        logger.warning(f"Multi-task generation failed for lesson {lesson_id}, using fallback")
+        tasks_data = [ai_service.generate_fallback_task(lesson_text, grade_level)]
+
+    db_tasks = [
+        Task(
+            lesson_id=lesson_id,
+            title=task_data['title'],
+            description=task_data['description'],
+            is_completed=0
+        )
+        for task_data in tasks_data
+    ]
+    try:
+        db.add_all(db_tasks)
+        db.commit()
+    except Exception as e:
+        logger.error(f"Error saving generated tasks for lesson {lesson_id}: {e}")
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Failed to save tasks. Please try again later.")
+
+    for db_task in db_tasks:
+        db.refresh(db_task)
+    logger.info(f"Created {len(db_tasks)} AI tasks for lesson {lesson_id}")
+    return db_tasks
+
+def _sse(event: str, data: Any) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/lessons/{lesson_id}/generate-task/stream")
+async def stream_task_for_lesson(
+    lesson_id: int,
+    fresh: bool = False,
+    db: Session = Depends(get_db),
+    ai_service: AIService = Depends(get_ai_service),
+    task_pool: Optional[TaskPregenerationPool] = Depends(get_task_pool)
+):
+    """Generate a task for a lesson and stream it over Server-Sent Events.
+
+    ``title`` and ``description`` events carry text deltas as the model writes
+    them; a final ``task`` event carries the stored Task once the JSON object
+    is complete (or ``error`` if it could not be saved).
+    """
+    lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
+    if not lesson:
+        raise HTTPException(status_code=404, detail="Lesson not found")
+
+    lesson_text = lesson_index.context_for(lesson)
+    grade_level = getattr(lesson, 'grade', None)
+    pooled = None
+    if task_pool is not None and not fresh:
+        pooled = task_pool.take(lesson_id, grade_level, lesson_text)
+
+    async def event_stream():
+        task_data = pooled
+        if task_data:
+            yield _sse("title", {"delta": task_data["title"]})
+            yield _sse("description", {"delta": task_data["description"]})
+        else:
+            async for event, data in ai_service.stream_task_with_ollama(
+                lesson_content=lesson_text,
+                grade_level=grade_level,
+                use_cache=not fresh
+            ):
+                if event == "task":
+                    task_data = data
+                else:
+                    yield _sse(event, {"delta": data})
+
+        # The request's session is closed once streaming starts; use a fresh one
+        task_db = SessionLocal()
+        try:
+            db_task = Task(
+                lesson_id=lesson_id,
+                title=task_data['title'],
+                description=task_data['description'],
+                is_completed=0
+            )
+            task_db.add(db_task)
+            task_db.commit()
+            task_db.refresh(db_task)
+            logger.info(f"Successfully created streamed AI task {db_task.id} for lesson {lesson_id}")
+            yield _sse("task", TaskOut.model_validate(db_task).model_dump())
+        except Exception as e:
+            logger.error(f"Error saving streamed task for lesson {lesson_id}: {e}")
+            task_db.rollback()
+            yield _sse("error", {"detail": "Failed to save task. Please try again later."})
+        finally:
+            task_db.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/lessons/generate-tasks", response_model=BatchTaskGenerationStatus, status_code=202)
+async def generate_tasks_for_lessons(
+    payload: BatchTaskGenerationRequest,
+    db: Session = Depends(get_db),
+    batch_generator: BatchTaskGenerator = Depends(get_batch_generator)
+):
+    """Start generating one task for each listed lesson, or every lesson in a grade.
+
+    Returns immediately with a job; poll ``GET /lessons/generate-tasks/{job_id}``
+    for progress. All tasks are stored in one transaction when the job finishes.
+    """
+    if payload.lesson_ids:
+        lessons = db.query(Lesson).filter(Lesson.id.in_(payload.lesson_ids)).all()
+        missing = set(payload.lesson_ids) - {lesson.id for lesson in lessons}
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Lessons not found: {sorted(missing)}")
+    elif payload.grade is not None:
+        lessons = db.query(Lesson).filter(Lesson.grade == payload.grade).all()
+    else:
+        raise HTTPException(status_code=400, detail="Provide lesson_ids or grade")
+
+    if not lessons:
+        raise HTTPException(status_code=404, detail="No lessons found for this grade")
+    if len(lessons) > settings.BATCH_GENERATION_MAX_LESSONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.BATCH_GENERATION_MAX_LESSONS} lessons per batch"
+        )
+
+    job = batch_generator.submit(
+        [
+            (lesson.id, lesson_index.context_for(lesson), lesson.grade)
+            for lesson in lessons
+        ],
+        use_cache=not payload.fresh
+    )
+    logger.info(f"Started batch task generation {job.job_id} for {job.total} lessons")
+    return BatchTaskGenerationStatus(**vars(job))
+
+@router.get("/lessons/generate-tasks/{job_id}", response_model=BatchTaskGenerationStatus)
+async def get_batch_generation_status(
+    job_id: str,
+    batch_generator: BatchTaskGenerator = Depends(get_batch_generator)
+):
+    """Report progress of a batch task generation job."""
+    job = batch_generator.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+    return BatchTaskGenerationStatus(**vars(job))
+
 @router.get("/lessons", response_model=List[dict])
 async def get_lessons(db: Session = Depends(get_db)):
     """Get all lessons."""
@@ -0,0 +1,80 @@
+# File: backend/app/routers/tutor.py
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+import logging
+
+from app.core.config import settings
+from app.database import get_db
+from app.models.lesson import Lesson
+from app.schemas.tutor import TutorSessionCreate, TutorSessionOut, TutorMessageIn, TutorReply
+from app.services.lesson_index import lesson_index
+from app.services.llm_scheduler import LLMOverloadedError
+from app.services.tutor_chat import TutorChatService
+from app.utils.cancellation import request_deadline, run_until_disconnect
+from app.utils.dependencies import get_tutor_chat
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+@router.post("/sessions", response_model=TutorSessionOut)
+def create_tutor_session(
+    payload: TutorSessionCreate,
+    db: Session = Depends(get_db),
+    tutor: TutorChatService = Depends(get_tutor_chat)
+):
+    """Start a tutoring conversation, optionally about one lesson."""
+    lesson_context = ""
+    grade_level = payload.grade_level
+    if payload.lesson_id is not None:
+        lesson = db.query(Lesson).filter(Lesson.id == payload.lesson_id).first()
+        if not lesson:
+            raise HTTPException(status_code=404, detail="Lesson not found")
+        lesson_context = f"{lesson.title}: {lesson_index.context_for(lesson)}"
+        grade_level = grade_level or lesson.grade
+
+    session = tutor.create_session(lesson_context, grade_level, payload.lesson_id)
+    return session.to_dict()
+
+@router.get("/sessions/{session_id}", response_model=TutorSessionOut)
+def get_tutor_session(session_id: str, tutor: TutorChatService = Depends(get_tutor_chat)):
+    session = tutor.get_session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+    return session.to_dict()
+
+@router.post("/sessions/{session_id}/messages", response_model=TutorReply)
+async def send_tutor_message(
+    session_id: str,
+    payload: TutorMessageIn,
+    request: Request,
+    tutor: TutorChatService = Depends(get_tutor_chat)
+):
+    """Ask the next question of a session; follow-ups reuse the model context."""
+    session = tutor.get_session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+
+    try:
+        answer = await run_until_disconnect(
+            request,
+            tutor.ask(session, payload.message),
+            request_deadline(request, settings.REQUEST_DEADLINE_CHAT_SECONDS)
+        )
+    except LLMOverloadedError as e:
+        logger.warning(str(e))
+        raise HTTPException(
+            status_code=503,
+            detail="Lots of friends are asking questions right now. Please try again in a moment.",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    if answer is None:
+        raise HTTPException(status_code=502, detail="Could not generate an answer. Please try again.")
+
+    return {"session_id": session_id, "turn": session.turn_count, "answer": answer}
+
+@router.delete("/sessions/{session_id}")
+def end_tutor_session(session_id: str, tutor: TutorChatService = Depends(get_tutor_chat)):
+    if not tutor.end_session(session_id):
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+    return {"deleted": True}
@@ -1,64 +1,154 @@
 # File: backend/app/routers/voice_qna.py
 
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, Request, WebSocket, Query
 from sqlalchemy.orm import Session
 from typing import Optional
 import logging
 
-from app.database import get_db
+from app.core.config import settings
+from app.database import get_db, SessionLocal
 from app.models.lesson import Lesson
+from app.services.audio_decode import AudioDecodeBusyError
+from app.services.audio_probe import probe_audio
+from app.services.lesson_index import lesson_index
 from app.services.voice_qna_service import VoiceQnAService
+from app.services.voice_stream import VoiceStreamSession
+from app.utils.cancellation import request_deadline, run_until_disconnect
+from app.utils.dependencies import get_voice_service
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.post("/voice-qna")
 async def voice_qna(
+    request: Request,
     audio_file: UploadFile = File(...),
     lesson_id: Optional[int] = Form(None),
     grade_level: Optional[int] = Form(None),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    voice_service: VoiceQnAService = Depends(get_voice_service)
 ):
-    """Process voice question and return AI response."""
+    """Process voice question and return AI response.
+
+    Speech recognition and answer generation are cancelled if the client
+    disconnects, and bounded by the request deadline. Uploads are refused
+    with 503 while the audio decode pool is saturated.
+    """
     
     try:
         # Accept any uploaded file (we’ll attempt to process it)
         if audio_file.content_type is None:
             raise HTTPException(status_code=400, detail="No file content type provided")
 
-        # Get lesson context if provided
+        # Shed before reading the upload when decoding is backed up
+        if voice_service.decoder is not None:
+            try:
+                voice_service.decoder.ensure_capacity()
+            except AudioDecodeBusyError as e:
+                logger.warning(str(e))
+                raise HTTPException(
+                    status_code=503,
+                    detail=VoiceQnAService.BUSY_ERROR,
+                    headers={"Retry-After": str(e.retry_after)}
+                )
+
+        # Get the lesson summary and chunk index if provided; the service adds
+        # the chunks relevant to the question once it has been recognised
         lesson_context = ""
+        lesson_chunks = None
         if lesson_id:
             lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
             if lesson:
-                lesson_context = f"{lesson.title}: {lesson.content}"
+                lesson_context = lesson_index.summary_for(lesson)
+                lesson_chunks = lesson_index.get(lesson)
         
-        # Read audio data
+        # Read audio data and refuse anything we cannot decode before queueing work
         audio_data = await audio_file.read()
+        audio_format = probe_audio(audio_data)
+        if audio_format is None:
+            raise HTTPException(status_code=415, detail=VoiceQnAService.UNSUPPORTED_AUDIO_ERROR)
         
         # Process voice Q&A
-        voice_service = VoiceQnAService()
-        result = await voice_service.process_voice_question(
-            audio_data=audio_data,
-            lesson_context=lesson_context,
-            grade_level=grade_level
+        result = await run_until_disconnect(
+            request,
+            voice_service.process_voice_question(
+                audio_data=audio_data,
+                lesson_context=lesson_context,
+                grade_level=grade_level,
+                lesson_chunks=lesson_chunks,
+                audio_format=audio_format
+            ),
+            request_deadline(request, settings.REQUEST_DEADLINE_VOICE_SECONDS)
         )
+
+        # Shed by the LLM scheduler: tell the client when to retry
+        if result.get("retry_after"):
+            raise HTTPException(
+                status_code=503,
+                detail=result["error"],
+                headers={"Retry-After": str(result["retry_after"])}
+            )
         
         return result
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in voice Q&A endpoint: {e}")
         raise HTTPException(status_code=500, detail="Voice processing failed")
 
+@router.websocket("/voice-qna/ws")
+async def voice_qna_stream(
+    websocket: WebSocket,
+    lesson_id: Optional[int] = Query(None),
+    grade_level: Optional[int] = Query(None),
+    format: str = Query("auto", pattern="^(auto|pcm)$"),
+    sample_rate: int = Query(16000, ge=8000, le=48000),
+    channels: int = Query(1, ge=1, le=2)
+):
+    """Streaming voice Q&A: send audio chunks as they are recorded, get answers back.
+
+    With ``format=auto`` the first chunk is probed (WAV, ADTS AAC, WebM,
+    Ogg, MP4); ``format=pcm`` takes raw 16-bit little-endian PCM at
+    ``sample_rate``/``channels``. See ``VoiceStreamSession`` for messages.
+    """
+    lesson_context = ""
+    lesson_chunks = None
+    if lesson_id:
+        # Look the lesson up once; the socket may stay open for many questions
+        db = SessionLocal()
+        try:
+            lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
+            if lesson:
+                lesson_context = lesson_index.summary_for(lesson)
+                lesson_chunks = lesson_index.get(lesson)
+                grade_level = grade_level or lesson.grade
+        finally:
+            db.close()
+
+    await websocket.accept()
+    session = VoiceStreamSession(
+        websocket,
+        websocket.app.state.voice_qna,
+        lesson_context=lesson_context,
+        grade_level=grade_level,
+        lesson_chunks=lesson_chunks,
+        audio_format=format,
+        sample_rate=sample_rate,
+        channels=channels
+    )
+    await session.run()
+
 @router.get("/voice-qna/test")
-async def test_voice_services():
+async def test_voice_services(voice_service: VoiceQnAService = Depends(get_voice_service)):
     """Test if voice services are available."""
     try:
-        voice_service = VoiceQnAService()
         return {
-            "speech_recognition": "available",
+            "speech_recognition": voice_service.stt.engine.name,
             "text_to_speech": "available",
-            "ollama": "testing..."
+            "ollama": "testing...",
+            "audio_decode": voice_service.decoder.stats() if voice_service.decoder else None,
+            "tts_cache": voice_service.tts_cache.stats() if voice_service.tts_cache else None
         }
     except Exception as e:
         return {"error": str(e)}
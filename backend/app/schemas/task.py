@@ -1,7 +1,7 @@
 # File: backend/app/schemas/task.py
 
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 class TaskBase(BaseModel):
     title: str
@@ -17,3 +17,17 @@ class TaskOut(TaskBase):
     
     class Config:
         from_attributes = True
+
+class BatchTaskGenerationRequest(BaseModel):
+    lesson_ids: Optional[List[int]] = None
+    grade: Optional[int] = None
+    fresh: bool = False
+
+class BatchTaskGenerationStatus(BaseModel):
+    job_id: str
+    status: str
+    total: int
+    completed: int = 0
+    fallbacks: int = 0
+    task_ids: List[int] = []
+    error: Optional[str] = None
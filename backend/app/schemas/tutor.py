@@ -0,0 +1,28 @@
+# File: backend/app/schemas/tutor.py
+
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+class TutorSessionCreate(BaseModel):
+    lesson_id: Optional[int] = None
+    grade_level: Optional[int] = None
+
+class TutorTurn(BaseModel):
+    question: str
+    answer: str
+
+class TutorSessionOut(BaseModel):
+    session_id: str
+    lesson_id: Optional[int] = None
+    grade_level: Optional[int] = None
+    turn_count: int = 0
+    context_tokens: int = 0
+    turns: List[TutorTurn] = []
+
+class TutorMessageIn(BaseModel):
+    message: str = Field(..., min_length=1, max_length=1000)
+
+class TutorReply(BaseModel):
+    session_id: str
+    turn: int
+    answer: str
@@ -1,40 +1,120 @@
 # File: backend/app/services/ai_service.py
 
 import asyncio
-import json
 import logging
 import sys
-from typing import Dict, Any, Optional
+from contextlib import aclosing
+from typing import Dict, Any, Optional, AsyncIterator, Tuple, List, Callable
+
 import aiohttp
 
+from ..core.config import settings
+from .circuit_breaker import CircuitOpenError
+from .content_safety import content_safety, grade_band
+from .degradation import DegradationLevel
+from .json_repair import parse_json
+from .json_stream import IncrementalJSONFieldParser
+from .llm_scheduler import LLMOverloadedError, Priority
+from .ollama_backends import NoHealthyBackendError
+from .ollama_client import OllamaClient, OllamaError
+from .response_cache import ResponseCache
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class AIService:
-    def __init__(self, ollama_url: str = "http://localhost:11434", model: str = "gemma3n:e2b"):
-        self.ollama_base_url = ollama_url
-        self.model_name = model
+    # Sampling options for task generation; part of the response cache key
+    TASK_OPTIONS = {
+        "temperature": 0.5,  # Lower temperature for more consistent, appropriate content
+        "top_p": 0.8,
+        "top_k": 40
+    }
+
+    # Lesson text kept in the compact prompt used under load
+    COMPACT_LESSON_CHARS = 600
+
+    # JSON schema for one task, passed to Ollama's structured output ``format``
+    TASK_SCHEMA = {
+        "type": "object",
+        "properties": {
+            "title": {"type": "string", "maxLength": 50},
+            "description": {"type": "string"}
+        },
+        "required": ["title", "description"]
+    }
+
+    # JSON schema for a lesson summary with its key terms
+    SUMMARY_SCHEMA = {
+        "type": "object",
+        "properties": {
+            "summary": {"type": "string"},
+            "key_terms": {"type": "array", "items": {"type": "string"}}
+        },
+        "required": ["summary", "key_terms"]
+    }
+
+    # Grade-specific guidelines: (complexity, skills, instructions)
+    GRADE_GUIDELINES = {
+        "early": (
+            "very simple",
+            "basic counting, single-digit addition/subtraction, shapes, colors",
+            "Use simple words, pictures, and hands-on activities"
+        ),
+        "elementary": (
+            "elementary level",
+            "basic math operations, simple reading, basic science concepts",
+            "Use clear language and step-by-step instructions"
+        ),
+        "middle": (
+            "middle school level",
+            "fractions, multiplication, reading comprehension, basic algebra",
+            "Include problem-solving and critical thinking"
+        ),
+        "high": (
+            "high school level",
+            "advanced math, complex reading, scientific analysis",
+            "Include analytical thinking and research components"
+        ),
+    }
+
+    def __init__(
+        self,
+        ollama_url: Optional[str] = None,
+        model: Optional[str] = None,
+        client: Optional[OllamaClient] = None,
+        cache: Optional[ResponseCache] = None
+    ):
+        self.client = client or OllamaClient(ollama_url)
+        self.ollama_base_url = self.client.base_url
+        self.model_name = model or settings.OLLAMA_MODEL
+        self.cache = cache
+
+    def _get_grade_band(self, grade_level: int = None) -> str:
+        """Map a grade level onto the band used for prompts and cache keys."""
+        return grade_band(grade_level)
     
-    def _get_grade_appropriate_prompt(self, lesson_content: str, grade_level: int = None) -> str:
-        """Generate age-appropriate prompts based on grade level."""
+    def _get_grade_appropriate_prompt(self, lesson_content: str, grade_level: int = None, count: int = 1) -> str:
+        """Generate age-appropriate prompts based on grade level.
+
+        With ``count`` > 1 the model is asked for ``{"tasks": [...]}`` holding
+        that many different tasks, so the prompt is evaluated once for all.
+        """
         
-        # Define grade-specific guidelines
-        if grade_level is None or grade_level <= 2:
-            complexity = "very simple"
-            skills = "basic counting, single-digit addition/subtraction, shapes, colors"
-            instructions = "Use simple words, pictures, and hands-on activities"
-        elif grade_level <= 5:
-            complexity = "elementary level"
-            skills = "basic math operations, simple reading, basic science concepts"
-            instructions = "Use clear language and step-by-step instructions"
-        elif grade_level <= 8:
-            complexity = "middle school level"  
-            skills = "fractions, multiplication, reading comprehension, basic algebra"
-            instructions = "Include problem-solving and critical thinking"
+        complexity, skills, instructions = self.GRADE_GUIDELINES[self._get_grade_band(grade_level)]
+
+        task_fields = f"""{{
+            "title": "A clear, engaging task title (max 50 characters)",
+            "description": "Detailed task description with specific steps for Grade {grade_level or 1} students"
+        }}"""
+        if count == 1:
+            output_spec = f"""Generate an educational task in JSON format with exactly these fields:
+        {task_fields}"""
         else:
-            complexity = "high school level"
-            skills = "advanced math, complex reading, scientific analysis"
-            instructions = "Include analytical thinking and research components"
+            output_spec = f"""Generate {count} different educational tasks in JSON format, each practising a different part of the lesson:
+        {{"tasks": [
+            {task_fields},
+            ...
+        ]}}"""
 
         return f"""
         IMPORTANT: Create a task for Grade {grade_level or 1} students only.
@@ -44,11 +124,7 @@ class AIService:
         Complexity Required: {complexity}
         Appropriate Skills: {skills}
         
-        Generate an educational task in JSON format with exactly these fields:
-        {{
-            "title": "A clear, engaging task title (max 50 characters)",
-            "description": "Detailed task description with specific steps for Grade {grade_level or 1} students"
-        }}
+        {output_spec}
         
         CRITICAL REQUIREMENTS:
         - Content must be appropriate for Grade {grade_level or 1} students
@@ -63,73 +139,398 @@ class AIService:
         Return only valid JSON, no additional text.
         """
     
-    async def generate_task_with_ollama(self, lesson_content: str, grade_level: int = None) -> Optional[Dict[str, Any]]:
-        """Generate a task using Ollama based on lesson content."""
+    def _get_compact_prompt(self, lesson_content: str, grade_level: int = None, count: int = 1) -> str:
+        """Short variant of the grade prompt, used while the model server is under load."""
+        complexity, skills, instructions = self.GRADE_GUIDELINES[self._get_grade_band(grade_level)]
+        grade = grade_level or 1
+        shape = '{"title": "...", "description": "..."}'
+        what = "an educational task"
+        if count > 1:
+            shape = f'{{"tasks": [{count} different {shape}]}}'
+            what = f"{count} different educational tasks"
+
+        return (
+            f"Write {what} for Grade {grade} students ({complexity}; {skills}). "
+            f"{instructions}. Titles max 50 characters.\n"
+            f"Lesson: \"{lesson_content[:self.COMPACT_LESSON_CHARS]}\"\n"
+            f"Reply with JSON only: {shape}"
+        )
+
+    def _task_cache_key(self, lesson_content: str, grade_level: int = None) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return self.cache.make_key(
+            lesson_content, self._get_grade_band(grade_level), self.model_name, self.TASK_OPTIONS
+        )
+
+    def _build_task_payload(
+        self,
+        lesson_content: str,
+        grade_level: int = None,
+        count: int = 1,
+        level: DegradationLevel = DegradationLevel.NORMAL
+    ) -> Dict[str, Any]:
+        ladder = self.client.degradation
+        if level >= DegradationLevel.COMPACT_PROMPT:
+            prompt = self._get_compact_prompt(lesson_content, grade_level, count)
+        else:
+            prompt = self._get_grade_appropriate_prompt(lesson_content, grade_level, count)
+        return {
+            "model": ladder.model_for(level, self.model_name),
+            "prompt": prompt,
+            "stream": False,
+            "format": self._task_format(count),
+            "options": ladder.apply_options(level, dict(self.TASK_OPTIONS))
+        }
+
+    def _task_format(self, count: int = 1) -> Any:
+        """JSON schema constraining the reply to one task or ``{"tasks": [...]}``."""
+        if not settings.OLLAMA_STRUCTURED_OUTPUT:
+            return "json"
+        if count == 1:
+            return self.TASK_SCHEMA
+        return {
+            "type": "object",
+            "properties": {
+                "tasks": {"type": "array", "items": self.TASK_SCHEMA, "minItems": 1, "maxItems": count}
+            },
+            "required": ["tasks"]
+        }
+
+    @staticmethod
+    def _task_safety_categories(grade_level: int = None) -> Tuple[str, ...]:
+        """Tasks are only refused for topics too advanced for grades up to 5; other grades are not checked."""
+        return ("too_advanced",) if grade_level and grade_level <= 5 else ()
+
+    def _is_grade_appropriate(self, title: str, description: str, grade_level: int = None) -> bool:
+        """Check for concepts too advanced for young grades."""
+        categories = self._task_safety_categories(grade_level)
+        return not categories or not content_safety.scan(f"{title}\n{description}", grade_level, categories)
+
+    async def generate_task_with_ollama(
+        self,
+        lesson_content: str,
+        grade_level: int = None,
+        use_cache: bool = True,
+        priority: Priority = Priority.TASK
+    ) -> Optional[Dict[str, Any]]:
+        """Generate a task using Ollama based on lesson content.
+
+        Repeated requests for the same lesson content, grade band and model are
+        served from the response cache; pass ``use_cache=False`` to force a
+        fresh generation (the new result still replaces the cached one).
+        ``priority`` is the scheduler class; pre-generation jobs pass BACKGROUND.
+        Under load the request is degraded according to the ``DegradationLadder``,
+        down to the template fallback task without calling the model.
+        Returns None when the model server fails or sheds the call.
+        """
+        cache_key = self._task_cache_key(lesson_content, grade_level)
+        if cache_key is not None and use_cache:
+            cached = await self.cache.get(cache_key)
+            if cached:
+                logger.info(f"Serving Grade {grade_level} task from response cache")
+                return cached
+
+        level = self.client.degradation.level_for(priority)
+        if level == DegradationLevel.FALLBACK:
+            logger.info(f"Model server overloaded, serving fallback task for Grade {grade_level}")
+            return self.generate_fallback_task(lesson_content, grade_level)
+        if level >= DegradationLevel.SHORT_OUTPUT:
+            # Keep degraded output out of the cache
+            cache_key = None
+
         try:
-            prompt = self._get_grade_appropriate_prompt(lesson_content, grade_level)
+            payload = self._build_task_payload(lesson_content, grade_level, level=level)
             
-            payload = {
-                "model": self.model_name,
-                "prompt": prompt,
-                "stream": False,
-                "format": "json",
-                "options": {
-                    "temperature": 0.5,  # Lower temperature for more consistent, appropriate content
-                    "top_p": 0.8,
-                    "top_k": 40
+            result = await self.client.generate(
+                payload, timeout=120, priority=priority, call_site="task_generation"
+            )
+            response_text = result.get('response', '').strip()
+
+            try:
+                task_data = parse_json(response_text)
+                if not isinstance(task_data, dict):
+                    raise ValueError("Expected a JSON object")
+
+                # Validate content is appropriate for grade level
+                title = task_data.get("title", "")
+                description = task_data.get("description", "")
+                if not (isinstance(title, str) and isinstance(description, str) and title and description):
+                    raise ValueError("Missing title or description")
+
+                if not self._is_grade_appropriate(title, description, grade_level):
+                    logger.warning(f"Generated inappropriate content for Grade {grade_level}, using fallback")
+                    return self.generate_fallback_task(lesson_content, grade_level)
+
+                task = {
+                    "title": title[:50],  # Ensure max length
+                    "description": description
                 }
-            }
-            
-            async with aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=120, connect=10, sock_read=120)
-            ) as session:
-                async with session.post(
-                    f"{self.ollama_base_url}/api/generate",
-                    json=payload,
-                    headers={'Content-Type': 'application/json'}
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        response_text = result.get('response', '').strip()
-                        
-                        try:
-                            task_data = json.loads(response_text)
-                            
-                            # Validate content is appropriate for grade level
-                            title = task_data.get("title", "")
-                            description = task_data.get("description", "")
-                            
-                            # Check for inappropriate content for young grades
-                            if grade_level and grade_level <= 5:
-                                inappropriate_terms = [
-                                    "quadratic", "equation", "algebra", "calculus", "polynomial",
-                                    "derivative", "integral", "logarithm", "trigonometry", "matrix"
-                                ]
-                                
-                                content_lower = (title + " " + description).lower()
-                                if any(term in content_lower for term in inappropriate_terms):
-                                    logger.warning(f"Generated inappropriate content for Grade {grade_level}, using fallback")
-                                    return self.generate_fallback_task(lesson_content, grade_level)
-                            
-                            return {
-                                "title": title[:50],  # Ensure max length
-                                "description": description
-                            }
-                            
-                        except json.JSONDecodeError as e:
-                            logger.error(f"Failed to parse AI response as JSON: {response_text}, Error: {e}")
-                            return self.generate_fallback_task(lesson_content, grade_level)
-                    else:
-                        logger.error(f"Ollama API returned status {response.status}")
-                        return None
-                        
+                if cache_key is not None:
+                    await self.cache.set(cache_key, task)
+                return task
+
+            except ValueError as e:
+                logger.error(f"Failed to parse AI response as JSON: {response_text}, Error: {e}")
+                return self.generate_fallback_task(lesson_content, grade_level)
+
+        except CircuitOpenError as e:
+            logger.info(f"Skipping task generation: {e}")
+            return None
+        except LLMOverloadedError as e:
+            logger.warning(str(e))
+            return None
+        except OllamaError as e:
+            logger.error(str(e))
+            return None
         except asyncio.TimeoutError:
             logger.error("Ollama request timed out")
             return None
         except Exception as e:
             logger.error(f"Error generating task with Ollama: {e}")
             return None
+
+    def _validate_tasks(self, data: Any, grade_level: int = None, count: int = 1) -> List[Dict[str, Any]]:
+        """Keep the well-formed, grade-appropriate, distinct tasks of a multi-task reply."""
+        items = data.get("tasks", []) if isinstance(data, dict) else data
+        if not isinstance(items, list):
+            return []
+
+        tasks, seen_titles = [], set()
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            title = item.get("title")
+            description = item.get("description")
+            if not isinstance(title, str) or not isinstance(description, str):
+                continue
+            title, description = title.strip()[:50], description.strip()
+            if not title or not description or title.lower() in seen_titles:
+                continue
+            if not self._is_grade_appropriate(title, description, grade_level):
+                logger.warning(f"Dropping inappropriate generated task for Grade {grade_level}")
+                continue
+            seen_titles.add(title.lower())
+            tasks.append({"title": title, "description": description})
+            if len(tasks) == count:
+                break
+        return tasks
+
+    async def generate_tasks_with_ollama(
+        self,
+        lesson_content: str,
+        grade_level: int = None,
+        count: int = 5,
+        priority: Priority = Priority.TASK
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Generate up to ``count`` different tasks for a lesson in one model call.
+
+        The grade prompt and lesson are evaluated once for all tasks. Invalid,
+        duplicate or inappropriate entries are dropped, so fewer than ``count``
+        tasks (possibly none) may come back. Returns None when the model
+        server fails or sheds the call, or when the degradation ladder is at
+        FALLBACK. Results are not cached, since callers want variety.
+        """
+        level = self.client.degradation.level_for(priority)
+        if level == DegradationLevel.FALLBACK:
+            logger.info("Model server overloaded, skipping multi-task generation")
+            return None
+
+        try:
+            payload = self._build_task_payload(lesson_content, grade_level, count, level)
+            result = await self.client.generate(
+                payload, timeout=120 + 30 * count, priority=priority, call_site="multi_task_generation"
+            )
+            response_text = result.get('response', '').strip()
+            try:
+                data = parse_json(response_text)
+            except ValueError as e:
+                logger.error(f"Failed to parse AI multi-task response as JSON: {response_text}, Error: {e}")
+                return []
+
+            tasks = self._validate_tasks(data, grade_level, count)
+            logger.info(f"Generated {len(tasks)}/{count} tasks in one call for Grade {grade_level}")
+            return tasks
+
+        except CircuitOpenError as e:
+            logger.info(f"Skipping multi-task generation: {e}")
+            return None
+        except LLMOverloadedError as e:
+            logger.warning(str(e))
+            return None
+        except OllamaError as e:
+            logger.error(str(e))
+            return None
+        except asyncio.TimeoutError:
+            logger.error("Ollama request timed out")
+            return None
+        except Exception as e:
+            logger.error(f"Error generating tasks with Ollama: {e}")
+            return None
+
+    async def summarize_lesson_with_ollama(
+        self,
+        title: str,
+        lesson_content: str,
+        grade_level: int = None,
+        priority: Priority = Priority.BACKGROUND
+    ) -> Optional[Dict[str, Any]]:
+        """Summarize a lesson for its grade as ``{"summary": str, "key_terms": [str]}``.
+
+        The only prompt that carries the full lesson text; its result is stored
+        and used as the default lesson context of every other prompt. Returns
+        None on failure or when the summary fails the content safety check.
+        """
+        complexity, _, instructions = self.GRADE_GUIDELINES[self._get_grade_band(grade_level)]
+        prompt = (
+            f"Summarize this lesson for a Grade {grade_level or 1} student in at most "
+            f"{settings.LESSON_SUMMARY_MAX_WORDS} words ({complexity}). {instructions}. "
+            f"Also list up to {settings.LESSON_SUMMARY_MAX_TERMS} key terms from the lesson.\n\n"
+            f"Lesson title: {title}\n"
+            f"Lesson content: \"{lesson_content}\"\n\n"
+            'Respond ONLY with JSON: {"summary": "...", "key_terms": ["...", "..."]}'
+        )
+        payload = {
+            "model": self.model_name,
+            "prompt": prompt,
+            "stream": False,
+            "format": self.SUMMARY_SCHEMA if settings.OLLAMA_STRUCTURED_OUTPUT else "json",
+            "options": dict(self.TASK_OPTIONS, num_predict=4 * settings.LESSON_SUMMARY_MAX_WORDS)
+        }
+
+        try:
+            result = await self.client.generate(
+                payload, timeout=180, priority=priority, call_site="lesson_summary"
+            )
+            data = parse_json(result.get('response', '').strip())
+        except (CircuitOpenError, LLMOverloadedError, OllamaError, asyncio.TimeoutError) as e:
+            logger.warning(f"Lesson summary skipped: {e or type(e).__name__}")
+            return None
+        except ValueError as e:
+            logger.error(f"Failed to parse lesson summary as JSON: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Error summarizing lesson with Ollama: {e}")
+            return None
+
+        summary = data.get("summary") if isinstance(data, dict) else None
+        if not isinstance(summary, str) or not summary.strip():
+            return None
+        terms = data.get("key_terms") or []
+        key_terms = [t.strip() for t in terms if isinstance(t, str) and t.strip()][:settings.LESSON_SUMMARY_MAX_TERMS]
+        if content_safety.scan(f"{summary}\n{' '.join(key_terms)}", grade_level, categories=("unsafe",)):
+            logger.warning(f"Lesson summary for '{title}' failed the content safety check")
+            return None
+        return {"summary": summary.strip(), "key_terms": key_terms}
+
+    async def stream_task_with_ollama(
+        self,
+        lesson_content: str,
+        grade_level: int = None,
+        use_cache: bool = True
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Stream a task from Ollama as it is generated.
+
+        Yields ``("title", text)`` and ``("description", text)`` fragments as
+        soon as the model writes them, then exactly one ``("task", dict)`` with
+        the validated task. The final task is a template fallback when the
+        stream fails, is malformed or is not grade-appropriate.
+        """
+        cache_key = self._task_cache_key(lesson_content, grade_level)
+        if cache_key is not None and use_cache:
+            cached = await self.cache.get(cache_key)
+            if cached:
+                yield "title", cached["title"]
+                yield "description", cached["description"]
+                yield "task", cached
+                return
+
+        level = self.client.degradation.level_for(Priority.TASK)
+        if level == DegradationLevel.FALLBACK:
+            logger.info(f"Model server overloaded, streaming fallback task for Grade {grade_level}")
+            yield "task", self.generate_fallback_task(lesson_content, grade_level)
+            return
+        if level >= DegradationLevel.SHORT_OUTPUT:
+            cache_key = None
+
+        parser = IncrementalJSONFieldParser(("title", "description"))
+        scanner = content_safety.scanner(grade_level, self._task_safety_categories(grade_level))
+        last_field = None
+        finished = False
+        payload = self._build_task_payload(lesson_content, grade_level, level=level)
+        try:
+            async with aclosing(self.client.generate_stream(payload, timeout=120, call_site="task_stream")) as chunks:
+                async for chunk in chunks:
+                    for field, delta in parser.feed(chunk.get("response", "")):
+                        if field != last_field:
+                            scanner.feed("\n")
+                            last_field = field
+                        scanner.feed(delta)
+                        yield field, delta
+                    if not scanner.is_safe:
+                        # No point generating the rest of a task that will be replaced
+                        break
+                    if parser.closed:
+                        # The object is complete; dropping the stream stops generation
+                        break
+            finished = True
+        except CircuitOpenError as e:
+            logger.info(f"Skipping task stream: {e}")
+        except LLMOverloadedError as e:
+            logger.warning(str(e))
+        except (OllamaError, NoHealthyBackendError, asyncio.TimeoutError, aiohttp.ClientError, ValueError) as e:
+            logger.error(f"Error streaming task from Ollama: {e}")
+
+        scanner.finish()
+        title = parser.values.get("title", "")
+        description = parser.values.get("description", "")
+        if not scanner.is_safe:
+            logger.warning(f"Streamed inappropriate content for Grade {grade_level}, using fallback")
+        elif (parser.closed or finished) and title and description:
+            # A reply cut off by the token limit keeps what was generated
+            task = {"title": title[:50], "description": description}
+            if cache_key is not None:
+                await self.cache.set(cache_key, task)
+            yield "task", task
+            return
+
+        yield "task", self.generate_fallback_task(lesson_content, grade_level)
     
+    async def generate_tasks_batch(
+        self,
+        lessons: List[Tuple[int, str, Optional[int]]],
+        concurrency: Optional[int] = None,
+        use_cache: bool = True,
+        on_progress: Optional[Callable[[int, Dict[str, Any], bool], None]] = None
+    ) -> Dict[int, Dict[str, Any]]:
+        """Generate one task per ``(lesson_id, lesson_content, grade_level)``.
+
+        At most ``concurrency`` generations are in flight at once, all at
+        BACKGROUND priority. Lessons the model cannot serve get the template
+        fallback task. ``on_progress(lesson_id, task, used_fallback)`` is
+        called as each lesson finishes.
+        """
+        semaphore = asyncio.Semaphore(concurrency or settings.BATCH_GENERATION_CONCURRENCY)
+        results: Dict[int, Dict[str, Any]] = {}
+
+        async def generate_one(lesson_id: int, lesson_content: str, grade_level: Optional[int]) -> None:
+            async with semaphore:
+                task = await self.generate_task_with_ollama(
+                    lesson_content,
+                    grade_level,
+                    use_cache=use_cache,
+                    priority=Priority.BACKGROUND
+                )
+            used_fallback = task is None
+            if used_fallback:
+                task = self.generate_fallback_task(lesson_content, grade_level)
+            results[lesson_id] = task
+            if on_progress is not None:
+                on_progress(lesson_id, task, used_fallback)
+
+        await asyncio.gather(*(generate_one(*lesson) for lesson in lessons))
+        return results
+
     def generate_fallback_task(self, lesson_content: str, grade_level: int = None) -> Dict[str, Any]:
         """Generate a grade-appropriate fallback task when AI fails."""
         
@@ -161,12 +562,8 @@ class AIService:
     async def test_connection(self) -> bool:
         """Test if Ollama service is accessible."""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self.ollama_base_url}/api/tags",
-                    timeout=aiohttp.ClientTimeout(total=5)
-                ) as response:
-                    return response.status == 200
+            await self.client.list_models(timeout=5)
+            return True
         except Exception as e:
             logger.error(f"Failed to connect to Ollama: {e}")
             return False
@@ -184,6 +581,7 @@ async def main():
     
     if not is_connected:
         print("❌ Failed to connect to Ollama service.")
+        await ai_service.client.close()
         return
     
     print("✅ Connected to Ollama service\n")
@@ -211,6 +609,8 @@ async def main():
             print(f"   📌 Title: {fallback['title']}")
         print("-" * 40)
 
+    await ai_service.client.close()
+
 def run_sync_test():
     """Synchronous wrapper for the async main function."""
     try:
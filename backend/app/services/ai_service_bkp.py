@@ -12,14 +12,11 @@ import re
 
 import httpx
 from ..core.config import settings
+from .content_safety import content_safety
 
 class AIService:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self.safety_keywords = [
-            "violence", "inappropriate", "harmful", "dangerous", 
-            "adult", "weapon", "drug", "scary", "frightening"
-        ]
         
         # Sample educational content templates
         self.lesson_templates = {
@@ -298,13 +295,13 @@ class AIService:
 
     def _check_content_safety(self, content: Dict) -> float:
         """Check if content is safe for children"""
-        content_text = json.dumps(content).lower()
-        
-        # Check for inappropriate keywords
-        safety_violations = 0
-        for keyword in self.safety_keywords:
-            if keyword in content_text:
-                safety_violations += 1
+        grade_level = content.get("grade_level")
+        violated_terms = set()
+        for text in self._iter_text(content):
+            violated_terms.update(
+                match.term for match in content_safety.scan(text, grade_level, categories=("unsafe",))
+            )
+        safety_violations = len(violated_terms)
         
         # Calculate safety score (1.0 = completely safe, 0.0 = unsafe)
         if safety_violations == 0:
@@ -312,6 +309,17 @@ class AIService:
         else:
             return max(0.0, 1.0 - (safety_violations * 0.2))
 
+    def _iter_text(self, value):
+        """Yield every string inside nested content dicts and lists"""
+        if isinstance(value, str):
+            yield value
+        elif isinstance(value, dict):
+            for item in value.values():
+                yield from self._iter_text(item)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                yield from self._iter_text(item)
+
     async def chat_with_ai(self, message: str, context: str = None) -> Tuple[str, bool, float]:
         """
         Chat with AI assistant
@@ -338,11 +346,7 @@ class AIService:
 
     def _is_message_safe(self, message: str) -> bool:
         """Check if user message is appropriate"""
-        message_lower = message.lower()
-        for keyword in self.safety_keywords:
-            if keyword in message_lower:
-                return False
-        return True
+        return not content_safety.scan(message, categories=("unsafe",))
 
     def get_content_recommendations(self, user_grade: int, completed_content: List[int]) -> List[Dict]:
         """Get recommended content for user"""
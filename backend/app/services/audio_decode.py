@@ -0,0 +1,144 @@
+# File: backend/app/services/audio_decode.py
+
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import Dict, Any, Optional, Callable
+
+import av
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Sample rate speech recognition works on
+TARGET_SAMPLE_RATE = 16000
+
+
+# --- Decoders; module-level so they can run in the worker processes ---
+
+def av_to_wav(audio_data: bytes) -> Optional[bytes]:
+    """Decode any container/codec PyAV understands to 16 kHz mono 16-bit WAV."""
+    try:
+        output_buffer = BytesIO()
+        with av.open(BytesIO(audio_data), mode='r') as input_container:
+            input_stream = input_container.streams.audio[0]
+
+            output_container = av.open(output_buffer, mode='w', format='wav')
+            output_stream = output_container.add_stream('pcm_s16le', rate=TARGET_SAMPLE_RATE, layout='mono')
+
+            for frame in input_container.decode(input_stream):
+                for packet in output_stream.encode(frame):
+                    output_container.mux(packet)
+
+            # Flush any remaining packets
+            for packet in output_stream.encode(None):
+                output_container.mux(packet)
+
+            output_container.close()
+
+        return output_buffer.getvalue()
+
+    except Exception as e:
+        logger.error(f"Error converting audio with PyAV: {e}")
+        return None
+
+
+class AudioDecodeBusyError(Exception):
+    """Raised instead of queueing a decode when the decode pool is saturated."""
+
+    def __init__(self, pending: int, retry_after: int = 1):
+        self.pending = pending
+        self.retry_after = retry_after
+        super().__init__(f"Audio decode pool busy ({pending} decodes pending)")
+
+
+class AudioDecodePool:
+    """Bounded process pool for CPU-heavy audio decoding and resampling.
+
+    Decoding a WebM or AAC upload holds the GIL for most of its runtime, so
+    it runs in worker processes instead of threads. At most ``max_pending``
+    decodes may be running or queued; beyond that ``submit`` raises
+    ``AudioDecodeBusyError`` so the caller can answer 503 right away
+    instead of stacking up work nobody will wait for.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None):
+        self.workers = workers or settings.AUDIO_DECODE_WORKERS
+        self.max_pending = max_pending or settings.AUDIO_DECODE_MAX_PENDING
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.pending = 0
+        self._decode_time = 1.0  # EWMA of decode seconds, seeds Retry-After estimates
+
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def start(self) -> None:
+        # Spawned, not forked: the parent already runs an event loop and threads
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def is_busy(self) -> bool:
+        return self.pending >= self.max_pending
+
+    def ensure_capacity(self) -> None:
+        """Raise ``AudioDecodeBusyError`` when no further decode may be queued."""
+        if self.is_busy():
+            self.rejected += 1
+            raise AudioDecodeBusyError(self.pending, self.retry_after())
+
+    def retry_after(self) -> int:
+        return max(1, int(self.pending * self._decode_time / self.workers))
+
+    def _done(self, started: float, future) -> None:
+        self.pending -= 1
+        if future.cancelled() or future.exception() is not None:
+            self.failed += 1
+            return
+        self.completed += 1
+        self._decode_time = 0.8 * self._decode_time + 0.2 * (time.monotonic() - started)
+
+    async def submit(self, decoder: Callable[[bytes], Optional[bytes]], audio_data: bytes) -> Optional[bytes]:
+        """Run ``decoder(audio_data)`` in a worker process.
+
+        The pending count drops when the worker actually finishes, not when
+        the caller stops waiting, so it reflects the real backlog. A caller
+        that is cancelled withdraws its decode if no worker has started it.
+        """
+        if self._executor is None:
+            raise RuntimeError("Audio decode pool is not started")
+        self.ensure_capacity()
+
+        self.pending += 1
+        started = time.monotonic()
+        future = self._executor.submit(decoder, audio_data)
+        wrapped = asyncio.wrap_future(future)
+        wrapped.add_done_callback(lambda f: self._done(started, f))
+        try:
+            return await asyncio.shield(wrapped)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "busy": self.is_busy(),
+            "retry_after": self.retry_after(),
+            "avg_decode_seconds": round(self._decode_time, 3),
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,202 @@
+# File: backend/app/services/audio_probe.py
+
+import struct
+from typing import NamedTuple, Optional, Iterator, Tuple
+
+# ADTS sampling_frequency_index -> Hz
+ADTS_SAMPLE_RATES = (96000, 88200, 64000, 48000, 44100, 32000, 24000, 22050, 16000, 12000, 11025, 8000, 7350)
+
+# Matroska CodecID prefixes -> codec
+MATROSKA_CODECS = (
+    ("A_OPUS", "opus"), ("A_VORBIS", "vorbis"), ("A_AAC", "aac"), ("A_FLAC", "flac"),
+    ("A_MPEG/L3", "mp3"), ("A_PCM/INT/LIT", "pcm_le"), ("A_PCM/FLOAT", "pcm_float"),
+)
+
+# MP4 audio sample entry types -> codec
+MP4_CODECS = {
+    b"mp4a": "aac", b"alac": "alac", b"Opus": "opus", b"fLaC": "flac", b".mp3": "mp3",
+    b"samr": "amr_nb", b"sawb": "amr_wb", b"ac-3": "ac3", b"ec-3": "eac3",
+    b"ulaw": "pcm_mulaw", b"alaw": "pcm_alaw", b"sowt": "pcm_s16le", b"twos": "pcm_s16be",
+}
+
+# WAVE format tags -> codec (PCM is resolved by bit depth)
+WAV_CODECS = {3: "pcm_float", 6: "pcm_alaw", 7: "pcm_mulaw", 0x11: "adpcm_ima", 0x55: "mp3"}
+
+# Matroska element IDs
+_EBML, _DOC_TYPE = 0x1A45DFA3, 0x4282
+_SEGMENT, _TRACKS, _TRACK_ENTRY, _AUDIO = 0x18538067, 0x1654AE6B, 0xAE, 0xE1
+_CODEC_ID, _SAMPLING_FREQUENCY, _CHANNELS, _CLUSTER = 0x86, 0xB5, 0x9F, 0x1F43B675
+_EBML_MASTERS = {_EBML, _SEGMENT, _TRACKS, _TRACK_ENTRY, _AUDIO}
+
+# MP4 boxes on the path moov/trak/mdia/minf/stbl/stsd
+_MP4_CONTAINERS = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+
+
+class AudioFormat(NamedTuple):
+    container: str  # wav, webm, matroska, ogg, mp4, adts
+    codec: Optional[str] = None
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+
+    @property
+    def is_pcm16_mono_wav(self) -> bool:
+        """Speech engines read this as is; everything else goes through the decoder."""
+        return self.container == "wav" and self.codec == "pcm_s16le" and self.channels == 1
+
+    def __str__(self) -> str:
+        return f"{self.container}/{self.codec or '?'} {self.sample_rate or '?'} Hz x{self.channels or '?'}"
+
+
+def probe_audio(data: bytes) -> Optional[AudioFormat]:
+    """Identify an upload from its header bytes; None for anything unsupported.
+
+    Only headers are read (for MP4, the box tree), so probing costs
+    microseconds whatever the payload size. A recognised container whose
+    details cannot be parsed (e.g. a truncated header) is still returned,
+    with the unknown fields left as None.
+    """
+    if len(data) < 12:
+        return None
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        return _guard(_probe_wav, data, "wav")
+    if data[:4] == b"\x1a\x45\xdf\xa3":
+        return _guard(_probe_matroska, data, "matroska")
+    if data[:4] == b"OggS":
+        return _guard(_probe_ogg, data, "ogg")
+    if data[4:8] == b"ftyp":
+        return _guard(_probe_mp4, data, "mp4")
+    if data[0] == 0xFF and (data[1] & 0xF6) == 0xF0:  # 12-bit sync word, MPEG layer 0
+        return _probe_adts(data)
+    return None
+
+
+def _guard(probe, data: bytes, container: str) -> AudioFormat:
+    try:
+        return probe(data)
+    except (IndexError, ValueError, struct.error):
+        return AudioFormat(container)
+
+
+def _probe_wav(data: bytes) -> AudioFormat:
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_id = data[pos:pos + 4]
+        size = struct.unpack_from("<I", data, pos + 4)[0]
+        if chunk_id == b"fmt ":
+            tag, channels, rate = struct.unpack_from("<HHI", data, pos + 8)
+            bits = struct.unpack_from("<H", data, pos + 22)[0]
+            if tag == 0xFFFE and size >= 40:  # WAVE_FORMAT_EXTENSIBLE: real tag starts the sub-format GUID
+                tag = struct.unpack_from("<H", data, pos + 32)[0]
+            if tag == 1:
+                codec = "pcm_u8" if bits == 8 else f"pcm_s{bits}le"
+            else:
+                codec = WAV_CODECS.get(tag, f"wav_0x{tag:04x}")
+            return AudioFormat("wav", codec, rate, channels)
+        pos += 8 + size + (size & 1)
+    return AudioFormat("wav")
+
+
+def _read_vint(data: bytes, pos: int, keep_marker: bool) -> Tuple[Optional[int], int]:
+    """EBML variable-length integer at ``pos``; None for the all-ones "unknown size"."""
+    first = data[pos]
+    length = 1
+    while length <= 8 and not first & (0x80 >> (length - 1)):
+        length += 1
+    if length > 8:
+        raise ValueError("Invalid EBML vint")
+    value = first if keep_marker else first & (0xFF >> length)
+    for byte in data[pos + 1:pos + length]:
+        value = (value << 8) | byte
+    if not keep_marker and value == (1 << (7 * length)) - 1:
+        return None, pos + length
+    return value, pos + length
+
+
+def _probe_matroska(data: bytes) -> AudioFormat:
+    found = {"doc_type": "matroska", "codec": None, "rate": None, "channels": None}
+
+    def walk(pos: int, end: int) -> bool:
+        """Visit elements in [pos, end); True once the first cluster (media data) is hit."""
+        while pos < end:
+            element_id, pos = _read_vint(data, pos, keep_marker=True)
+            size, pos = _read_vint(data, pos, keep_marker=False)
+            element_end = end if size is None else min(pos + size, end)
+            if element_id == _CLUSTER:
+                return True
+            if element_id in _EBML_MASTERS:
+                if walk(pos, element_end):
+                    return True
+            elif element_id == _DOC_TYPE:
+                found["doc_type"] = data[pos:element_end].decode("ascii", "ignore").strip("\x00")
+            elif element_id == _CODEC_ID and found["codec"] is None:
+                codec_id = data[pos:element_end].decode("ascii", "ignore")
+                found["codec"] = next((c for prefix, c in MATROSKA_CODECS if codec_id.startswith(prefix)), None)
+            elif element_id == _SAMPLING_FREQUENCY and found["rate"] is None:
+                fmt = ">f" if element_end - pos == 4 else ">d"
+                found["rate"] = int(struct.unpack_from(fmt, data, pos)[0])
+            elif element_id == _CHANNELS and found["channels"] is None:
+                found["channels"] = int.from_bytes(data[pos:element_end], "big")
+            pos = element_end
+        return False
+
+    walk(0, len(data))
+    container = "webm" if found["doc_type"] == "webm" else "matroska"
+    return AudioFormat(container, found["codec"], found["rate"], found["channels"])
+
+
+def _probe_ogg(data: bytes) -> AudioFormat:
+    segments = data[26]
+    payload = data[27 + segments:]
+    if payload.startswith(b"OpusHead"):
+        # Opus always decodes at 48 kHz whatever the input rate was
+        return AudioFormat("ogg", "opus", 48000, payload[9])
+    if payload.startswith(b"\x01vorbis"):
+        channels, rate = struct.unpack_from("<BI", payload, 11)
+        return AudioFormat("ogg", "vorbis", rate, channels)
+    if payload.startswith(b"\x7fFLAC"):
+        return AudioFormat("ogg", "flac")
+    if payload.startswith(b"Speex   "):
+        return AudioFormat("ogg", "speex", struct.unpack_from("<I", payload, 36)[0])
+    return AudioFormat("ogg")
+
+
+def _mp4_boxes(data: bytes, pos: int, end: int) -> Iterator[Tuple[bytes, int, int]]:
+    """Yield ``(type, body start, box end)`` for the boxes in [pos, end)."""
+    while pos + 8 <= end:
+        size, box_type = struct.unpack_from(">I4s", data, pos)
+        header = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", data, pos + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header:
+            return
+        yield box_type, pos + header, min(pos + size, end)
+        pos += size
+
+
+def _probe_mp4(data: bytes) -> AudioFormat:
+    def find(pos: int, end: int) -> Optional[AudioFormat]:
+        for box_type, body, box_end in _mp4_boxes(data, pos, end):
+            if box_type in _MP4_CONTAINERS:
+                result = find(body, box_end)
+                if result:
+                    return result
+            elif box_type == b"stsd":
+                # version/flags and entry count, then the sample entries
+                for entry_type, entry_body, _ in _mp4_boxes(data, body + 8, box_end):
+                    if entry_type in MP4_CODECS:
+                        channels, _, _, _, rate = struct.unpack_from(">HHHHI", data, entry_body + 16)
+                        return AudioFormat("mp4", MP4_CODECS[entry_type], rate >> 16, channels)
+        return None
+
+    return find(0, len(data)) or AudioFormat("mp4")
+
+
+def _probe_adts(data: bytes) -> Optional[AudioFormat]:
+    rate_index = (data[2] >> 2) & 0x0F
+    if rate_index >= len(ADTS_SAMPLE_RATES):
+        return None
+    channels = ((data[2] & 0x01) << 2) | (data[3] >> 6)
+    return AudioFormat("adts", "aac", ADTS_SAMPLE_RATES[rate_index], channels or None)
@@ -0,0 +1,112 @@
+# File: backend/app/services/batch_generation.py
+
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
+
+from ..core.config import settings
+from ..database import SessionLocal
+from ..models.task import Task
+from .ai_service import AIService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchJob:
+    job_id: str
+    total: int
+    status: str = "pending"  # pending -> running -> saving -> completed | failed
+    completed: int = 0
+    fallbacks: int = 0
+    task_ids: List[int] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+class BatchTaskGenerator:
+    """Runs batch task generation jobs in the background and tracks their progress.
+
+    Each job generates one task per lesson with bounded concurrency and then
+    writes every ``Task`` row in a single transaction.
+    """
+
+    def __init__(self, ai_service: AIService, keep_jobs: Optional[int] = None):
+        self.ai_service = ai_service
+        self.keep_jobs = keep_jobs or settings.BATCH_GENERATION_KEEP_JOBS
+        self._jobs: "OrderedDict[str, BatchJob]" = OrderedDict()
+        self._running: Dict[str, asyncio.Task] = {}
+
+    def submit(self, lessons: List[Tuple[int, str, Optional[int]]], use_cache: bool = True) -> BatchJob:
+        """Start a job for ``(lesson_id, lesson_content, grade_level)`` tuples."""
+        job = BatchJob(job_id=uuid.uuid4().hex, total=len(lessons))
+        self._jobs[job.job_id] = job
+        while len(self._jobs) > self.keep_jobs:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if oldest_id in self._running:
+                break
+            self._jobs.popitem(last=False)
+
+        runner = asyncio.create_task(self._run(job, lessons, use_cache), name=f"batch-{job.job_id}")
+        self._running[job.job_id] = runner
+        runner.add_done_callback(lambda _t, job_id=job.job_id: self._running.pop(job_id, None))
+        return job
+
+    def get(self, job_id: str) -> Optional[BatchJob]:
+        return self._jobs.get(job_id)
+
+    async def stop(self) -> None:
+        for runner in list(self._running.values()):
+            runner.cancel()
+        await asyncio.gather(*self._running.values(), return_exceptions=True)
+
+    async def _run(self, job: BatchJob, lessons: List[Tuple[int, str, Optional[int]]], use_cache: bool) -> None:
+        def on_progress(lesson_id: int, task: Dict[str, Any], used_fallback: bool) -> None:
+            job.completed += 1
+            if used_fallback:
+                job.fallbacks += 1
+
+        job.status = "running"
+        try:
+            results = await self.ai_service.generate_tasks_batch(
+                lessons, use_cache=use_cache, on_progress=on_progress
+            )
+            job.status = "saving"
+            job.task_ids = await asyncio.to_thread(self._save_tasks, results)
+            job.status = "completed"
+            logger.info(f"Batch job {job.job_id} created {len(job.task_ids)} tasks")
+        except asyncio.CancelledError:
+            job.status = "failed"
+            job.error = "Cancelled"
+            raise
+        except Exception as e:
+            logger.error(f"Batch job {job.job_id} failed: {e}")
+            job.status = "failed"
+            job.error = "Failed to generate tasks. Please try again later."
+
+    @staticmethod
+    def _save_tasks(results: Dict[int, Dict[str, Any]]) -> List[int]:
+        """Insert every generated task in one transaction."""
+        db = SessionLocal()
+        try:
+            db_tasks = [
+                Task(
+                    lesson_id=lesson_id,
+                    title=task_data['title'],
+                    description=task_data['description'],
+                    is_completed=0
+                )
+                for lesson_id, task_data in results.items()
+            ]
+            db.add_all(db_tasks)
+            db.flush()
+            task_ids = [db_task.id for db_task in db_tasks]
+            db.commit()
+            return task_ids
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
@@ -0,0 +1,149 @@
+# File: backend/app/services/circuit_breaker.py
+
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from enum import Enum
+from typing import Dict, Any, Optional, Tuple, Type, Iterator
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"        # Calls flow normally
+    OPEN = "open"            # Calls are rejected immediately
+    HALF_OPEN = "half_open"  # A few probe calls test whether the server recovered
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the model server while the circuit is open."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"LLM circuit open, retry in {retry_after:.0f}s")
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker around the model server.
+
+    The outcomes of the last ``window_size`` calls are kept. Once at least
+    ``minimum_calls`` were seen and the failure rate reaches the threshold,
+    the circuit opens and calls fail fast with ``CircuitOpenError``. After
+    ``open_seconds`` up to ``half_open_max_calls`` probe calls are let
+    through; a successful probe closes the circuit and a failed one reopens it.
+    """
+
+    def __init__(
+        self,
+        window_size: Optional[int] = None,
+        failure_rate_threshold: Optional[float] = None,
+        minimum_calls: Optional[int] = None,
+        open_seconds: Optional[float] = None,
+        half_open_max_calls: int = 1,
+        failure_exceptions: Tuple[Type[BaseException], ...] = (Exception,),
+        ignored_exceptions: Tuple[Type[BaseException], ...] = (),
+    ):
+        self.window_size = window_size or settings.LLM_BREAKER_WINDOW
+        self.failure_rate_threshold = failure_rate_threshold or settings.LLM_BREAKER_FAILURE_RATE
+        self.minimum_calls = minimum_calls or settings.LLM_BREAKER_MIN_CALLS
+        self.open_seconds = open_seconds or settings.LLM_BREAKER_OPEN_SECONDS
+        self.half_open_max_calls = half_open_max_calls
+        self.failure_exceptions = failure_exceptions
+        self.ignored_exceptions = ignored_exceptions
+
+        self.state = CircuitState.CLOSED
+        self._outcomes: deque = deque(maxlen=self.window_size)  # True = failure
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+
+        self.rejected = 0
+        self.times_opened = 0
+
+    @property
+    def failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return sum(self._outcomes) / len(self._outcomes)
+
+    def _transition(self, state: CircuitState) -> None:
+        if state != self.state:
+            log = logger.warning if state == CircuitState.OPEN else logger.info
+            log(f"LLM circuit breaker {self.state.value} -> {state.value}")
+            self.state = state
+        if state == CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+            self.times_opened += 1
+        elif state == CircuitState.CLOSED:
+            self._outcomes.clear()
+
+    def before_call(self) -> bool:
+        """Admit a call or raise ``CircuitOpenError``; returns True for half-open probes."""
+        if self.state == CircuitState.OPEN:
+            remaining = self._opened_at + self.open_seconds - time.monotonic()
+            if remaining > 0:
+                self.rejected += 1
+                raise CircuitOpenError(remaining)
+            self._transition(CircuitState.HALF_OPEN)
+
+        if self.state == CircuitState.HALF_OPEN:
+            if self._probes_in_flight >= self.half_open_max_calls:
+                self.rejected += 1
+                raise CircuitOpenError(1)
+            self._probes_in_flight += 1
+            return True
+        return False
+
+    def on_success(self, probe: bool = False) -> None:
+        if probe:
+            self._probes_in_flight -= 1
+            self._transition(CircuitState.CLOSED)
+            return
+        self._outcomes.append(False)
+
+    def on_failure(self, probe: bool = False) -> None:
+        if probe:
+            self._probes_in_flight -= 1
+            self._transition(CircuitState.OPEN)
+            return
+        self._outcomes.append(True)
+        if (
+            self.state == CircuitState.CLOSED
+            and len(self._outcomes) >= self.minimum_calls
+            and self.failure_rate >= self.failure_rate_threshold
+        ):
+            self._transition(CircuitState.OPEN)
+
+    def on_neutral(self, probe: bool = False) -> None:
+        """The call ended without telling us anything (cancelled or shed)."""
+        if probe:
+            self._probes_in_flight -= 1
+
+    @contextmanager
+    def call(self) -> Iterator[None]:
+        """Guard one call: fail fast while open and record the outcome."""
+        probe = self.before_call()
+        try:
+            yield
+        except self.ignored_exceptions:
+            self.on_neutral(probe)
+            raise
+        except self.failure_exceptions:
+            self.on_failure(probe)
+            raise
+        except BaseException:
+            self.on_neutral(probe)
+            raise
+        else:
+            self.on_success(probe)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state.value,
+            "failure_rate": round(self.failure_rate, 3),
+            "window_calls": len(self._outcomes),
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,171 @@
+# File: backend/app/services/content_safety.py
+
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Terms that are never shown to a child, whatever the grade. Matched as whole
+# words, so inflections are listed; everyday words of children's material
+# ("adult", "scary", "dangerous", "drugstore") must not appear here.
+SAFETY_TERMS = (
+    "violence", "violent", "weapon", "weapons", "gun", "guns", "murder", "murdered",
+    "suicide", "self-harm", "cocaine", "heroin", "narcotics", "illegal drugs",
+    "porn", "pornography", "pornographic", "sexual", "nude", "nudity", "gambling",
+)
+
+# Concepts too advanced for grades up to 5
+ADVANCED_MATH_TERMS = (
+    "quadratic", "equation", "algebra", "calculus", "polynomial",
+    "derivative", "integral", "logarithm", "trigonometry", "matrix"
+)
+
+# Categories matched as whole words; the others only need to start a word,
+# so plurals ("equations") match
+WHOLE_WORD_CATEGORIES = frozenset(("unsafe",))
+
+# Term lists per grade band, grouped by the category reported on a match
+BAND_TERMS: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    "early": {"unsafe": SAFETY_TERMS, "too_advanced": ADVANCED_MATH_TERMS},
+    "elementary": {"unsafe": SAFETY_TERMS, "too_advanced": ADVANCED_MATH_TERMS},
+    "middle": {"unsafe": SAFETY_TERMS},
+    "high": {"unsafe": SAFETY_TERMS},
+}
+
+
+def grade_band(grade_level: Optional[int] = None) -> str:
+    """Map a grade level onto its band; unknown grades get the strictest one."""
+    if grade_level is None or grade_level <= 2:
+        return "early"
+    elif grade_level <= 5:
+        return "elementary"
+    elif grade_level <= 8:
+        return "middle"
+    return "high"
+
+
+class SafetyMatch(NamedTuple):
+    term: str
+    category: str
+    start: int
+    end: int
+
+
+class _CompiledBand:
+    """All terms of one grade band compiled into a single regex alternation."""
+
+    def __init__(self, terms: Dict[str, Tuple[str, ...]]):
+        self.categories = {term.lower(): category for category, words in terms.items() for term in words}
+        # Longest first so a term is never shadowed by one of its prefixes.
+        # Text is lowercased before scanning, which is ~4x faster than IGNORECASE.
+        alternation = "|".join(
+            re.escape(term) + (r"\b" if self.categories[term] in WHOLE_WORD_CATEGORIES else "")
+            for term in sorted(self.categories, key=len, reverse=True)
+        )
+        self.pattern = re.compile(rf"\b(?:{alternation})")
+        self.max_term_length = max(map(len, self.categories))
+
+    def match(self, m: "re.Match", offset: int = 0) -> SafetyMatch:
+        term = m.group(0)
+        return SafetyMatch(term, self.categories[term], offset + m.start(), offset + m.end())
+
+
+class StreamingSafetyScanner:
+    """Scans generated text token by token without rescanning what it has seen.
+
+    Only a tail one character longer than the longest term is kept between
+    feeds, so a term split across two tokens is still found and each match
+    is reported exactly once, with positions relative to the whole stream.
+    A whole-word term at the end of a feed is held back until the next one
+    shows the word is complete; call ``finish`` when the stream ends.
+    """
+
+    def __init__(self, band: _CompiledBand, categories: Optional[Iterable[str]] = None):
+        self._band = band
+        self._categories = None if categories is None else frozenset(categories)
+        self._keep = band.max_term_length + 1
+        self._buffer = ""
+        self._offset = 0  # Stream position of _buffer[0]
+        self._next_start = 0  # Matches starting earlier were already reported
+        self.matches: List[SafetyMatch] = []
+
+    def feed(self, text: str) -> List[SafetyMatch]:
+        """Add generated text and return the matches it completed."""
+        if not text:
+            return []
+        self._buffer += text.lower()
+        found = []
+        for m in self._band.pattern.finditer(self._buffer):
+            # A term at the very start of a trimmed buffer was fully visible
+            # in the previous feed; re-matching it here would ignore the
+            # character before it and the word boundary check
+            if m.start() == 0 and self._offset > 0:
+                continue
+            match = self._band.match(m, self._offset)
+            if match.start < self._next_start:
+                continue
+            if m.end() == len(self._buffer) and match.category in WHOLE_WORD_CATEGORIES:
+                continue  # The word may go on in the next feed
+            self._next_start = match.end
+            if self._categories is None or match.category in self._categories:
+                found.append(match)
+
+        drop = max(0, len(self._buffer) - self._keep)
+        self._buffer = self._buffer[drop:]
+        self._offset += drop
+        self.matches.extend(found)
+        return found
+
+    def finish(self) -> List[SafetyMatch]:
+        """End the stream, reporting a whole-word term held back at its very end."""
+        return self.feed("\n")
+
+    @property
+    def is_safe(self) -> bool:
+        return not self.matches
+
+
+class ContentSafetyEngine:
+    """Single-pass check of AI and user text against the grade band's term lists.
+
+    Every band is compiled once into one regex, so a check is a single scan
+    of the text in C instead of one substring search per keyword.
+    """
+
+    def __init__(self, band_terms: Optional[Dict[str, Dict[str, Tuple[str, ...]]]] = None):
+        self._bands = {band: _CompiledBand(terms) for band, terms in (band_terms or BAND_TERMS).items()}
+
+    def _band(self, grade_level: Optional[int]) -> _CompiledBand:
+        return self._bands[grade_band(grade_level)]
+
+    def scan(
+        self,
+        text: str,
+        grade_level: Optional[int] = None,
+        categories: Optional[Iterable[str]] = None
+    ) -> List[SafetyMatch]:
+        """Return every match in ``text`` with its category and position.
+
+        ``categories`` limits the result, e.g. to ``("unsafe",)`` for free-form
+        answers where an advanced topic is not a reason to refuse.
+        """
+        band = self._band(grade_level)
+        matches = [band.match(m) for m in band.pattern.finditer(text.lower())]
+        if categories is not None:
+            wanted = set(categories)
+            matches = [match for match in matches if match.category in wanted]
+        return matches
+
+    def is_safe(self, text: str, grade_level: Optional[int] = None) -> bool:
+        """True when ``text`` contains no term of the band (stops at the first hit)."""
+        return self._band(grade_level).pattern.search(text.lower()) is None
+
+    def scanner(
+        self,
+        grade_level: Optional[int] = None,
+        categories: Optional[Iterable[str]] = None
+    ) -> StreamingSafetyScanner:
+        """Create a scanner for text that arrives in pieces, e.g. streamed tokens."""
+        return StreamingSafetyScanner(self._band(grade_level), categories)
+
+
+# Shared engine, compiled once at import
+content_safety = ContentSafetyEngine()
@@ -0,0 +1,63 @@
+# File: backend/app/services/deadlines.py
+
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import Context, ContextVar, copy_context
+from typing import Iterator, Optional
+
+# Monotonic time by which the current request must be answered
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceededError(asyncio.TimeoutError):
+    """The caller's request deadline passed; not a failure of the model server."""
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[None]:
+    """Bound everything awaited in the block (and tasks created in it) by ``seconds``.
+
+    Nested scopes can only tighten the deadline. ``None`` leaves it unchanged.
+    """
+    current = _deadline.get()
+    deadline = current
+    if seconds is not None:
+        proposed = time.monotonic() + seconds
+        deadline = proposed if current is None else min(current, proposed)
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def detached_context() -> Context:
+    """A copy of the current context without a deadline, for work shared by several requests."""
+    context = copy_context()
+    context.run(_deadline.set, None)
+    return context
+
+
+def remaining() -> Optional[float]:
+    """Seconds left until the request deadline, or None when there is none."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def expired(slack: float = 0.05) -> bool:
+    """True when the deadline passed; ``slack`` covers timers firing a little early."""
+    left = remaining()
+    return left is not None and left <= slack
+
+
+def clamp(timeout: float) -> float:
+    """Shorten ``timeout`` to the request deadline; raise if it already passed."""
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceededError("Request deadline exceeded")
+    return min(timeout, left)
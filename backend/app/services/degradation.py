@@ -0,0 +1,161 @@
+# File: backend/app/services/degradation.py
+
+import logging
+import time
+from collections import deque
+from enum import IntEnum
+from typing import Dict, Any, List, Optional, Deque, Tuple
+
+from ..core.config import settings
+from .llm_scheduler import LLMScheduler, Priority
+
+logger = logging.getLogger(__name__)
+
+# Successful calls a call site needs before its latencies count as a signal
+MIN_BASELINE_SAMPLES = 5
+
+
+class DegradationLevel(IntEnum):
+    """Steps of the degradation ladder; each level includes the ones below it."""
+    NORMAL = 0
+    COMPACT_PROMPT = 1  # Shorter prompt, less prompt evaluation
+    SHORT_OUTPUT = 2    # Lower num_predict
+    SMALL_MODEL = 3     # Switch to LLM_SMALL_MODEL when one is configured
+    FALLBACK = 4        # Skip the model: template tasks and canned voice answers
+
+
+class DegradationLadder:
+    """Picks how much to degrade AI generation from live load.
+
+    Two signals are compared against per-step thresholds: the number of
+    foreground calls waiting in the ``LLMScheduler`` and the p95 slowdown of
+    successful foreground calls completed within the last ``window_seconds``.
+    A call's slowdown is its latency divided by the median latency of its
+    call site, so a long batch generation only counts as slow when it is slow
+    for a batch. The level is the highest step either signal reaches. Old
+    samples age out, so the level drops again once the burst is over even if
+    no call reached the model in the meantime. Background work always runs
+    at NORMAL.
+    """
+
+    def __init__(
+        self,
+        scheduler: LLMScheduler,
+        queue_thresholds: Optional[List[int]] = None,
+        slowdown_thresholds: Optional[List[float]] = None,
+        window_seconds: Optional[float] = None,
+        enabled: Optional[bool] = None,
+        baseline_samples: Optional[int] = None,
+    ):
+        self.scheduler = scheduler
+        self.queue_thresholds = queue_thresholds or settings.LLM_DEGRADE_QUEUE_THRESHOLDS
+        self.slowdown_thresholds = slowdown_thresholds or settings.LLM_DEGRADE_SLOWDOWN_THRESHOLDS
+        self.window_seconds = window_seconds or settings.LLM_DEGRADE_WINDOW_SECONDS
+        self.enabled = settings.LLM_DEGRADE_ENABLED if enabled is None else enabled
+        self.baseline_samples = baseline_samples or settings.LLM_DEGRADE_BASELINE_SAMPLES
+        self.num_predict = settings.LLM_DEGRADE_NUM_PREDICT
+        self.small_model = settings.LLM_SMALL_MODEL or None
+
+        # Latest successful latencies per call site, whose median is the baseline
+        self._history: Dict[str, Deque[float]] = {}
+        self._slowdowns: Deque[Tuple[float, float]] = deque()  # (finished_at, latency / baseline)
+        self._last_level = DegradationLevel.NORMAL
+        self.level_changes = 0
+
+    def baseline(self, call_site: str) -> Optional[float]:
+        """Median latency of the call site, once it has enough samples to be meaningful."""
+        history = self._history.get(call_site)
+        if not history or len(history) < MIN_BASELINE_SAMPLES:
+            return None
+        samples = sorted(history)
+        return samples[len(samples) // 2]
+
+    def record_latency(self, seconds: float, call_site: str = "other") -> None:
+        """Record the end-to-end time (queue wait included) of a successful foreground call."""
+        baseline = self.baseline(call_site)
+        if baseline:
+            self._slowdowns.append((time.monotonic(), seconds / baseline))
+        history = self._history.get(call_site)
+        if history is None:
+            history = self._history[call_site] = deque(maxlen=self.baseline_samples)
+        history.append(seconds)
+
+    def _recent_slowdowns(self) -> List[float]:
+        cutoff = time.monotonic() - self.window_seconds
+        while self._slowdowns and self._slowdowns[0][0] < cutoff:
+            self._slowdowns.popleft()
+        return sorted(slowdown for _, slowdown in self._slowdowns)
+
+    def slowdown_percentile(self, percentile: float) -> Optional[float]:
+        samples = self._recent_slowdowns()
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(len(samples) * percentile / 100))
+        return samples[index]
+
+    def _queue_depth(self) -> int:
+        return self.scheduler.queue_depth(Priority.INTERACTIVE) + self.scheduler.queue_depth(Priority.TASK)
+
+    @staticmethod
+    def _step(value: Optional[float], thresholds: List[float]) -> int:
+        if value is None:
+            return 0
+        return sum(1 for threshold in thresholds if value >= threshold)
+
+    @property
+    def level(self) -> DegradationLevel:
+        if not self.enabled:
+            return DegradationLevel.NORMAL
+        step = max(
+            self._step(self._queue_depth(), self.queue_thresholds),
+            self._step(self.slowdown_percentile(95), self.slowdown_thresholds),
+        )
+        level = DegradationLevel(min(step, DegradationLevel.FALLBACK))
+        if level != self._last_level:
+            log = logger.warning if level > self._last_level else logger.info
+            log(f"AI degradation level {self._last_level.name} -> {level.name}")
+            self._last_level = level
+            self.level_changes += 1
+        return level
+
+    def level_for(self, priority: Priority) -> DegradationLevel:
+        """The level a call of ``priority`` should run at."""
+        if priority == Priority.BACKGROUND:
+            return DegradationLevel.NORMAL
+        return self.level
+
+    def model_for(self, level: DegradationLevel, model: str) -> str:
+        if level >= DegradationLevel.SMALL_MODEL and self.small_model:
+            return self.small_model
+        return model
+
+    def apply_options(self, level: DegradationLevel, options: Dict[str, Any]) -> Dict[str, Any]:
+        """Cap ``num_predict`` from SHORT_OUTPUT upwards."""
+        if level < DegradationLevel.SHORT_OUTPUT:
+            return options
+        return {**options, "num_predict": min(options.get("num_predict", self.num_predict), self.num_predict)}
+
+    def stats(self) -> Dict[str, Any]:
+        level = self.level
+        samples = self._recent_slowdowns()
+        return {
+            "enabled": self.enabled,
+            "level": int(level),
+            "level_name": level.name.lower(),
+            "level_changes": self.level_changes,
+            "signals": {
+                "queue_depth": self._queue_depth(),
+                "p50_slowdown": self.slowdown_percentile(50),
+                "p95_slowdown": self.slowdown_percentile(95),
+                "samples": len(samples),
+            },
+            "baseline_seconds": {site: self.baseline(site) for site in self._history},
+            "thresholds": {
+                "levels": [step.name.lower() for step in DegradationLevel if step > DegradationLevel.NORMAL],
+                "queue_depth": self.queue_thresholds,
+                "p95_slowdown": self.slowdown_thresholds,
+                "window_seconds": self.window_seconds,
+            },
+            "num_predict": self.num_predict,
+            "small_model": self.small_model,
+        }
@@ -0,0 +1,82 @@
+# File: backend/app/services/hedging.py
+
+from collections import deque
+from typing import Dict, Any, Optional, Deque
+
+from ..core.config import settings
+
+# First-token samples needed before the percentile replaces the maximum delay
+MIN_SAMPLES = 10
+
+
+class HedgePolicy:
+    """Decides when and how often a request may be hedged to a second backend.
+
+    The hedge delay is a percentile of recent time-to-first-token, clamped
+    to ``[min_delay, max_delay]``, so only the slow tail gets a second copy.
+    A token bucket refilled by ``max_ratio`` per request caps hedges at that
+    share of traffic (plus a small burst), so hedging cannot double the load.
+    """
+
+    def __init__(
+        self,
+        percentile: Optional[float] = None,
+        min_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        max_ratio: Optional[float] = None,
+        burst: float = 2.0,
+        window: int = 200,
+    ):
+        self.percentile = percentile or settings.LLM_HEDGE_PERCENTILE
+        self.min_delay = min_delay or settings.LLM_HEDGE_MIN_DELAY
+        self.max_delay = max_delay or settings.LLM_HEDGE_MAX_DELAY
+        self.max_ratio = max_ratio or settings.LLM_HEDGE_MAX_RATIO
+        self.burst = burst
+        self._first_token: Deque[float] = deque(maxlen=window)
+        self._tokens = burst
+
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.rate_limited = 0
+        self.failovers = 0
+
+    def record_first_token(self, seconds: float) -> None:
+        self._first_token.append(seconds)
+
+    def delay(self) -> float:
+        """Seconds to wait for a first token before hedging."""
+        if len(self._first_token) < MIN_SAMPLES:
+            return self.max_delay
+        samples = sorted(self._first_token)
+        index = min(len(samples) - 1, int(len(samples) * self.percentile / 100))
+        return min(self.max_delay, max(self.min_delay, samples[index]))
+
+    def note_request(self) -> None:
+        self.requests += 1
+        self._tokens = min(self.burst, self._tokens + self.max_ratio)
+
+    def try_hedge(self) -> bool:
+        """Spend a hedge token; False when the hedge budget is used up."""
+        if self._tokens < 1:
+            self.rate_limited += 1
+            return False
+        self._tokens -= 1
+        self.hedges += 1
+        return True
+
+    def refund(self) -> None:
+        """Return a token spent on a hedge that could not be started."""
+        self._tokens = min(self.burst, self._tokens + 1)
+        self.hedges -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "delay_seconds": round(self.delay(), 3),
+            "samples": len(self._first_token),
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "rate_limited": self.rate_limited,
+            "failovers": self.failovers,
+        }
@@ -0,0 +1,103 @@
+# File: backend/app/services/json_repair.py
+
+import json
+import re
+from typing import Any, List, Tuple
+
+_FENCE = re.compile(r"```(?:json|JSON)?\s*(.*?)(?:```|$)", re.DOTALL)
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def _strip_fences(text: str) -> str:
+    """Return the body of a markdown code fence, or the text unchanged."""
+    match = _FENCE.search(text)
+    return match.group(1) if match else text
+
+
+def _close(out: str, stack: List[str]) -> str:
+    """Terminate truncated JSON: drop a dangling comma and close open brackets."""
+    out = out.rstrip()
+    if out.endswith(","):
+        out = out[:-1]
+    elif out.endswith(":"):
+        out += " null"
+    return out + "".join(reversed(stack))
+
+
+def _balance(text: str) -> Tuple[str, List[str]]:
+    """Rebuild the first JSON value in ``text``, fixing what a model typically breaks.
+
+    Returns the repaired text plus fallback candidates that end at an earlier
+    comma, for input truncated in the middle of a key or value.
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    cut_points: List[Tuple[int, List[str]]] = []
+    in_string = escape = False
+
+    for ch in text:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch == '"':
+            in_string = True
+        elif ch in _CLOSERS:
+            stack.append(_CLOSERS[ch])
+        elif ch in "}]":
+            # Trailing comma before a closing bracket
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            if not stack or stack[-1] != ch:
+                break
+            stack.pop()
+            out.append(ch)
+            if not stack:
+                # Complete value; anything after it is prose
+                return "".join(out), []
+            continue
+        elif ch == "," and stack:
+            cut_points.append((len(out), list(stack)))
+        out.append(ch)
+
+    if in_string:
+        if escape:
+            out.pop()
+        out.append('"')
+    repaired = _close("".join(out), stack)
+    fallbacks = [_close("".join(out[:position]), saved) for position, saved in reversed(cut_points[-3:])]
+    return repaired, fallbacks
+
+
+def parse_json(text: str) -> Any:
+    """``json.loads`` that tolerates typical LLM damage before giving up.
+
+    Handles markdown code fences, prose around the value, trailing commas,
+    and output truncated inside a string or before closing braces. Raises
+    ``ValueError`` when nothing parseable can be recovered.
+    """
+    try:
+        return json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        pass
+
+    body = _strip_fences(text or "")
+    start = min((i for i in (body.find("{"), body.find("[")) if i >= 0), default=-1)
+    if start < 0:
+        raise ValueError("No JSON object found in model output")
+
+    repaired, fallbacks = _balance(body[start:])
+    for candidate in (repaired, *fallbacks):
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+    raise ValueError("Could not repair model output as JSON")
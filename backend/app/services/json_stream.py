@@ -0,0 +1,117 @@
+# File: backend/app/services/json_stream.py
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+_SIMPLE_ESCAPES = {
+    '"': '"', '\\': '\\', '/': '/',
+    'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t',
+}
+
+
+class IncrementalJSONFieldParser:
+    """Extracts top-level string fields from a JSON object as it streams in.
+
+    ``feed`` accepts arbitrary text fragments (as produced token by token by an
+    LLM) and returns the newly decoded characters of each watched field, so a
+    caller can relay e.g. the ``title`` before the rest of the object exists.
+    Values of fields that are not watched, and nested values, are skipped.
+    """
+
+    def __init__(self, fields: Sequence[str] = ("title", "description")):
+        self.fields = set(fields)
+        self.values: Dict[str, str] = {}
+        self.completed: List[str] = []
+        self.started = False
+        self.closed = False
+
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._unicode: Optional[str] = None
+        self._high_surrogate: Optional[int] = None
+        self._expect_value = False
+        self._string_is_value = False
+        self._buffer: List[str] = []
+        self._current_key: Optional[str] = None
+
+    def _watched_value(self) -> bool:
+        return self._string_is_value and self._depth == 1 and self._current_key in self.fields
+
+    def _emit(self, ch: str, deltas: Dict[str, str]) -> None:
+        if self._watched_value():
+            deltas[self._current_key] = deltas.get(self._current_key, "") + ch
+            self.values[self._current_key] = self.values.get(self._current_key, "") + ch
+        else:
+            self._buffer.append(ch)
+
+    def _decode_unicode(self, code: int, deltas: Dict[str, str]) -> None:
+        if 0xD800 <= code <= 0xDBFF:
+            self._high_surrogate = code
+            return
+        if 0xDC00 <= code <= 0xDFFF and self._high_surrogate is not None:
+            code = 0x10000 + ((self._high_surrogate - 0xD800) << 10) + (code - 0xDC00)
+        self._high_surrogate = None
+        self._emit(chr(code), deltas)
+
+    def _end_string(self) -> None:
+        self._in_string = False
+        if self._depth != 1:
+            return
+        if self._string_is_value:
+            if self._current_key in self.fields:
+                self.values.setdefault(self._current_key, "")
+                self.completed.append(self._current_key)
+            self._expect_value = False
+        else:
+            self._current_key = "".join(self._buffer)
+        self._buffer = []
+
+    def feed(self, text: str) -> List[Tuple[str, str]]:
+        """Consume a fragment; return ``[(field, new_text), ...]`` in field order."""
+        deltas: Dict[str, str] = {}
+        for ch in text:
+            if self.closed:
+                break
+            if self._in_string:
+                if self._unicode is not None:
+                    self._unicode += ch
+                    if len(self._unicode) == 4:
+                        try:
+                            self._decode_unicode(int(self._unicode, 16), deltas)
+                        except ValueError:
+                            pass
+                        self._unicode = None
+                elif self._escape:
+                    self._escape = False
+                    if ch == 'u':
+                        self._unicode = ""
+                    else:
+                        self._emit(_SIMPLE_ESCAPES.get(ch, ch), deltas)
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._end_string()
+                else:
+                    self._emit(ch, deltas)
+                continue
+
+            if ch == '"':
+                if self._depth >= 1:
+                    self._in_string = True
+                    self._string_is_value = self._expect_value
+                    self._buffer = []
+            elif ch in '{[':
+                if ch == '{' and self._depth == 0:
+                    self.started = True
+                self._depth += 1
+            elif ch in '}]':
+                self._depth -= 1
+                if self._depth == 1:
+                    self._expect_value = False
+                elif self._depth == 0 and self.started:
+                    self.closed = True
+            elif ch == ':' and self._depth == 1:
+                self._expect_value = True
+            elif ch == ',' and self._depth == 1:
+                self._expect_value = False
+        return list(deltas.items())
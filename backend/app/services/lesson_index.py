@@ -0,0 +1,249 @@
+# File: backend/app/services/lesson_index.py
+
+import hashlib
+import logging
+import math
+import re
+from collections import Counter
+from typing import Dict, Any, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import object_session
+
+from ..core.config import settings
+from ..models.lesson import Lesson
+
+logger = logging.getLogger(__name__)
+
+# Words too common to say anything about which chunk answers a question
+STOPWORDS = frozenset((
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for",
+    "from", "how", "i", "in", "is", "it", "its", "of", "on", "or", "that", "the",
+    "this", "to", "was", "what", "when", "where", "which", "who", "why", "with", "you",
+))
+
+_WORD = re.compile(r"[a-z0-9]+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+
+def tokenize(text: str) -> List[str]:
+    return [word for word in _WORD.findall(text.lower()) if word not in STOPWORDS]
+
+
+def content_hash(lesson: Lesson) -> str:
+    """Hash of everything a lesson's derived text depends on (grade, title, content)."""
+    text = f"{lesson.grade or ''}\0{lesson.title or ''}\0{lesson.content or ''}"
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough model token count; about four characters per token for English."""
+    return len(text) // 4 + 1
+
+
+def chunk_text(text: str, chunk_words: Optional[int] = None) -> List[str]:
+    """Group whole sentences into chunks of roughly ``chunk_words`` words."""
+    chunk_words = chunk_words or settings.LESSON_CHUNK_WORDS
+    chunks: List[str] = []
+    current: List[str] = []
+    words = 0
+    for sentence in _SENTENCE_END.split(text.strip()):
+        sentence = " ".join(sentence.split())
+        if not sentence:
+            continue
+        current.append(sentence)
+        words += sentence.count(" ") + 1
+        if words >= chunk_words:
+            chunks.append(" ".join(current))
+            current, words = [], 0
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+class LessonChunkIndex:
+    """Okapi BM25 over the chunks of one lesson.
+
+    Lessons are a few dozen chunks at most, so the index is plain term
+    counters per chunk; scoring a query is a loop over its terms.
+    """
+
+    K1 = 1.5
+    B = 0.75
+
+    def __init__(self, title: str, content: str, chunk_words: Optional[int] = None):
+        self.title = title or ""
+        self.chunks = chunk_text(content or "", chunk_words)
+        self._terms = [Counter(tokenize(chunk)) for chunk in self.chunks]
+        self._lengths = [sum(terms.values()) for terms in self._terms]
+        self._avg_length = sum(self._lengths) / len(self._lengths) if self._lengths else 0.0
+        doc_freq = Counter(term for terms in self._terms for term in terms)
+        n = len(self.chunks)
+        self._idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in doc_freq.items()
+        }
+
+    def search(self, query: str, k: int) -> List[Tuple[float, int]]:
+        """Best ``k`` chunks for ``query`` as ``(score, chunk index)``, best first."""
+        query_terms = [term for term in set(tokenize(query)) if term in self._idf]
+        if not query_terms:
+            return []
+        scored = []
+        for i, terms in enumerate(self._terms):
+            norm = self.K1 * (1 - self.B + self.B * self._lengths[i] / (self._avg_length or 1))
+            score = 0.0
+            for term in query_terms:
+                tf = terms.get(term, 0)
+                if tf:
+                    score += self._idf[term] * tf * (self.K1 + 1) / (tf + norm)
+            if score > 0:
+                scored.append((score, i))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return scored[:k]
+
+    def context_for(
+        self,
+        query: str = "",
+        top_k: Optional[int] = None,
+        token_budget: Optional[int] = None,
+        summary: str = "",
+    ) -> str:
+        """Lesson text to put in a prompt: the most relevant chunks within the budget.
+
+        ``summary`` is the default context: it always comes first and matching
+        chunks fill the rest of the budget. Without a summary and without a
+        usable query the lesson's opening chunks are used. Chunks are emitted
+        in lesson order so the excerpt still reads naturally.
+        """
+        top_k = top_k or settings.LESSON_CONTEXT_TOP_K
+        token_budget = token_budget or settings.LESSON_CONTEXT_TOKEN_BUDGET
+
+        ranked = [i for _, i in self.search(query, top_k)] if query else []
+        if not ranked and not summary:
+            ranked = list(range(min(top_k, len(self.chunks))))
+
+        chosen: List[int] = []
+        spent = estimate_tokens(self.title) + (estimate_tokens(summary) if summary else 0)
+        for i in ranked:
+            cost = estimate_tokens(self.chunks[i])
+            if (chosen or summary) and spent + cost > token_budget:
+                continue
+            chosen.append(i)
+            spent += cost
+        parts = [summary] if summary else []
+        parts.extend(self.chunks[i] for i in sorted(chosen))
+        return " ".join(parts)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "chunks": len(self.chunks),
+            "terms": len(self._idf),
+            "tokens": sum(estimate_tokens(chunk) for chunk in self.chunks),
+        }
+
+
+class LessonIndexRegistry:
+    """Chunk indexes per lesson, rebuilt whenever a lesson's text changes.
+
+    Indexes are built eagerly when a lesson row is inserted or updated (see
+    the mapper events below) and lazily for lessons that existed before the
+    process started; the content hash catches edits made outside the ORM.
+    """
+
+    def __init__(self):
+        self._indexes: Dict[int, Tuple[str, LessonChunkIndex]] = {}
+        self.builds = 0
+        self.hits = 0
+        self.summary_errors = 0
+
+    def build(self, lesson: Lesson) -> LessonChunkIndex:
+        index = LessonChunkIndex(lesson.title or "", lesson.content or "")
+        self._indexes[lesson.id] = (content_hash(lesson), index)
+        self.builds += 1
+        logger.debug(f"Indexed lesson {lesson.id} into {len(index.chunks)} chunks")
+        return index
+
+    def get(self, lesson: Lesson) -> LessonChunkIndex:
+        entry = self._indexes.get(lesson.id)
+        if entry and entry[0] == content_hash(lesson):
+            self.hits += 1
+            return entry[1]
+        return self.build(lesson)
+
+    def invalidate(self, lesson_id: int) -> None:
+        self._indexes.pop(lesson_id, None)
+
+    @staticmethod
+    def _stored_summary(lesson: Lesson) -> str:
+        """The stored summary and key terms, or "" when missing or stale; raises if unreadable."""
+        summary = lesson.summary
+        if summary is None or summary.content_hash != content_hash(lesson):
+            return ""
+        terms = summary.terms
+        if terms:
+            return f"{summary.summary} Key terms: {', '.join(terms)}."
+        return summary.summary
+
+    def _read_summary(self, lesson: Lesson) -> Optional[str]:
+        """``_stored_summary``, or None when the summaries table cannot be queried."""
+        try:
+            return self._stored_summary(lesson)
+        except SQLAlchemyError as e:
+            self.summary_errors += 1
+            logger.error(f"Could not load the summary of lesson {lesson.id}: {e}")
+            session = object_session(lesson)
+            if session is not None:
+                session.rollback()
+            return None
+
+    def summary_for(self, lesson: Lesson) -> str:
+        """The lesson's stored summary and key terms, or "" when missing or stale.
+
+        When summaries cannot be read at all the opening of the lesson
+        content is returned instead, within the context token budget.
+        """
+        summary = self._read_summary(lesson)
+        if summary is not None:
+            return summary
+        if not lesson.content:
+            return lesson.title or ""
+        return self.get(lesson).context_for()
+
+    def context_for(self, lesson: Lesson, query: Optional[str] = None) -> str:
+        """Prompt text for ``lesson``.
+
+        Without a query this is the lesson summary when one is current; with
+        a query, or before the summary exists, the chunks relevant to the
+        query (default: the title) are added within the token budget.
+        """
+        summary = self._read_summary(lesson) or ""
+        if query is None and summary:
+            return summary
+        if not lesson.content:
+            return lesson.title or "General learning activity"
+        return self.get(lesson).context_for(query or lesson.title or "", summary=summary)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "lessons": len(self._indexes),
+            "chunks": sum(index.stats()["chunks"] for _, index in self._indexes.values()),
+            "builds": self.builds,
+            "hits": self.hits,
+            "summary_errors": self.summary_errors,
+        }
+
+
+lesson_index = LessonIndexRegistry()
+
+
+@event.listens_for(Lesson, "after_insert")
+@event.listens_for(Lesson, "after_update")
+def _index_lesson(mapper, connection, target: Lesson) -> None:
+    lesson_index.build(target)
+
+
+@event.listens_for(Lesson, "after_delete")
+def _drop_lesson(mapper, connection, target: Lesson) -> None:
+    lesson_index.invalidate(target.id)
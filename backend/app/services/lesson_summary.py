@@ -0,0 +1,124 @@
+# File: backend/app/services/lesson_summary.py
+
+import asyncio
+import json
+import logging
+from typing import Dict, Any, Optional, List, Tuple
+
+from sqlalchemy.orm import joinedload
+
+from ..core.config import settings
+from ..database import SessionLocal
+from ..models.lesson import Lesson
+from ..models.lesson_summary import LessonSummary
+from .ai_service import AIService
+from .lesson_index import content_hash
+from .llm_scheduler import Priority
+
+logger = logging.getLogger(__name__)
+
+# (lesson_id, grade, title, content, content hash) of a lesson needing a summary
+StaleLesson = Tuple[int, Optional[int], str, str, str]
+
+
+class LessonSummaryJob:
+    """Keeps a grade-appropriate summary and key terms for every lesson revision.
+
+    A background task started from the application lifespan periodically
+    looks for lessons whose stored summary is missing or was made from a
+    different content hash, and summarizes them one at a time at BACKGROUND
+    priority while the model server is idle. Unchanged lessons are never
+    summarized twice.
+    """
+
+    def __init__(
+        self,
+        ai_service: AIService,
+        interval: Optional[float] = None,
+        idle_seconds: Optional[float] = None,
+    ):
+        self.ai_service = ai_service
+        self.interval = interval or settings.LESSON_SUMMARY_INTERVAL_SECONDS
+        self.idle_seconds = idle_seconds if idle_seconds is not None else settings.LESSON_SUMMARY_IDLE_SECONDS
+        self._task: Optional[asyncio.Task] = None
+
+        self.pending = 0
+        self.summarized = 0
+        self.failures = 0
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="lesson-summary-job")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    @staticmethod
+    def _stale_lessons() -> List[StaleLesson]:
+        db = SessionLocal()
+        try:
+            stale = []
+            for lesson in db.query(Lesson).options(joinedload(Lesson.summary)).all():
+                digest = content_hash(lesson)
+                if lesson.content and (lesson.summary is None or lesson.summary.content_hash != digest):
+                    stale.append((lesson.id, lesson.grade, lesson.title or "", lesson.content, digest))
+            return stale
+        finally:
+            db.close()
+
+    def _save(self, lesson_id: int, digest: str, result: Dict[str, Any]) -> None:
+        db = SessionLocal()
+        try:
+            summary = db.get(LessonSummary, lesson_id) or LessonSummary(lesson_id=lesson_id)
+            summary.content_hash = digest
+            summary.summary = result["summary"]
+            summary.key_terms = json.dumps(result["key_terms"])
+            summary.model = self.ai_service.model_name
+            db.add(summary)
+            db.commit()
+        finally:
+            db.close()
+
+    async def _wait_for_idle(self) -> None:
+        while not self.ai_service.client.is_idle(self.idle_seconds):
+            await asyncio.sleep(self.idle_seconds / 2 or 0.1)
+
+    async def run_once(self) -> int:
+        """Summarize every lesson whose summary is missing or stale; returns how many were."""
+        stale = await asyncio.to_thread(self._stale_lessons)
+        self.pending = len(stale)
+        done = 0
+        for lesson_id, grade, title, content, digest in stale:
+            await self._wait_for_idle()
+            result = await self.ai_service.summarize_lesson_with_ollama(
+                title, content, grade, priority=Priority.BACKGROUND
+            )
+            self.pending -= 1
+            if result is None:
+                self.failures += 1
+                continue
+            await asyncio.to_thread(self._save, lesson_id, digest, result)
+            self.summarized += 1
+            done += 1
+            logger.info(f"Summarized lesson {lesson_id} ({len(result['key_terms'])} key terms)")
+        return done
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Lesson summary job failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "pending": self.pending,
+            "summarized": self.summarized,
+            "failures": self.failures,
+        }
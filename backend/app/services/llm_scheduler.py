@@ -0,0 +1,177 @@
+# File: backend/app/services/llm_scheduler.py
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Dict, Any, Optional, Deque, AsyncIterator
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """LLM call classes; lower values are served first."""
+    INTERACTIVE = 0  # A child is waiting on a spoken answer
+    TASK = 1         # Task generation from the lesson screens
+    BACKGROUND = 2   # Pre-generation, batch jobs, maintenance
+
+
+class LLMOverloadedError(Exception):
+    """Raised when a call is shed instead of queued, or waits past its queue deadline."""
+
+    def __init__(self, priority: Priority, reason: str, retry_after: int = 1):
+        self.priority = priority
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(f"LLM {priority.name.lower()} request shed: {reason}")
+
+
+class LLMScheduler:
+    """Priority-aware admission control in front of the model server.
+
+    At most ``max_concurrency`` generations run at once. Further calls wait in
+    a bounded per-priority queue and are admitted strictly by priority, FIFO
+    within a class. Calls are shed with ``LLMOverloadedError`` when their queue
+    is full or when they have waited longer than their queue deadline.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        queue_limits: Optional[Dict[Priority, int]] = None,
+        queue_timeouts: Optional[Dict[Priority, float]] = None,
+    ):
+        self.max_concurrency = max_concurrency or settings.LLM_MAX_CONCURRENCY
+        self.queue_limits = queue_limits or {
+            Priority.INTERACTIVE: settings.LLM_QUEUE_LIMIT_INTERACTIVE,
+            Priority.TASK: settings.LLM_QUEUE_LIMIT_TASK,
+            Priority.BACKGROUND: settings.LLM_QUEUE_LIMIT_BACKGROUND,
+        }
+        self.queue_timeouts = queue_timeouts or {
+            Priority.INTERACTIVE: settings.LLM_QUEUE_TIMEOUT_INTERACTIVE,
+            Priority.TASK: settings.LLM_QUEUE_TIMEOUT_TASK,
+            Priority.BACKGROUND: settings.LLM_QUEUE_TIMEOUT_BACKGROUND,
+        }
+
+        self._queues: Dict[Priority, Deque[asyncio.Future]] = {p: deque() for p in Priority}
+        self._active: Dict[Priority, int] = {p: 0 for p in Priority}
+        self._handed_over = 0  # Slots released to a waiter that has not resumed yet
+        self.last_foreground_at = 0.0
+        self._service_time = 5.0  # EWMA of slot hold time, seeds Retry-After estimates
+
+        self.admitted = {p: 0 for p in Priority}
+        self.shed = {p: 0 for p in Priority}
+        self.expired = {p: 0 for p in Priority}
+        self._wait_total = {p: 0.0 for p in Priority}
+
+    @property
+    def active(self) -> int:
+        return sum(self._active.values())
+
+    def queue_depth(self, priority: Optional[Priority] = None) -> int:
+        if priority is not None:
+            return len(self._queues[priority])
+        return sum(len(q) for q in self._queues.values())
+
+    def retry_after(self) -> int:
+        """Rough seconds until the current backlog drains."""
+        backlog = self.queue_depth() + self.active
+        return max(1, int(backlog * self._service_time / self.max_concurrency))
+
+    def is_idle(self, idle_seconds: float) -> bool:
+        """True when no foreground call is running or queued, nor finished recently."""
+        busy = any(
+            self._active[p] or self._queues[p]
+            for p in Priority if p != Priority.BACKGROUND
+        )
+        return not busy and time.monotonic() - self.last_foreground_at >= idle_seconds
+
+    def _grant(self, priority: Priority, waited: float, handed_over: bool = False) -> None:
+        if handed_over:
+            self._handed_over -= 1
+        self._active[priority] += 1
+        self.admitted[priority] += 1
+        self._wait_total[priority] += waited
+
+    def try_acquire(self, priority: Priority) -> bool:
+        """Take a free slot without queueing; False when none is free."""
+        if self.active + self._handed_over < self.max_concurrency and self.queue_depth() == 0:
+            self._grant(priority, 0.0)
+            return True
+        return False
+
+    async def acquire(self, priority: Priority, queue_timeout: Optional[float] = None) -> None:
+        if self.try_acquire(priority):
+            return
+
+        queue = self._queues[priority]
+        if len(queue) >= self.queue_limits[priority]:
+            self.shed[priority] += 1
+            raise LLMOverloadedError(priority, "queue full", self.retry_after())
+
+        timeout = queue_timeout if queue_timeout is not None else self.queue_timeouts[priority]
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        enqueued_at = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter in queue:
+                queue.remove(waiter)
+            elif waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self._grant(priority, time.monotonic() - enqueued_at, handed_over=True)
+                self.release(priority)
+            if isinstance(e, asyncio.TimeoutError):
+                self.expired[priority] += 1
+                raise LLMOverloadedError(priority, "queue deadline exceeded", self.retry_after())
+            raise
+        self._grant(priority, time.monotonic() - enqueued_at, handed_over=True)
+
+    def release(self, priority: Priority, held_for: Optional[float] = None) -> None:
+        self._active[priority] -= 1
+        if priority != Priority.BACKGROUND:
+            self.last_foreground_at = time.monotonic()
+        if held_for is not None:
+            self._service_time = 0.8 * self._service_time + 0.2 * held_for
+        for p in Priority:
+            queue = self._queues[p]
+            while queue:
+                waiter = queue.popleft()
+                if not waiter.done():
+                    self._handed_over += 1
+                    waiter.set_result(None)
+                    return
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority, queue_timeout: Optional[float] = None) -> AsyncIterator[None]:
+        """Hold one model-server slot for the duration of the block."""
+        await self.acquire(priority, queue_timeout)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(priority, time.monotonic() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self.active,
+            "retry_after": self.retry_after(),
+            "classes": {
+                p.name.lower(): {
+                    "active": self._active[p],
+                    "queued": len(self._queues[p]),
+                    "queue_limit": self.queue_limits[p],
+                    "admitted": self.admitted[p],
+                    "shed": self.shed[p],
+                    "expired": self.expired[p],
+                    "avg_wait_seconds": round(self._wait_total[p] / self.admitted[p], 3) if self.admitted[p] else 0.0,
+                }
+                for p in Priority
+            },
+        }
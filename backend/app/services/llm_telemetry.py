@@ -0,0 +1,73 @@
+# File: backend/app/services/llm_telemetry.py
+
+from collections import defaultdict
+from typing import Dict, Any
+
+# Ollama reports load_duration on every call; anything above this was a real load
+LOAD_STALL_SECONDS = 0.5
+
+
+class TelemetryBucket:
+    """Running totals of Ollama's timing fields for one model or call site."""
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.eval_tokens = 0
+        self.prompt_eval_seconds = 0.0
+        self.eval_seconds = 0.0
+        self.load_seconds = 0.0
+        self.total_seconds = 0.0
+        self.load_stalls = 0
+
+    def add(self, result: Dict[str, Any]) -> None:
+        self.calls += 1
+        self.prompt_tokens += result.get("prompt_eval_count") or 0
+        self.eval_tokens += result.get("eval_count") or 0
+        # Durations are reported in nanoseconds
+        self.prompt_eval_seconds += (result.get("prompt_eval_duration") or 0) / 1e9
+        self.eval_seconds += (result.get("eval_duration") or 0) / 1e9
+        load_seconds = (result.get("load_duration") or 0) / 1e9
+        self.load_seconds += load_seconds
+        self.total_seconds += (result.get("total_duration") or 0) / 1e9
+        if load_seconds >= LOAD_STALL_SECONDS:
+            self.load_stalls += 1
+
+    def stats(self) -> Dict[str, Any]:
+        busy_seconds = self.prompt_eval_seconds + self.eval_seconds
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "eval_tokens": self.eval_tokens,
+            "prompt_tokens_per_second": round(self.prompt_tokens / self.prompt_eval_seconds, 1) if self.prompt_eval_seconds else None,
+            "eval_tokens_per_second": round(self.eval_tokens / self.eval_seconds, 1) if self.eval_seconds else None,
+            # Share of compute spent reading the prompt rather than writing the answer
+            "prompt_eval_share": round(self.prompt_eval_seconds / busy_seconds, 3) if busy_seconds else None,
+            "avg_total_seconds": round(self.total_seconds / self.calls, 3) if self.calls else None,
+            "load_stalls": self.load_stalls,
+            "load_seconds": round(self.load_seconds, 3),
+        }
+
+
+class LLMTelemetry:
+    """Aggregates token counts and timings from Ollama responses.
+
+    Every final response carries ``prompt_eval_count``, ``eval_count`` and
+    the ``*_duration`` fields; they are summed per model and per call site
+    (task generation, voice, ...), so the metrics show throughput, how much
+    time goes into prompt evaluation and how often a call waited on a load.
+    """
+
+    def __init__(self):
+        self.by_model: Dict[str, TelemetryBucket] = defaultdict(TelemetryBucket)
+        self.by_call_site: Dict[str, TelemetryBucket] = defaultdict(TelemetryBucket)
+
+    def record(self, model: str, call_site: str, result: Dict[str, Any]) -> None:
+        self.by_model[model].add(result)
+        self.by_call_site[call_site].add(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "by_model": {model: bucket.stats() for model, bucket in self.by_model.items()},
+            "by_call_site": {site: bucket.stats() for site, bucket in self.by_call_site.items()},
+        }
@@ -0,0 +1,198 @@
+# File: backend/app/services/model_residency.py
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, AsyncIterator, List, Optional, Union
+
+from ..core.config import settings
+from .llm_telemetry import LOAD_STALL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class ModelStats:
+    def __init__(self):
+        self.loaded = False
+        self.last_used = 0.0
+        self.in_flight = 0  # Requests using the model right now
+        self.unloading: Optional[asyncio.Event] = None  # Set once a running unload finishes
+        self.loads = 0
+        self.load_seconds_total = 0.0
+        self.last_load_seconds = 0.0
+        self.unloads = 0
+        self.last_unload_seconds = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "loaded": self.loaded,
+            "idle_seconds": round(now - self.last_used, 1) if self.last_used else None,
+            "in_flight": self.in_flight,
+            "loads": self.loads,
+            "last_load_seconds": round(self.last_load_seconds, 3),
+            "avg_load_seconds": round(self.load_seconds_total / self.loads, 3) if self.loads else 0.0,
+            "unloads": self.unloads,
+            "last_unload_seconds": round(self.last_unload_seconds, 3),
+        }
+
+
+def keep_alive_value(keep_alive: Union[str, int, float]) -> Union[str, int, float]:
+    """Ollama parses string keep_alives as Go durations, which need a unit; bare numbers are seconds."""
+    if isinstance(keep_alive, str):
+        try:
+            return int(keep_alive)
+        except ValueError:
+            try:
+                return float(keep_alive)
+            except ValueError:
+                return keep_alive
+    return keep_alive
+
+
+class ModelResidencyManager:
+    """Keeps the primary model resident and the memory footprint bounded.
+
+    At startup the configured models are warmed with a one-token prompt so
+    the first student does not pay the load time. Every LLM request gets a
+    ``keep_alive``: the primary model uses ``OLLAMA_KEEP_ALIVE`` while
+    secondary models get a short one and are unloaded explicitly once idle,
+    so a 4 GB device never holds two models for long.
+    """
+
+    def __init__(
+        self,
+        client,
+        primary_model: Optional[str] = None,
+        warmup_models: Optional[List[str]] = None,
+        keep_alive: Optional[str] = None,
+        secondary_keep_alive: Optional[str] = None,
+        secondary_idle_seconds: Optional[float] = None,
+    ):
+        self.client = client
+        self.primary_model = primary_model or settings.OLLAMA_MODEL
+        self.warmup_models = warmup_models or settings.OLLAMA_WARMUP_MODELS or [self.primary_model]
+        self.keep_alive = keep_alive or settings.OLLAMA_KEEP_ALIVE
+        self.secondary_keep_alive = secondary_keep_alive or settings.OLLAMA_SECONDARY_KEEP_ALIVE
+        self.secondary_idle_seconds = secondary_idle_seconds or settings.OLLAMA_SECONDARY_IDLE_UNLOAD_SECONDS
+        self.models: Dict[str, ModelStats] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def _model(self, name: str) -> ModelStats:
+        if name not in self.models:
+            self.models[name] = ModelStats()
+        return self.models[name]
+
+    def prepare(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Add the model's keep_alive to an outgoing request and mark the model used."""
+        model = payload.get("model", self.primary_model)
+        self._model(model).last_used = time.monotonic()
+        if "keep_alive" in payload:
+            return payload
+        keep_alive = self.keep_alive if model == self.primary_model else self.secondary_keep_alive
+        return {**payload, "keep_alive": keep_alive_value(keep_alive)}
+
+    @asynccontextmanager
+    async def in_use(self, model: str) -> AsyncIterator[None]:
+        """Mark ``model`` busy for the duration of a request so it is not unloaded under it.
+
+        A request arriving while the model is being unloaded waits for the
+        unload to finish, so Ollama loads the model again for it instead of
+        dropping it mid-request.
+        """
+        stats = self._model(model)
+        while stats.unloading is not None:
+            await stats.unloading.wait()
+        stats.in_flight += 1
+        try:
+            yield
+        finally:
+            stats.in_flight -= 1
+            stats.last_used = time.monotonic()
+
+    def observe(self, model: str, result: Dict[str, Any]) -> None:
+        """Mark the model loaded after a successful response; record load stalls (``load_duration``, ns)."""
+        stats = self._model(model)
+        stats.loaded = True
+        load_seconds = (result.get("load_duration") or 0) / 1e9
+        if load_seconds >= LOAD_STALL_SECONDS:
+            stats.loads += 1
+            stats.load_seconds_total += load_seconds
+            stats.last_load_seconds = load_seconds
+            logger.info(f"Model {model} loaded in {load_seconds:.1f}s")
+
+    async def start(self, warmup: bool = True) -> None:
+        """Warm the configured models in the background and start idle unloading."""
+        if warmup:
+            self._tasks.append(asyncio.create_task(self.warmup(), name="model-warmup"))
+        self._tasks.append(asyncio.create_task(self._idle_loop(), name="model-idle-unload"))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def warmup(self) -> None:
+        """Load each warmup model on every healthy backend with a one-token prompt."""
+        for model in self.warmup_models:
+            payload = self.prepare({
+                "model": model,
+                "prompt": "Hi",
+                "stream": False,
+                "options": {"num_predict": 1},
+            })
+            for backend in self.client.backends.healthy_backends():
+                started = time.monotonic()
+                try:
+                    result = await self.client.generate_on(backend, payload, timeout=300)
+                except Exception as e:
+                    logger.warning(f"Warmup of {model} on {backend.url} failed: {e}")
+                    continue
+                self.observe(model, result)
+                self.client.telemetry.record(model, "warmup", result)
+                logger.info(f"Warmed {model} on {backend.url} in {time.monotonic() - started:.1f}s")
+
+    async def unload(self, model: str) -> None:
+        """Ask every backend to drop the model from memory (keep_alive=0)."""
+        stats = self._model(model)
+        started = time.monotonic()
+        # Requests for the model wait in in_use() until the unload is through
+        stats.unloading = asyncio.Event()
+        try:
+            for backend in self.client.backends.healthy_backends():
+                try:
+                    await self.client.generate_on(backend, {"model": model, "keep_alive": 0}, timeout=30)
+                except Exception as e:
+                    logger.warning(f"Unloading {model} on {backend.url} failed: {e}")
+        finally:
+            stats.unloading.set()
+            stats.unloading = None
+        stats.loaded = False
+        stats.unloads += 1
+        stats.last_unload_seconds = time.monotonic() - started
+        logger.info(f"Unloaded idle model {model} in {stats.last_unload_seconds:.2f}s")
+
+    async def _idle_loop(self) -> None:
+        interval = max(1.0, self.secondary_idle_seconds / 4)
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            for model, stats in list(self.models.items()):
+                if model == self.primary_model or not stats.loaded or stats.in_flight:
+                    continue
+                if now - stats.last_used >= self.secondary_idle_seconds:
+                    try:
+                        await self.unload(model)
+                    except Exception as e:
+                        logger.error(f"Idle unload of {model} failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "primary_model": self.primary_model,
+            "keep_alive": self.keep_alive,
+            "secondary_keep_alive": self.secondary_keep_alive,
+            "secondary_idle_seconds": self.secondary_idle_seconds,
+            "models": {name: stats.as_dict() for name, stats in self.models.items()},
+        }
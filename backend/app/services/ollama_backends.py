@@ -0,0 +1,163 @@
+# File: backend/app/services/ollama_backends.py
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Iterable, AsyncIterator
+
+import aiohttp
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class OllamaBackend:
+    """One Ollama model server and its live routing/health state."""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.healthy = True
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.requests = 0
+        self.failures = 0
+        self.ejections = 0
+        self.last_error: Optional[str] = None
+        self.last_probe_at = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+            "ejections": self.ejections,
+            "last_error": self.last_error,
+        }
+
+
+class NoHealthyBackendError(Exception):
+    """Raised when every configured Ollama backend has been ejected."""
+
+
+class BackendPool:
+    """Routes requests across several Ollama servers.
+
+    Requests go to the healthy backend with the fewest outstanding requests.
+    A backend is ejected after ``eject_after`` consecutive failures, and a
+    periodic ``/api/tags`` probe re-admits it once it answers again.
+    """
+
+    def __init__(
+        self,
+        urls: Optional[Iterable[str]] = None,
+        health_interval: Optional[float] = None,
+        eject_after: Optional[int] = None,
+        probe_timeout: float = 5,
+    ):
+        urls = list(urls or settings.OLLAMA_API_URLS or [settings.OLLAMA_API_URL])
+        self.backends: List[OllamaBackend] = [OllamaBackend(url) for url in urls]
+        self.health_interval = health_interval or settings.OLLAMA_HEALTH_CHECK_INTERVAL
+        self.eject_after = eject_after or settings.OLLAMA_EJECT_AFTER_FAILURES
+        self.probe_timeout = probe_timeout
+        self._health_task: Optional[asyncio.Task] = None
+
+    @property
+    def primary(self) -> OllamaBackend:
+        return self.backends[0]
+
+    def healthy_backends(self) -> List[OllamaBackend]:
+        return [backend for backend in self.backends if backend.healthy]
+
+    def pick(self, exclude: Iterable[OllamaBackend] = ()) -> OllamaBackend:
+        """Least-outstanding-requests choice among healthy backends."""
+        excluded = set(id(backend) for backend in exclude)
+        candidates = [b for b in self.healthy_backends() if id(b) not in excluded]
+        if not candidates:
+            raise NoHealthyBackendError("No healthy Ollama backend available")
+        # min() keeps configuration order on ties, so the first URL is preferred
+        return min(candidates, key=lambda backend: backend.outstanding)
+
+    @asynccontextmanager
+    async def lease(self, exclude: Iterable[OllamaBackend] = ()) -> AsyncIterator[OllamaBackend]:
+        """Pick a backend and count the request against it while the block runs."""
+        async with self.use(self.pick(exclude)) as backend:
+            yield backend
+
+    @asynccontextmanager
+    async def use(self, backend: OllamaBackend) -> AsyncIterator[OllamaBackend]:
+        """Count a request against a specific backend while the block runs."""
+        backend.outstanding += 1
+        backend.requests += 1
+        try:
+            yield backend
+        finally:
+            backend.outstanding -= 1
+
+    def record_success(self, backend: OllamaBackend) -> None:
+        backend.consecutive_failures = 0
+
+    def record_failure(self, backend: OllamaBackend, error: BaseException) -> None:
+        backend.failures += 1
+        backend.consecutive_failures += 1
+        backend.last_error = str(error) or type(error).__name__
+        if backend.healthy and backend.consecutive_failures >= self.eject_after:
+            backend.healthy = False
+            backend.ejections += 1
+            logger.warning(f"Ejected Ollama backend {backend.url}: {backend.last_error}")
+
+    async def probe(self, backend: OllamaBackend, session: aiohttp.ClientSession) -> bool:
+        """GET /api/tags on one backend and update its health."""
+        backend.last_probe_at = time.monotonic()
+        try:
+            async with session.get(
+                f"{backend.url}/api/tags",
+                timeout=aiohttp.ClientTimeout(total=self.probe_timeout),
+            ) as response:
+                ok = response.status == 200
+                error = None if ok else f"health probe returned {response.status}"
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            ok, error = False, f"health probe failed: {e or type(e).__name__}"
+
+        if ok:
+            if not backend.healthy:
+                logger.info(f"Re-admitted Ollama backend {backend.url}")
+            backend.healthy = True
+            backend.consecutive_failures = 0
+        else:
+            backend.last_error = error
+            if backend.healthy:
+                backend.healthy = False
+                backend.ejections += 1
+                logger.warning(f"Ejected Ollama backend {backend.url}: {error}")
+        return ok
+
+    async def probe_all(self, session: aiohttp.ClientSession) -> None:
+        await asyncio.gather(*(self.probe(backend, session) for backend in self.backends))
+
+    def start(self, get_session: Callable[[], Awaitable[aiohttp.ClientSession]]) -> None:
+        """Start the periodic health check loop."""
+        if self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop(get_session), name="ollama-health")
+
+    async def stop(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+
+    async def _health_loop(self, get_session: Callable[[], Awaitable[aiohttp.ClientSession]]) -> None:
+        while True:
+            try:
+                await self.probe_all(await get_session())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ollama health check failed: {e}")
+            await asyncio.sleep(self.health_interval)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [backend.stats() for backend in self.backends]
@@ -0,0 +1,472 @@
+# File: backend/app/services/ollama_client.py
+
+import asyncio
+import json
+import logging
+import time
+from contextlib import nullcontext
+from typing import Dict, Any, Optional, AsyncIterator
+
+import aiohttp
+
+from ..core.config import settings
+from . import deadlines
+from .circuit_breaker import CircuitBreaker
+from .degradation import DegradationLadder
+from .hedging import HedgePolicy
+from .llm_scheduler import LLMOverloadedError, LLMScheduler, Priority
+from .llm_telemetry import LLMTelemetry
+from .ollama_backends import BackendPool, NoHealthyBackendError
+from .single_flight import SingleFlight, fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+class OllamaError(Exception):
+    """Raised when the Ollama API answers with a non-200 status."""
+
+    def __init__(self, status: int, message: str = ""):
+        self.status = status
+        super().__init__(message or f"Ollama API returned status {status}")
+
+
+class OllamaClient:
+    """Long-lived, connection-pooled HTTP client for the Ollama API.
+
+    One instance is created in the application lifespan and shared by every
+    service that talks to the model server, so requests reuse keep-alive
+    connections instead of opening a new TCP connection per call. Every
+    generation holds a slot of the priority-aware ``LLMScheduler`` and is
+    routed to one of the healthy servers in the ``BackendPool``. While the
+    ``CircuitBreaker`` is open, calls fail fast with ``CircuitOpenError``.
+    When a ``ModelResidencyManager`` is attached as ``residency``, it adds
+    ``keep_alive`` to each request and records model load stalls. Token
+    counts and timings of every response are aggregated in ``telemetry``
+    under the model and the caller's ``call_site``, and the end-to-end
+    latency of foreground calls feeds the ``DegradationLadder``. Queue waits
+    and request timeouts are cut to the caller's request deadline (see
+    ``deadlines``); cancelling a call aborts the HTTP request and frees its
+    scheduler slot.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        pool_limit: Optional[int] = None,
+        pool_limit_per_host: Optional[int] = None,
+        keepalive_timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        scheduler: Optional[LLMScheduler] = None,
+        backends: Optional[BackendPool] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.backends = backends or BackendPool([base_url] if base_url else None)
+        self.base_url = self.backends.primary.url
+        self.pool_limit = pool_limit or settings.OLLAMA_POOL_LIMIT
+        self.pool_limit_per_host = pool_limit_per_host or settings.OLLAMA_POOL_LIMIT_PER_HOST
+        self.keepalive_timeout = keepalive_timeout or settings.OLLAMA_KEEPALIVE_TIMEOUT
+        self.connect_timeout = connect_timeout or settings.OLLAMA_CONNECT_TIMEOUT
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_lock = asyncio.Lock()
+        self.scheduler = scheduler or LLMScheduler()
+        self.breaker = breaker or CircuitBreaker(
+            failure_exceptions=(OllamaError, NoHealthyBackendError, aiohttp.ClientError, asyncio.TimeoutError),
+            ignored_exceptions=(LLMOverloadedError, deadlines.DeadlineExceededError),
+        )
+        self.single_flight = SingleFlight()
+        self.telemetry = LLMTelemetry()
+        self.degradation = DegradationLadder(self.scheduler)
+        self.hedging = HedgePolicy()
+        self.residency = None
+
+    async def start(self) -> None:
+        """Create the pooled session and start backend health checks (idempotent)."""
+        await self._get_session()
+        self.backends.start(self._get_session)
+
+    async def close(self) -> None:
+        """Stop health checks and close the pooled session and all of its connections."""
+        await self.backends.stop()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is not None and not self._session.closed:
+            return self._session
+        async with self._session_lock:
+            if self._session is None or self._session.closed:
+                connector = aiohttp.TCPConnector(
+                    limit=self.pool_limit,
+                    limit_per_host=self.pool_limit_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                )
+                self._session = aiohttp.ClientSession(
+                    connector=connector,
+                    headers={'Content-Type': 'application/json'},
+                )
+                logger.info(
+                    f"Opened Ollama connection pool to {self.base_url} "
+                    f"(limit={self.pool_limit}, per_host={self.pool_limit_per_host})"
+                )
+        return self._session
+
+    def _timeout(self, total: float) -> aiohttp.ClientTimeout:
+        return aiohttp.ClientTimeout(total=total, connect=self.connect_timeout, sock_read=total)
+
+    def _prepare(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if self.residency is None:
+            return payload
+        return self.residency.prepare(payload)
+
+    def _in_use(self, payload: Dict[str, Any]):
+        """Keeps the payload's model from being unloaded as idle while the request runs."""
+        if self.residency is None:
+            return nullcontext()
+        return self.residency.in_use(payload.get("model", self.residency.primary_model))
+
+    def _observe(self, payload: Dict[str, Any], result: Dict[str, Any], call_site: str) -> None:
+        model = payload.get("model", "")
+        self.telemetry.record(model, call_site, result)
+        if self.residency is not None:
+            self.residency.observe(model, result)
+
+    def _stream_finished(
+        self,
+        payload: Dict[str, Any],
+        result: Dict[str, Any],
+        priority: Priority,
+        call_site: str,
+        started: float
+    ) -> None:
+        self._observe(payload, result, call_site)
+        if priority != Priority.BACKGROUND:
+            self.degradation.record_latency(time.monotonic() - started, call_site)
+
+    @staticmethod
+    def _partial_result(payload: Dict[str, Any], sent_at: float, first_at: float, received: int) -> Dict[str, Any]:
+        """Timing fields for a stream closed before Ollama's final chunk; one chunk is one token."""
+        now = time.monotonic()
+        return {
+            "model": payload.get("model"),
+            "eval_count": received,
+            "eval_duration": int((now - first_at) * 1e9),
+            "total_duration": int((now - sent_at) * 1e9),
+        }
+
+    def _queue_timeout(self, priority: Priority) -> float:
+        """The scheduler queue deadline, shortened to the request deadline."""
+        timeout = self.scheduler.queue_timeouts[priority]
+        left = deadlines.remaining()
+        return timeout if left is None else max(0.0, min(timeout, left))
+
+    def _backend_failed(self, backend, error: BaseException) -> None:
+        """Record a backend failure, unless only the caller's deadline ran out."""
+        if isinstance(error, asyncio.TimeoutError) and deadlines.expired():
+            raise deadlines.DeadlineExceededError("Request deadline exceeded") from error
+        self.backends.record_failure(backend, error)
+
+    @staticmethod
+    def _is_connect_failure(error: BaseException) -> bool:
+        """True when the connection could not be opened at all; timeouts are not retried."""
+        return isinstance(error, aiohttp.ClientConnectorError) and not isinstance(error, asyncio.TimeoutError)
+
+    def is_idle(self, idle_seconds: float) -> bool:
+        """True when no foreground request is running, queued or ran within ``idle_seconds``."""
+        return self.scheduler.is_idle(idle_seconds)
+
+    async def generate(
+        self,
+        payload: Dict[str, Any],
+        timeout: float = 120,
+        priority: Priority = Priority.TASK,
+        call_site: str = "other"
+    ) -> Dict[str, Any]:
+        """POST a non-streaming request to /api/generate and return the decoded body.
+
+        Identical concurrent foreground requests are coalesced into a single
+        generation whose result every caller receives. Background requests
+        (pre-generation) are never coalesced so they keep producing variety.
+        Raises ``LLMOverloadedError`` when the scheduler sheds the call and
+        ``CircuitOpenError`` while the circuit breaker is open.
+        """
+        payload = self._prepare(payload)
+        if priority == Priority.BACKGROUND:
+            return await self._post_generate(payload, timeout, priority, call_site)
+
+        key = fingerprint(payload)
+        return await self.single_flight.do(
+            key, lambda: self._post_generate(payload, timeout, priority, call_site)
+        )
+
+    async def _post_generate(
+        self,
+        payload: Dict[str, Any],
+        timeout: float,
+        priority: Priority,
+        call_site: str,
+        hedged: bool = False
+    ) -> Dict[str, Any]:
+        with self.breaker.call():
+            started = time.monotonic()
+            async with self._in_use(payload), self.scheduler.slot(priority, self._queue_timeout(priority)):
+                timeout = deadlines.clamp(timeout)
+                if hedged:
+                    result = await self._race_backends(payload, timeout, priority, call_site)
+                else:
+                    result = await self._post_with_failover(payload, timeout, call_site)
+            if priority != Priority.BACKGROUND:
+                # Only successful calls: shed and failed ones say nothing about generation time
+                self.degradation.record_latency(time.monotonic() - started, call_site)
+            return result
+
+    async def _post_with_failover(self, payload: Dict[str, Any], timeout: float, call_site: str) -> Dict[str, Any]:
+        session = await self._get_session()
+        started = time.monotonic()
+        tried = []
+        while True:
+            async with self.backends.lease(exclude=tried) as backend:
+                try:
+                    async with session.post(
+                        f"{backend.url}/api/generate",
+                        json=payload,
+                        timeout=self._timeout(timeout),
+                    ) as response:
+                        if response.status != 200:
+                            raise OllamaError(response.status)
+                        result = await response.json()
+                except (aiohttp.ClientError, asyncio.TimeoutError, OllamaError) as e:
+                    self._backend_failed(backend, e)
+                    tried.append(backend)
+                    others = [b for b in self.backends.healthy_backends() if b not in tried]
+                    if self._is_connect_failure(e) and len(tried) == 1 and others:
+                        # The request never reached the server: fail over once, within what is left
+                        logger.warning(f"Ollama backend {backend.url} unreachable, retrying elsewhere")
+                        timeout = deadlines.clamp(max(0.0, timeout - (time.monotonic() - started)))
+                        continue
+                    raise
+                self.backends.record_success(backend)
+                self._observe(payload, result, call_site)
+                return result
+
+    async def generate_hedged(
+        self,
+        payload: Dict[str, Any],
+        timeout: float = 60,
+        priority: Priority = Priority.INTERACTIVE,
+        call_site: str = "other"
+    ) -> Dict[str, Any]:
+        """Like ``generate``, but hedged across backends to cut tail latency.
+
+        The request is streamed from the least-loaded backend. If no token
+        has arrived after the ``HedgePolicy`` delay, the same request is sent
+        to a second backend; the first complete answer wins and the other
+        request is cancelled. With a single healthy backend, or hedging
+        disabled, this is a plain ``generate``.
+        """
+        if not settings.LLM_HEDGE_ENABLED or len(self.backends.healthy_backends()) < 2:
+            return await self.generate(payload, timeout, priority, call_site)
+
+        payload = self._prepare(payload)
+        key = fingerprint(payload)
+        return await self.single_flight.do(
+            key, lambda: self._post_generate(payload, timeout, priority, call_site, hedged=True)
+        )
+
+    async def _race_backends(
+        self,
+        payload: Dict[str, Any],
+        timeout: float,
+        priority: Priority,
+        call_site: str
+    ) -> Dict[str, Any]:
+        self.hedging.note_request()
+        first_token = asyncio.Event()
+        primary = self.backends.pick()
+        attempts = {
+            asyncio.create_task(self._collect_stream(primary, payload, timeout, first_token)): primary
+        }
+        extra_slot = False
+        try:
+            token_wait = asyncio.create_task(first_token.wait())
+            try:
+                await asyncio.wait(
+                    [*attempts, token_wait],
+                    timeout=self.hedging.delay(),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+            finally:
+                token_wait.cancel()
+
+            primary_task = next(iter(attempts))
+            primary_failed = primary_task.done() and primary_task.exception() is not None
+            others = [b for b in self.backends.healthy_backends() if b is not primary]
+            if others and not first_token.is_set():
+                second = min(others, key=lambda backend: backend.outstanding)
+                if primary_failed:
+                    # Not a hedge: the primary is gone, so move over on the same slot
+                    self.hedging.failovers += 1
+                    start_second = True
+                elif self.hedging.try_hedge():
+                    # A hedge needs its own slot; never queue for one
+                    extra_slot = start_second = self.scheduler.try_acquire(priority)
+                    if not extra_slot:
+                        self.hedging.refund()
+                else:
+                    start_second = False
+                if start_second:
+                    logger.info(f"Hedging {call_site} request from {primary.url} to {second.url}")
+                    task = asyncio.create_task(self._collect_stream(second, payload, timeout, first_token))
+                    attempts[task] = second
+
+            # The first successful answer wins
+            pending, error = set(attempts), None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        result = task.result()
+                        if attempts[task] is not primary and not primary_failed:
+                            self.hedging.hedge_wins += 1
+                        self._observe(payload, result, call_site)
+                        return result
+                    error = task.exception()
+            raise error
+        finally:
+            for task in attempts:
+                task.cancel()
+            await asyncio.gather(*attempts, return_exceptions=True)
+            if extra_slot:
+                self.scheduler.release(priority)
+
+    async def _collect_stream(
+        self,
+        backend,
+        payload: Dict[str, Any],
+        timeout: float,
+        first_token: asyncio.Event
+    ) -> Dict[str, Any]:
+        """Stream a generation from one backend and assemble it like a non-streaming reply."""
+        session = await self._get_session()
+        started = time.monotonic()
+        parts = []
+        async with self.backends.use(backend):
+            try:
+                async with session.post(
+                    f"{backend.url}/api/generate",
+                    json={**payload, "stream": True},
+                    timeout=self._timeout(timeout),
+                ) as response:
+                    if response.status != 200:
+                        raise OllamaError(response.status)
+                    async for line in response.content:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        chunk = json.loads(line)
+                        if not parts:
+                            self.hedging.record_first_token(time.monotonic() - started)
+                            first_token.set()
+                        parts.append(chunk.get("response", ""))
+                        if chunk.get("done"):
+                            self.backends.record_success(backend)
+                            return {**chunk, "response": "".join(parts)}
+                    raise OllamaError(response.status, "Ollama stream ended before completion")
+            except (aiohttp.ClientError, asyncio.TimeoutError, OllamaError) as e:
+                self._backend_failed(backend, e)
+                raise
+
+    async def generate_on(self, backend, payload: Dict[str, Any], timeout: float = 60) -> Dict[str, Any]:
+        """POST /api/generate to one specific backend, bypassing scheduling.
+
+        Used for model warmup and unload requests, which must reach every
+        server and should not count against the circuit breaker.
+        """
+        session = await self._get_session()
+        async with session.post(
+            f"{backend.url}/api/generate",
+            json={**payload, "stream": False},
+            timeout=self._timeout(timeout),
+        ) as response:
+            if response.status != 200:
+                raise OllamaError(response.status)
+            return await response.json()
+
+    async def generate_stream(
+        self,
+        payload: Dict[str, Any],
+        timeout: float = 120,
+        priority: Priority = Priority.TASK,
+        call_site: str = "other"
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """POST a streaming request to /api/generate and yield each NDJSON chunk.
+
+        Streams are never coalesced; closing the iterator early closes the
+        connection, which makes Ollama stop generating. An early close after
+        the stream started counts as a success, and its telemetry is recorded
+        from the chunks received so far.
+        """
+        session = await self._get_session()
+        payload = self._prepare(payload)
+        started = time.monotonic()
+        with self.breaker.call():
+            async with self._in_use(payload), self.scheduler.slot(priority, self._queue_timeout(priority)), \
+                    self.backends.lease() as backend:
+                timeout = deadlines.clamp(timeout)
+                try:
+                    sent_at = time.monotonic()
+                    first_at, received = None, 0
+                    async with session.post(
+                        f"{backend.url}/api/generate",
+                        json={**payload, "stream": True},
+                        timeout=self._timeout(timeout),
+                    ) as response:
+                        if response.status != 200:
+                            raise OllamaError(response.status)
+                        async for line in response.content:
+                            line = line.strip()
+                            if not line:
+                                continue
+                            chunk = json.loads(line)
+                            first_at = first_at or time.monotonic()
+                            received += 1
+                            try:
+                                yield chunk
+                            except GeneratorExit:
+                                # The consumer has what it needs; the server was answering fine
+                                if not chunk.get("done"):
+                                    chunk = self._partial_result(payload, sent_at, first_at, received)
+                                self._stream_finished(payload, chunk, priority, call_site, started)
+                                break
+                            if chunk.get("done"):
+                                self._stream_finished(payload, chunk, priority, call_site, started)
+                                break
+                except (aiohttp.ClientError, asyncio.TimeoutError, OllamaError) as e:
+                    self._backend_failed(backend, e)
+                    raise
+                self.backends.record_success(backend)
+
+    async def list_models(self, timeout: float = 5) -> Dict[str, Any]:
+        """GET /api/tags on the least-loaded healthy backend."""
+        session = await self._get_session()
+        backend = self.backends.pick()
+        async with session.get(
+            f"{backend.url}/api/tags",
+            timeout=aiohttp.ClientTimeout(total=timeout),
+        ) as response:
+            if response.status != 200:
+                raise OllamaError(response.status)
+            return await response.json()
+
+    def stats(self) -> Dict[str, Any]:
+        """Connection pool usage, for the metrics endpoint."""
+        return {
+            "base_url": self.base_url,
+            "pool_limit": self.pool_limit,
+            "pool_limit_per_host": self.pool_limit_per_host,
+            "open": self._session is not None and not self._session.closed,
+            "single_flight": self.single_flight.stats(),
+            "backends": self.backends.stats(),
+            "circuit_breaker": self.breaker.stats(),
+            "hedging": self.hedging.stats(),
+        }
@@ -0,0 +1,190 @@
+# File: backend/app/services/response_cache.py
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """Two-tier cache for LLM responses: an in-memory LRU in front of SQLite.
+
+    Entries expire after ``ttl_seconds``. The SQLite table is trimmed to
+    ``max_rows`` by least-recent access, so the file cannot grow unbounded.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        memory_entries: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+        max_rows: Optional[int] = None,
+    ):
+        self.path = path or settings.AI_CACHE_DB_PATH
+        self.memory_entries = memory_entries or settings.AI_CACHE_MEMORY_ENTRIES
+        self.ttl_seconds = ttl_seconds or settings.AI_CACHE_TTL_SECONDS
+        self.max_rows = max_rows or settings.AI_CACHE_MAX_ROWS
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._db_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def normalize_content(text: str) -> str:
+        """Collapse whitespace and case so trivially different lessons share a key."""
+        return " ".join((text or "").split()).casefold()
+
+    @classmethod
+    def make_key(cls, lesson_content: str, grade_band: str, model: str, options: Dict[str, Any]) -> str:
+        raw = json.dumps(
+            {
+                "content": cls.normalize_content(lesson_content),
+                "grade_band": grade_band,
+                "model": model,
+                "options": options,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    # --- SQLite tier (runs in a worker thread) ---
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS ai_response_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_ai_response_cache_last_access "
+                "ON ai_response_cache (last_access)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _db_get(self, key: str) -> Optional[tuple]:
+        now = time.time()
+        with self._db_lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, created_at FROM ai_response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM ai_response_cache WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            conn.execute("UPDATE ai_response_cache SET last_access = ? WHERE key = ?", (now, key))
+            conn.commit()
+            return json.loads(row[0]), row[1]
+
+    def _db_set(self, key: str, value: Dict[str, Any], created_at: float) -> int:
+        with self._db_lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO ai_response_cache (key, value, created_at, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), created_at, created_at),
+            )
+            evicted = conn.execute(
+                "DELETE FROM ai_response_cache WHERE created_at < ?",
+                (created_at - self.ttl_seconds,),
+            ).rowcount
+            evicted += conn.execute(
+                "DELETE FROM ai_response_cache WHERE key IN ("
+                "SELECT key FROM ai_response_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_rows,),
+            ).rowcount
+            conn.commit()
+            return evicted
+
+    def _db_clear(self) -> None:
+        with self._db_lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM ai_response_cache")
+            conn.commit()
+
+    # --- Public API ---
+
+    def _remember(self, key: str, value: Dict[str, Any], created_at: float) -> None:
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached response or None; promotes disk hits into memory."""
+        entry = self._memory.get(key)
+        if entry is not None:
+            value, created_at = entry
+            if time.time() - created_at <= self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return dict(value)
+            del self._memory[key]
+
+        try:
+            row = await asyncio.to_thread(self._db_get, key)
+        except sqlite3.Error as e:
+            logger.error(f"Response cache read failed: {e}")
+            row = None
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        value, created_at = row
+        self._remember(key, value, created_at)
+        self.disk_hits += 1
+        return dict(value)
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        created_at = time.time()
+        self._remember(key, dict(value), created_at)
+        try:
+            self.evictions += await asyncio.to_thread(self._db_set, key, dict(value), created_at)
+        except sqlite3.Error as e:
+            logger.error(f"Response cache write failed: {e}")
+
+    async def clear(self) -> None:
+        self._memory.clear()
+        await asyncio.to_thread(self._db_clear)
+
+    def close(self) -> None:
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_entries": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,85 @@
+# File: backend/app/services/single_flight.py
+
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+from . import deadlines
+from .deadlines import DeadlineExceededError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable hash of JSON-serializable request parts."""
+    raw = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key onto one in-flight task.
+
+    The first caller for a key starts the work; callers arriving while it runs
+    await the same task and receive its result (or exception). The shared task
+    runs without any caller's request deadline; each caller only bounds its
+    own wait by its deadline. The task is cancelled once every caller waiting
+    on it has been cancelled or has run out of time.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.get_running_loop().create_task(fn(), context=deadlines.detached_context())
+            self._inflight[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+        else:
+            self.coalesced += 1
+            logger.debug(f"Coalesced request onto in-flight call {key[:12]}")
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), deadlines.remaining())
+        except (asyncio.CancelledError, asyncio.TimeoutError) as e:
+            if task.done():
+                raise  # The shared call itself failed or was cancelled
+            self._leave(key, task)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise DeadlineExceededError("Request deadline exceeded") from None
+
+    def _leave(self, key: str, task: asyncio.Task) -> None:
+        """A caller stopped waiting; cancel the shared task when it was the last one."""
+        if self._inflight.get(key) is task:
+            self._waiters[key] -= 1
+            if self._waiters[key] == 0:
+                task.cancel()
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            del self._waiters[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved in case every caller went away
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._inflight),
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+        }
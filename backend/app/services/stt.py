@@ -0,0 +1,203 @@
+# File: backend/app/services/stt.py
+
+import asyncio
+import json
+import logging
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Dict, Any, Optional
+
+import speech_recognition as sr
+
+from ..core.config import settings
+from . import deadlines
+
+try:
+    import vosk
+    VOSK_AVAILABLE = True
+except ImportError:
+    VOSK_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class STTEngine:
+    """A speech-to-text backend.
+
+    ``recognize`` is blocking and receives a WAV file (16-bit PCM); it returns
+    the transcript, or None when nothing intelligible was said. Engines are
+    shared by all requests and called from several threads at once.
+    """
+
+    name = "base"
+
+    def load(self) -> None:
+        """Load models; called once at startup, off the event loop."""
+
+    def recognize(self, wav_data: bytes, language: str) -> Optional[str]:
+        raise NotImplementedError
+
+
+class GoogleSTTEngine(STTEngine):
+    """Google Web Speech API through ``speech_recognition``; needs internet access."""
+
+    name = "google"
+
+    def __init__(self):
+        self.recognizer = sr.Recognizer()
+        self.recognizer.energy_threshold = 300
+        self.recognizer.dynamic_energy_threshold = True
+
+    def recognize(self, wav_data: bytes, language: str) -> Optional[str]:
+        with sr.AudioFile(BytesIO(wav_data)) as source:
+            # record() reads the whole file; the ambient noise pass only tunes the threshold
+            self.recognizer.adjust_for_ambient_noise(source, duration=0.1)
+            audio = self.recognizer.record(source)
+        try:
+            return self.recognizer.recognize_google(audio, language=language)
+        except sr.UnknownValueError:
+            return None
+        except sr.RequestError as e:
+            logger.error(f"Google speech recognition unavailable: {e}")
+            return None
+
+
+class VoskSTTEngine(STTEngine):
+    """Offline recognition on the CPU with a Vosk (Kaldi) model loaded once."""
+
+    name = "vosk"
+
+    def __init__(self, model_path: Optional[str] = None):
+        self.model_path = model_path or settings.STT_VOSK_MODEL_PATH
+        self.model = None
+        self._load_lock = threading.Lock()
+
+    def load(self) -> None:
+        with self._load_lock:
+            if self.model is None:
+                vosk.SetLogLevel(-1)
+                self.model = vosk.Model(self.model_path)
+                logger.info(f"Loaded Vosk model from {self.model_path}")
+
+    def recognize(self, wav_data: bytes, language: str) -> Optional[str]:
+        if self.model is None:
+            self.load()
+        with wave.open(BytesIO(wav_data), "rb") as wav_file:
+            if wav_file.getnchannels() != 1 or wav_file.getsampwidth() != 2:
+                logger.warning("Vosk needs mono 16-bit PCM audio")
+                return None
+            # A recognizer holds per-utterance state, so each call gets its own
+            recognizer = vosk.KaldiRecognizer(self.model, wav_file.getframerate())
+            while True:
+                frames = wav_file.readframes(4000)
+                if not frames:
+                    break
+                recognizer.AcceptWaveform(frames)
+        text = json.loads(recognizer.FinalResult()).get("text", "").strip()
+        return text or None
+
+
+class StubSTTEngine(STTEngine):
+    """Deterministic engine for tests: any non-silent audio becomes ``STT_STUB_TEXT``."""
+
+    name = "stub"
+
+    def __init__(self, text: Optional[str] = None):
+        self.text = text or settings.STT_STUB_TEXT
+
+    def recognize(self, wav_data: bytes, language: str) -> Optional[str]:
+        with wave.open(BytesIO(wav_data), "rb") as wav_file:
+            frames = wav_file.readframes(wav_file.getnframes())
+        return self.text if frames.strip(b"\x00") else None
+
+
+def create_stt_engine(name: Optional[str] = None) -> STTEngine:
+    """Build the engine named by ``STT_ENGINE``; falls back to Google when Vosk is missing."""
+    name = (name or settings.STT_ENGINE).lower()
+    if name == "vosk":
+        if VOSK_AVAILABLE:
+            return VoskSTTEngine()
+        logger.error("STT_ENGINE is 'vosk' but the vosk package is not installed; using Google")
+    elif name == "stub":
+        return StubSTTEngine()
+    elif name != "google":
+        logger.error(f"Unknown STT_ENGINE '{name}'; using Google")
+    return GoogleSTTEngine()
+
+
+class STTRunner:
+    """Runs an engine's blocking ``recognize`` in a bounded thread pool.
+
+    Threads suffice: the Google engine waits on the network and Vosk spends
+    its time in native code that releases the GIL. Calls are bounded by the
+    request deadline; ``pending`` counts recognitions running or queued.
+    """
+
+    def __init__(self, engine: Optional[STTEngine] = None, workers: Optional[int] = None):
+        self.engine = engine or create_stt_engine()
+        self.workers = workers or settings.STT_WORKERS
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="stt")
+        self.pending = 0
+        self._recognize_time = 0.0  # EWMA of recognition seconds
+
+        self.completed = 0
+        self.unrecognized = 0
+        self.failed = 0
+
+    async def start(self) -> None:
+        """Load the engine's model once, in the pool, before the first request."""
+        try:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self.engine.load)
+        except Exception as e:
+            logger.error(f"Failed to load the {self.engine.name} speech model: {e}")
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, wav_data: bytes, language: str) -> Optional[str]:
+        started = time.monotonic()
+        try:
+            return self.engine.recognize(wav_data, language)
+        finally:
+            self._recognize_time = 0.8 * self._recognize_time + 0.2 * (time.monotonic() - started)
+
+    async def recognize(self, wav_data: bytes, language: Optional[str] = None) -> Optional[str]:
+        if not wav_data or len(wav_data) < 44:  # Minimum WAV header size
+            logger.warning("Invalid or empty WAV data")
+            return None
+
+        self.pending += 1
+        try:
+            future = asyncio.get_running_loop().run_in_executor(
+                self._executor, self._run, wav_data, language or settings.STT_LANGUAGE
+            )
+            text = await asyncio.wait_for(future, deadlines.remaining())
+        except asyncio.TimeoutError:
+            raise
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"Speech recognition with {self.engine.name} failed: {e}")
+            return None
+        finally:
+            self.pending -= 1
+
+        if text:
+            self.completed += 1
+            logger.info(f"Recognized with {self.engine.name}: {text}")
+        else:
+            self.unrecognized += 1
+        return text
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "engine": self.engine.name,
+            "workers": self.workers,
+            "pending": self.pending,
+            "avg_recognize_seconds": round(self._recognize_time, 3),
+            "completed": self.completed,
+            "unrecognized": self.unrecognized,
+            "failed": self.failed,
+        }
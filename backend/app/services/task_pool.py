@@ -0,0 +1,168 @@
+# File: backend/app/services/task_pool.py
+
+import asyncio
+import logging
+from collections import deque
+from typing import Dict, Any, Optional, Tuple, Deque, List
+
+from ..core.config import settings
+from ..database import SessionLocal
+from ..models.lesson import Lesson
+from .ai_service import AIService
+from .lesson_index import lesson_index
+from .llm_scheduler import Priority
+
+logger = logging.getLogger(__name__)
+
+PoolKey = Tuple[int, Optional[int]]  # (lesson_id, grade)
+
+
+class TaskPregenerationPool:
+    """Keeps a small pool of ready-made AI tasks for every lesson/grade.
+
+    Worker tasks started from the application lifespan fill the pools while
+    the model server is idle, generating all missing tasks of a lesson in one
+    model call, so ``take`` can hand out a task instantly and queue a refill
+    instead of making the student wait on a full generation. When the lesson
+    text passed in changes (the lesson was edited or its summary landed),
+    the tasks made from the old text are dropped.
+    """
+
+    def __init__(
+        self,
+        ai_service: AIService,
+        depth: Optional[int] = None,
+        refill_concurrency: Optional[int] = None,
+        idle_seconds: Optional[float] = None,
+    ):
+        self.ai_service = ai_service
+        self.depth = depth or settings.TASK_POOL_DEPTH
+        self.refill_concurrency = refill_concurrency or settings.TASK_POOL_REFILL_CONCURRENCY
+        self.idle_seconds = idle_seconds if idle_seconds is not None else settings.TASK_POOL_IDLE_SECONDS
+
+        self._pools: Dict[PoolKey, Deque[Dict[str, Any]]] = {}
+        self._lesson_text: Dict[PoolKey, str] = {}
+        self._queue: "asyncio.Queue[PoolKey]" = asyncio.Queue()
+        self._queued: set = set()
+        self._workers: List[asyncio.Task] = []
+
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        self.failures = 0
+        self.stale = 0
+
+    async def start(self) -> None:
+        """Queue a refill for every lesson in the database and start the workers."""
+        lessons = await asyncio.to_thread(self._load_lessons)
+        for lesson_id, grade, text in lessons:
+            self.request_refill(lesson_id, grade, text)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"task-pool-worker-{i}")
+            for i in range(self.refill_concurrency)
+        ]
+        logger.info(f"Task pre-generation pool started for {len(lessons)} lessons")
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    @staticmethod
+    def _load_lessons() -> List[Tuple[int, Optional[int], str]]:
+        db = SessionLocal()
+        try:
+            return [
+                (lesson.id, lesson.grade, lesson_index.context_for(lesson))
+                for lesson in db.query(Lesson).all()
+            ]
+        finally:
+            db.close()
+
+    def _set_text(self, key: PoolKey, lesson_text: str) -> None:
+        """Remember the lesson text; tasks generated from a different text are stale."""
+        previous = self._lesson_text.get(key)
+        if previous is not None and previous != lesson_text and self._pools.get(key):
+            self.stale += len(self._pools[key])
+            self._pools[key].clear()
+            logger.info(f"Lesson {key[0]} changed, dropped its pre-generated tasks")
+        self._lesson_text[key] = lesson_text
+
+    def take(self, lesson_id: int, grade: Optional[int], lesson_text: str) -> Optional[Dict[str, Any]]:
+        """Pop a ready task for the lesson (or None) and queue a refill either way."""
+        key = (lesson_id, grade)
+        self._set_text(key, lesson_text)
+        pool = self._pools.get(key)
+        task = pool.popleft() if pool else None
+        if task is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+        self.request_refill(lesson_id, grade, lesson_text)
+        return task
+
+    def request_refill(self, lesson_id: int, grade: Optional[int], lesson_text: str) -> None:
+        key = (lesson_id, grade)
+        self._set_text(key, lesson_text)
+        self._pools.setdefault(key, deque())
+        if key not in self._queued and len(self._pools[key]) < self.depth:
+            self._queued.add(key)
+            self._queue.put_nowait(key)
+
+    async def _wait_for_idle(self) -> None:
+        while not self.ai_service.client.is_idle(self.idle_seconds):
+            await asyncio.sleep(self.idle_seconds / 2 or 0.1)
+
+    async def _worker(self) -> None:
+        while True:
+            key = await self._queue.get()
+            self._queued.discard(key)
+            try:
+                pool = self._pools[key]
+                if len(pool) >= self.depth:
+                    continue
+                await self._wait_for_idle()
+
+                # Fill every missing slot with one model call
+                lesson_text = self._lesson_text[key]
+                tasks = await self.ai_service.generate_tasks_with_ollama(
+                    lesson_content=lesson_text,
+                    grade_level=key[1],
+                    count=self.depth - len(pool),
+                    priority=Priority.BACKGROUND
+                )
+                if not tasks:
+                    # Model server unavailable or nothing usable; retry on the next take()
+                    self.failures += 1
+                    continue
+                if self._lesson_text[key] != lesson_text:
+                    # The lesson changed while this batch was generated
+                    self.stale += len(tasks)
+                    self.request_refill(key[0], key[1], self._lesson_text[key])
+                    continue
+
+                pool.extend(tasks[:self.depth - len(pool)])
+                self.generated += len(tasks)
+                if len(pool) < self.depth:
+                    self.request_refill(key[0], key[1], self._lesson_text[key])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Task pre-generation failed for lesson {key[0]}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "depth": self.depth,
+            "lessons": len(self._pools),
+            "ready_tasks": sum(len(pool) for pool in self._pools.values()),
+            "queued_refills": self._queue.qsize(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "generated": self.generated,
+            "failures": self.failures,
+            "stale_dropped": self.stale,
+        }
@@ -0,0 +1,206 @@
+# File: backend/app/services/tts_cache.py
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Set, List
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TTSCache:
+    """Content-addressed cache of synthesized speech: an in-memory LRU over files on disk.
+
+    Keys hash the normalized text with the language, voice and audio format,
+    so the same sentence is synthesized once whoever asks. Each entry is one
+    file; the directory is trimmed to ``disk_bytes`` and the memory tier to
+    ``memory_bytes``, least recently used first. Pinned keys (the fixed
+    phrases) are never evicted.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        memory_bytes: Optional[int] = None,
+        disk_bytes: Optional[int] = None,
+    ):
+        self.directory = os.path.abspath(directory or settings.TTS_CACHE_DIR)
+        self.memory_bytes = memory_bytes or settings.TTS_CACHE_MEMORY_MB * 1024 * 1024
+        self.disk_bytes = disk_bytes or settings.TTS_CACHE_DISK_MB * 1024 * 1024
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_used = 0
+        # Entries on disk by least recent access: key -> (file name, size)
+        self._disk: "OrderedDict[str, tuple]" = OrderedDict()
+        self._disk_used = 0
+        self._pinned: Set[str] = set()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Collapse whitespace; case and punctuation are kept since they change the speech."""
+        return " ".join((text or "").split())
+
+    @classmethod
+    def make_key(cls, text: str, language: str, voice: str, audio_format: str) -> str:
+        raw = json.dumps(
+            [cls.normalize_text(text), language, voice, audio_format],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    # --- Disk tier (file I/O runs in a worker thread) ---
+
+    def _scan(self) -> List[tuple]:
+        os.makedirs(self.directory, exist_ok=True)
+        entries = []
+        for name in os.listdir(self.directory):
+            key, ext = os.path.splitext(name)
+            path = os.path.join(self.directory, name)
+            if ext == ".tmp":
+                os.remove(path)  # Interrupted write
+                continue
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, key, name, stat.st_size))
+        return sorted(entries)
+
+    def _read(self, name: str) -> Optional[bytes]:
+        path = os.path.join(self.directory, name)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # The mtime orders entries by access across restarts
+            return data
+        except FileNotFoundError:
+            return None
+
+    def _write(self, name: str, data: bytes) -> None:
+        path = os.path.join(self.directory, name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _remove(self, names: List[str]) -> None:
+        for name in names:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+    # --- Public API ---
+
+    async def start(self) -> None:
+        """Index the files left by earlier runs, trimmed to the current budget."""
+        try:
+            entries = await asyncio.to_thread(self._scan)
+        except OSError as e:
+            logger.error(f"TTS cache directory {self.directory} unusable: {e}")
+            return
+        for _, key, name, size in entries:
+            self._disk[key] = (name, size)
+            self._disk_used += size
+        await self._trim_disk()
+        logger.info(f"TTS cache holds {len(self._disk)} clips ({self._disk_used // 1024} KiB)")
+
+    def pin(self, key: str) -> None:
+        self._pinned.add(key)
+
+    def _remember(self, key: str, data: bytes) -> None:
+        if key in self._memory:
+            self._memory_used -= len(self._memory.pop(key))
+        self._memory[key] = data
+        self._memory_used += len(data)
+        for old_key in list(self._memory):
+            if self._memory_used <= self.memory_bytes or old_key == key:
+                break
+            if old_key not in self._pinned:
+                self._memory_used -= len(self._memory.pop(old_key))
+
+    async def _trim_disk(self) -> None:
+        victims = []
+        for key in list(self._disk):
+            if self._disk_used <= self.disk_bytes:
+                break
+            if key in self._pinned:
+                continue
+            name, size = self._disk.pop(key)
+            self._disk_used -= size
+            victims.append(name)
+        if victims:
+            self.evictions += len(victims)
+            await asyncio.to_thread(self._remove, victims)
+
+    def peek(self, key: str) -> Optional[bytes]:
+        """Memory-only lookup, for paths that must not wait on the disk."""
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+        return data
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Return cached audio or None; promotes disk hits into memory."""
+        data = self.peek(key)
+        if data is not None:
+            self.memory_hits += 1
+            return data
+
+        entry = self._disk.get(key)
+        if entry is not None:
+            try:
+                data = await asyncio.to_thread(self._read, entry[0])
+            except OSError as e:
+                logger.error(f"TTS cache read failed: {e}")
+                data = None
+            if data is not None:
+                self._disk.move_to_end(key)
+                self._remember(key, data)
+                self.disk_hits += 1
+                return data
+            # Removed behind our back
+            if self._disk.pop(key, None) is not None:
+                self._disk_used -= entry[1]
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, data: bytes, extension: str = "mp3") -> None:
+        self._remember(key, data)
+        name = f"{key}.{extension}"
+        try:
+            await asyncio.to_thread(self._write, name, data)
+        except OSError as e:
+            logger.error(f"TTS cache write failed: {e}")
+            return
+        previous = self._disk.pop(key, None)
+        if previous is not None:
+            self._disk_used -= previous[1]
+        self._disk[key] = (name, len(data))
+        self._disk_used += len(data)
+        await self._trim_disk()
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_used,
+            "disk_entries": len(self._disk),
+            "disk_bytes": self._disk_used,
+            "disk_budget_bytes": self.disk_bytes,
+            "pinned": len(self._pinned),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+        }
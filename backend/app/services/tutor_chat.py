@@ -0,0 +1,249 @@
+# File: backend/app/services/tutor_chat.py
+
+import asyncio
+import logging
+import secrets
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Any, Optional, List, Tuple, Deque
+
+import aiohttp
+
+from ..core.config import settings
+from .circuit_breaker import CircuitOpenError
+from .content_safety import content_safety
+from .degradation import DegradationLevel
+from .llm_scheduler import LLMOverloadedError, Priority
+from .ollama_backends import NoHealthyBackendError
+from .ollama_client import OllamaClient, OllamaError
+
+logger = logging.getLogger(__name__)
+
+
+class TutorSession:
+    """Server-side state of one tutoring conversation.
+
+    ``context`` is the token context Ollama returned after the last turn: it
+    already holds the system prompt, the lesson and every earlier turn, so a
+    follow-up only sends the new question. ``turns`` keeps the recent
+    exchanges as text to rebuild the prompt when the context is dropped.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        lesson_context: str = "",
+        grade_level: Optional[int] = None,
+        lesson_id: Optional[int] = None,
+        history_turns: int = 6,
+    ):
+        self.session_id = session_id
+        self.lesson_id = lesson_id
+        self.grade_level = grade_level
+        self.lesson_context = lesson_context
+        self.context: List[int] = []
+        self.model: Optional[str] = None  # Model the context belongs to
+        self.turns: Deque[Tuple[str, str]] = deque(maxlen=history_turns)
+        self.turn_count = 0
+        self.created_at = time.time()
+        self.last_used = time.monotonic()
+        self.lock = asyncio.Lock()  # Turns of one session run one after another
+
+    def touch(self) -> None:
+        self.last_used = time.monotonic()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "lesson_id": self.lesson_id,
+            "grade_level": self.grade_level,
+            "turn_count": self.turn_count,
+            "context_tokens": len(self.context),
+            "turns": [{"question": q, "answer": a} for q, a in self.turns],
+        }
+
+
+class TutorChatService:
+    """Multi-turn tutoring chat with sessions kept in memory.
+
+    Follow-up questions reuse the ``context`` returned by Ollama, so neither
+    the system prompt nor the lesson is evaluated again. Sessions expire
+    after ``ttl`` seconds without a turn; beyond ``max_sessions`` the least
+    recently used one is dropped, and a context longer than
+    ``max_context_tokens`` is discarded and rebuilt from the recent turns,
+    which bounds the memory held per session.
+    """
+
+    # Used while the model server is unavailable or overloaded
+    CANNED_ANSWER = (
+        "I'm having a little trouble thinking right now. "
+        "Let's look at the lesson together and try again in a moment!"
+    )
+    # Used instead of a question or answer that failed the content safety check
+    SAFE_REDIRECT_ANSWER = (
+        "That's a question for a grown-up. "
+        "Let's get back to our lesson and learn something fun together!"
+    )
+
+    CHAT_OPTIONS = {
+        "temperature": 0.7,
+        "top_p": 0.9
+    }
+
+    def __init__(
+        self,
+        client: OllamaClient,
+        model: Optional[str] = None,
+        ttl: Optional[float] = None,
+        max_sessions: Optional[int] = None,
+        max_context_tokens: Optional[int] = None,
+        history_turns: Optional[int] = None,
+    ):
+        self.client = client
+        self.model_name = model or settings.OLLAMA_MODEL
+        self.ttl = ttl or settings.TUTOR_SESSION_TTL_SECONDS
+        self.max_sessions = max_sessions or settings.TUTOR_MAX_SESSIONS
+        self.max_context_tokens = max_context_tokens or settings.TUTOR_MAX_CONTEXT_TOKENS
+        self.history_turns = history_turns or settings.TUTOR_HISTORY_TURNS
+        self._sessions: "OrderedDict[str, TutorSession]" = OrderedDict()  # Least recently used first
+
+        self.created = 0
+        self.expired = 0
+        self.evicted = 0
+        self.context_reuses = 0
+        self.context_rebuilds = 0
+
+    def _sweep(self) -> None:
+        """Drop expired sessions; the oldest are at the front of the ordered dict."""
+        cutoff = time.monotonic() - self.ttl
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if session.last_used > cutoff:
+                break
+            self._sessions.popitem(last=False)
+            self.expired += 1
+
+    def create_session(
+        self,
+        lesson_context: str = "",
+        grade_level: Optional[int] = None,
+        lesson_id: Optional[int] = None,
+    ) -> TutorSession:
+        self._sweep()
+        while len(self._sessions) >= self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.evicted += 1
+        session = TutorSession(
+            secrets.token_urlsafe(16), lesson_context, grade_level, lesson_id, self.history_turns
+        )
+        self._sessions[session.session_id] = session
+        self.created += 1
+        return session
+
+    def get_session(self, session_id: str) -> Optional[TutorSession]:
+        self._sweep()
+        session = self._sessions.get(session_id)
+        if session is not None:
+            session.touch()
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def end_session(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    def _get_system_prompt(self, session: TutorSession) -> str:
+        grade = session.grade_level
+        if grade and grade <= 2:
+            audience = "very young students (ages 5-7). Use simple words and short sentences"
+        elif grade and grade <= 5:
+            audience = "elementary students (ages 8-11). Be clear, patient and encouraging"
+        elif grade and grade <= 8:
+            audience = "middle school students (ages 12-14). Be informative but approachable"
+        else:
+            audience = "students. Provide clear, helpful explanations"
+        prompt = (
+            f"You are a friendly tutor for {audience}. Answer follow-up questions in the "
+            "context of the conversation, in at most 3 sentences, and encourage the student."
+        )
+        if session.lesson_context:
+            prompt += f"\n\nLesson: {session.lesson_context}"
+        return prompt
+
+    def _build_payload(self, session: TutorSession, message: str, level: DegradationLevel) -> Dict[str, Any]:
+        ladder = self.client.degradation
+        model = ladder.model_for(level, self.model_name)
+        payload = {
+            "model": model,
+            "stream": False,
+            "options": ladder.apply_options(level, dict(self.CHAT_OPTIONS)),
+        }
+        if session.context and session.model == model:
+            # The context already holds the system prompt, lesson and earlier turns
+            payload["prompt"] = message
+            payload["context"] = session.context
+            self.context_reuses += 1
+        else:
+            # First turn, or the context was dropped (memory cap, model switch):
+            # start over from the system prompt and the recent turns as text
+            history = "".join(f"Student: {q}\nTutor: {a}\n" for q, a in session.turns)
+            payload["system"] = self._get_system_prompt(session)
+            payload["prompt"] = f"{history}Student: {message}\nTutor:" if history else message
+            if session.turns:
+                self.context_rebuilds += 1
+        return payload
+
+    async def ask(self, session: TutorSession, message: str) -> Optional[str]:
+        """Answer the next question of a session; None when the model server failed.
+
+        Raises ``LLMOverloadedError`` when the scheduler sheds the call.
+        """
+        if content_safety.scan(message, session.grade_level, categories=("unsafe",)):
+            logger.info(f"Tutor question in session {session.session_id[:6]} failed the safety check")
+            return self.SAFE_REDIRECT_ANSWER
+
+        async with session.lock:
+            level = self.client.degradation.level_for(Priority.INTERACTIVE)
+            if level == DegradationLevel.FALLBACK:
+                return self.CANNED_ANSWER
+
+            payload = self._build_payload(session, message, level)
+            try:
+                result = await self.client.generate(
+                    payload, timeout=60, priority=Priority.INTERACTIVE, call_site="tutor_chat"
+                )
+            except CircuitOpenError as e:
+                logger.info(f"Using canned tutor answer: {e}")
+                return self.CANNED_ANSWER
+            except LLMOverloadedError:
+                raise
+            except (OllamaError, NoHealthyBackendError, asyncio.TimeoutError, aiohttp.ClientError) as e:
+                logger.error(f"Tutor answer failed: {e or type(e).__name__}")
+                return None
+
+            answer = result.get("response", "").strip()
+            if not answer:
+                return None
+            if content_safety.scan(answer, session.grade_level, categories=("unsafe",)):
+                # Keep the previous context so the rejected answer is not built upon
+                logger.warning(f"Tutor answer in session {session.session_id[:6]} failed the safety check")
+                return self.SAFE_REDIRECT_ANSWER
+
+            context = result.get("context") or []
+            session.context = context if len(context) <= self.max_context_tokens else []
+            session.model = payload["model"]
+            session.turns.append((message, answer))
+            session.turn_count += 1
+            session.touch()
+            return answer
+
+    def stats(self) -> Dict[str, Any]:
+        self._sweep()
+        return {
+            "sessions": len(self._sessions),
+            "context_tokens": sum(len(s.context) for s in self._sessions.values()),
+            "created": self.created,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "context_reuses": self.context_reuses,
+            "context_rebuilds": self.context_rebuilds,
+        }
@@ -4,66 +4,168 @@ import asyncio
 import json
 import logging
 import base64
-import wave
 import struct
 import tempfile
 import os
 from io import BytesIO
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 
-import aiohttp
-import speech_recognition as sr
 from gtts import gTTS
-import av
 
-try:
-    import librosa
-    import soundfile as sf
-    LIBROSA_AVAILABLE = True
-except ImportError:
-    LIBROSA_AVAILABLE = False
-    logging.warning("librosa not available - limited audio format support")
+from ..core.config import settings
+from . import deadlines
+from .audio_decode import AudioDecodeBusyError, AudioDecodePool, av_to_wav
+from .audio_probe import AudioFormat, probe_audio
+from .circuit_breaker import CircuitOpenError
+from .content_safety import content_safety
+from .degradation import DegradationLevel
+from .lesson_index import LessonChunkIndex
+from .llm_scheduler import LLMOverloadedError, Priority
+from .ollama_client import OllamaClient, OllamaError
+from .single_flight import SingleFlight
+from .stt import STTRunner
+from .tts_cache import TTSCache
 
 logger = logging.getLogger(__name__)
 
 class VoiceQnAService:
+    # Spoken when the model server is known to be down (circuit open) or overloaded
+    CANNED_ANSWER = (
+        "That's a great question! I can't think of the answer right now, "
+        "so let's ask your teacher and try again a little later."
+    )
+    # Errors returned to the app instead of an answer
+    UNSUPPORTED_AUDIO_ERROR = "Unsupported audio format. Please record WAV, WebM, Ogg, MP4/M4A or AAC audio."
+    UNRECOGNIZED_ERROR = "Could not understand the audio. Please speak clearly and try again."
+    BUSY_ERROR = "Lots of friends are asking questions right now. Please try again in a moment."
+    NO_ANSWER_ERROR = "Could not generate an answer. Please try again."
+    GENERIC_ERROR = "Something went wrong. Please try again."
+    # Lesson context kept in the compact prompt used under load
+    COMPACT_CONTEXT_CHARS = 600
+    # Spoken instead of an answer that failed the content safety check
+    SAFE_REDIRECT_ANSWER = (
+        "That's a question for a grown-up. "
+        "Let's get back to our lesson and learn something fun together!"
+    )
+
     def __init__(
         self,
-        ollama_url: str = "http://localhost:11434",
-        model: str = "gemma3n:e2b"
+        ollama_url: Optional[str] = None,
+        model: Optional[str] = None,
+        client: Optional[OllamaClient] = None,
+        decoder: Optional[AudioDecodePool] = None,
+        stt: Optional[STTRunner] = None,
+        tts_cache: Optional[TTSCache] = None
     ):
-        self.ollama_base_url = ollama_url
-        self.model_name = model
-        self.recognizer = sr.Recognizer()
-        # Improve recognition settings
-        self.recognizer.energy_threshold = 300
-        self.recognizer.dynamic_energy_threshold = True
+        self.client = client or OllamaClient(ollama_url)
+        # Process pool for decoding/resampling; without one decoding runs in a thread
+        self.decoder = decoder
+        self.ollama_base_url = self.client.base_url
+        self.model_name = model or settings.OLLAMA_MODEL
+        # Speech-to-text engine chosen by STT_ENGINE, run in its own thread pool
+        self.stt = stt or STTRunner()
+        # Synthesized speech by text/language/voice; concurrent misses share one gTTS call
+        self.tts_cache = tts_cache
+        self.tts_language = settings.TTS_LANGUAGE
+        self.tts_voice = settings.TTS_VOICE
+        self._tts_flight = SingleFlight()
+        self._presynthesis: Optional[asyncio.Task] = None
+
+    def spoken_phrases(self) -> Tuple[str, ...]:
+        """The fixed answers and errors, synthesized ahead of time."""
+        return (
+            self.CANNED_ANSWER, self.SAFE_REDIRECT_ANSWER, self.UNSUPPORTED_AUDIO_ERROR,
+            self.UNRECOGNIZED_ERROR, self.BUSY_ERROR, self.NO_ANSWER_ERROR, self.GENERIC_ERROR,
+        )
+
+    async def start(self) -> None:
+        """Pin the fixed phrases in the TTS cache and synthesize the missing ones in the background."""
+        if self.tts_cache is None:
+            return
+        for phrase in self.spoken_phrases():
+            self.tts_cache.pin(self._tts_key(phrase))
+        if settings.TTS_PRESYNTHESIZE_ON_STARTUP:
+            self._presynthesis = asyncio.create_task(self._presynthesize())
+
+    async def stop(self) -> None:
+        if self._presynthesis is not None:
+            self._presynthesis.cancel()
+            await asyncio.gather(self._presynthesis, return_exceptions=True)
+            self._presynthesis = None
+
+    async def _presynthesize(self) -> None:
+        synthesized = 0
+        for phrase in self.spoken_phrases():
+            # Loads clips kept from earlier runs into memory, synthesizes the rest
+            if await self.synthesize(phrase):
+                synthesized += 1
+        logger.info(f"Pre-synthesized {synthesized}/{len(self.spoken_phrases())} fixed voice phrases")
+
+    def error_result(self, error: str, **extra: Any) -> Dict[str, Any]:
+        """A failed result, with the spoken error when it is already in memory."""
+        result = {"success": False, "error": error, **extra}
+        if self.tts_cache is not None:
+            audio = self.tts_cache.peek(self._tts_key(error))
+            if audio:
+                result["audio_response"] = base64.b64encode(audio).decode('utf-8')
+        return result
 
     async def process_voice_question(
         self,
         audio_data: bytes,
         lesson_context: str = "",
-        grade_level: int = None
+        grade_level: int = None,
+        lesson_chunks: Optional[LessonChunkIndex] = None,
+        audio_format: Optional[AudioFormat] = None
     ) -> Dict[str, Any]:
-        """Process voice question and return text answer with audio response."""
+        """Process voice question and return text answer with audio response.
+
+        ``lesson_context`` is the default context, normally the lesson summary.
+        With ``lesson_chunks`` the lesson chunks most relevant to the
+        recognised question are added to it within the token budget.
+        """
         try:
-            # Step 1: Convert audio to text
-            question_text = await self._speech_to_text(audio_data)
+            # Step 1: Convert audio to text; unknown payloads are refused before any work
+            audio_format = audio_format or probe_audio(audio_data)
+            if audio_format is None:
+                logger.warning(f"Rejected unsupported audio payload ({len(audio_data)} bytes)")
+                return self.error_result(self.UNSUPPORTED_AUDIO_ERROR)
+            try:
+                question_text = await self._speech_to_text(audio_data, audio_format)
+            except AudioDecodeBusyError as e:
+                logger.warning(str(e))
+                return self.error_result(self.BUSY_ERROR, retry_after=e.retry_after)
             if not question_text:
-                return {
-                    "success": False,
-                    "error": "Could not understand the audio. Please speak clearly and try again."
-                }
+                return self.error_result(self.UNRECOGNIZED_ERROR)
+
+            return await self.answer_question(question_text, lesson_context, grade_level, lesson_chunks)
 
+        except Exception as e:
+            logger.error(f"Error in voice Q&A: {e}")
+            return self.error_result(self.GENERIC_ERROR)
+
+    async def answer_question(
+        self,
+        question_text: str,
+        lesson_context: str = "",
+        grade_level: int = None,
+        lesson_chunks: Optional[LessonChunkIndex] = None
+    ) -> Dict[str, Any]:
+        """Answer a recognised question with text and speech (steps 2 and 3)."""
+        try:
             logger.info(f"Voice question: {question_text}")
+            if lesson_chunks is not None:
+                excerpt = lesson_chunks.context_for(question_text, summary=lesson_context)
+                lesson_context = f"{lesson_chunks.title}: {excerpt}"
 
             # Step 2: Generate AI response
-            answer_text = await self._generate_answer(question_text, lesson_context, grade_level)
+            try:
+                answer_text = await self._generate_answer(question_text, lesson_context, grade_level)
+            except LLMOverloadedError as e:
+                logger.warning(str(e))
+                return self.error_result(self.BUSY_ERROR, question=question_text, retry_after=e.retry_after)
             if not answer_text:
-                return {
-                    "success": False,
-                    "error": "Could not generate an answer. Please try again."
-                }
+                return self.error_result(self.NO_ANSWER_ERROR)
 
             # Step 3: Convert answer to speech
             audio_response = await self._text_to_speech(answer_text)
@@ -77,226 +179,42 @@ class VoiceQnAService:
 
         except Exception as e:
             logger.error(f"Error in voice Q&A: {e}")
-            return {
-                "success": False,
-                "error": "Something went wrong. Please try again."
-            }
-
-    async def _debug_audio_data(self, audio_data: bytes) -> None:
-        """Debug audio data to understand what we're receiving."""
-        logger.info(f"Received audio data: {len(audio_data)} bytes")
-        logger.info(f"First 20 bytes: {audio_data[:20]}")
-        
-        # Check for common audio file signatures
-        if audio_data.startswith(b'RIFF'):
-            logger.info("Audio format: WAV")
-        elif audio_data.startswith(b'\x1a\x45\xdf\xa3'):
-            logger.info("Audio format: WebM")
-        elif audio_data.startswith(b'ftyp'):
-            logger.info("Audio format: MP4/M4A")
-        elif audio_data.startswith(b'\xff\xf1') or audio_data.startswith(b'\xff\xf9'):
-            logger.info("Audio format: AAC")
-        elif audio_data[:4] == b'OggS':
-            logger.info("Audio format: OGG")
-        else:
-            logger.info("Audio format: Unknown/Raw")
+            return self.error_result(self.GENERIC_ERROR)
 
-    async def _speech_to_text(self, audio_data: bytes) -> Optional[str]:
-        """Convert speech audio to text using multiple fallback methods."""
-        await self._debug_audio_data(audio_data)
-        
-        try:
-            # Prioritize AAC conversion if data looks like AAC
-            if audio_data.startswith(b'\xff\xf1') or audio_data.startswith(b'\xff\xf9'):
-                wav_data = await self._convert_aac_to_wav_with_av(audio_data)
-                if wav_data:
-                    return await self._recognize_from_wav(wav_data)
-            
-            # Fallback to other methods if not AAC or if conversion fails
-            if LIBROSA_AVAILABLE:
-                wav_data = await self._convert_with_librosa(audio_data)
-                if wav_data:
-                    return await self._recognize_from_wav(wav_data)
-            
-            elif audio_data.startswith(b'RIFF'):
-                return await self._recognize_from_wav(audio_data)
-            
-            return await self._process_raw_pcm(audio_data)
-
-        except sr.UnknownValueError:
-            logger.warning("Could not understand audio")
-            return None
-        except sr.RequestError as e:
-            logger.error(f"Speech recognition error: {e}")
-            return None
-        except Exception as e:
-            logger.error(f"Error in speech to text: {e}")
-            return None
-
-    async def _convert_aac_to_wav_with_av(self, aac_data: bytes) -> Optional[bytes]:
-        """Convert AAC to WAV in memory using PyAV."""
-        try:
-            input_buffer = BytesIO(aac_data)
-            output_buffer = BytesIO()
-
-            with av.open(input_buffer, mode='r') as input_container:
-                input_stream = input_container.streams.audio[0]
-                
-                output_container = av.open(output_buffer, mode='w', format='wav')
-                output_stream = output_container.add_stream('pcm_s16le', rate=16000, layout='mono')
-
-                for frame in input_container.decode(input_stream):
-                    for packet in output_stream.encode(frame):
-                        output_container.mux(packet)
-
-                # Flush any remaining packets
-                for packet in output_stream.encode(None):
-                    output_container.mux(packet)
-
-                output_container.close()
-
-            output_buffer.seek(0)
-            return output_buffer.read()
-
-        except Exception as e:
-            logger.error(f"Error converting AAC with PyAV: {e}")
-            return None
+    async def _speech_to_text(self, audio_data: bytes, audio_format: AudioFormat) -> Optional[str]:
+        """Convert speech audio to text with exactly one decode and one recognition pass."""
+        logger.info(f"Audio format: {audio_format} ({len(audio_data)} bytes)")
 
-    async def _convert_aac_to_wav_fallback(self, aac_data: bytes) -> Optional[bytes]:
-        """Fallback AAC to WAV conversion without librosa."""
         try:
-            # AAC ADTS parsing - extract raw audio frames
-            frames = []
-            pos = 0
-            
-            while pos < len(aac_data) - 7:
-                # Look for ADTS sync word (0xFFF)
-                if aac_data[pos] == 0xFF and (aac_data[pos + 1] & 0xF0) == 0xF0:
-                    # Calculate frame length from ADTS header
-                    frame_length = ((aac_data[pos + 3] & 0x03) << 11) | \
-                                 (aac_data[pos + 4] << 3) | \
-                                 ((aac_data[pos + 5] & 0xE0) >> 5)
-                    
-                    if frame_length > 7 and pos + frame_length <= len(aac_data):
-                        # Extract raw AAC frame data (skip 7-byte ADTS header)
-                        frame_data = aac_data[pos + 7:pos + frame_length]
-                        frames.append(frame_data)
-                        pos += frame_length
-                    else:
-                        pos += 1
-                else:
-                    pos += 1
-            
-            if not frames:
-                logger.warning("No valid AAC frames found")
+            if audio_format.is_pcm16_mono_wav:
+                wav_data = audio_data
+            else:
+                wav_data = await self.convert_to_wav(audio_data)
+            if not wav_data:
                 return None
-            
-            # Combine all frame data
-            combined_data = b''.join(frames)
-            
-            # Create WAV from combined data
-            return await self._create_wav_from_raw(combined_data, sample_rate=16000)
-            
-        except Exception as e:
-            logger.error(f"Error in AAC fallback conversion: {e}")
-            return None
+            return await self.recognize_wav(wav_data)
 
-    async def _convert_with_librosa(self, audio_data: bytes) -> Optional[bytes]:
-        """Convert any audio format to WAV using librosa (for non-AAC formats)."""
-        try:
-            # Create a BytesIO buffer from the audio data
-            audio_buffer = BytesIO(audio_data)
-            
-            # Load with librosa
-            audio_array, sample_rate = librosa.load(
-                audio_buffer, 
-                sr=16000,  # Resample to 16kHz
-                mono=True  # Convert to mono
-            )
-            
-            # Convert to WAV bytes
-            output_buffer = BytesIO()
-            sf.write(output_buffer, audio_array, 16000, format='WAV', subtype='PCM_16')
-            output_buffer.seek(0)
-            
-            return output_buffer.read()
-            
+        except AudioDecodeBusyError:
+            raise
         except Exception as e:
-            logger.error(f"Error converting with librosa: {e}")
+            logger.error(f"Error in speech to text: {e}")
             return None
 
-    async def _create_wav_from_raw(self, raw_data: bytes, sample_rate: int = 16000) -> Optional[bytes]:
-        """Create a WAV file from raw audio data."""
-        try:
-            # Ensure data length is even (16-bit samples)
-            if len(raw_data) % 2 == 1:
-                raw_data += b'\x00'
-            
-            output = BytesIO()
-            with wave.open(output, 'wb') as wav_file:
-                wav_file.setnchannels(1)  # Mono
-                wav_file.setsampwidth(2)  # 16-bit
-                wav_file.setframerate(sample_rate)
-                wav_file.writeframes(raw_data)
-
-            output.seek(0)
-            return output.read()
-
-        except Exception as e:
-            logger.error(f"Error creating WAV from raw data: {e}")
-            return None
+    async def _decode(self, decoder, audio_data: bytes) -> Optional[bytes]:
+        """Run a CPU-heavy decoder off the event loop, within the request deadline."""
+        if self.decoder is not None:
+            work = self.decoder.submit(decoder, audio_data)
+        else:
+            work = asyncio.to_thread(decoder, audio_data)
+        return await asyncio.wait_for(work, deadlines.remaining())
 
-    async def _recognize_from_wav(self, wav_data: bytes) -> Optional[str]:
-        """Recognize speech from WAV audio data."""
-        try:
-            if not wav_data or len(wav_data) < 44:  # Minimum WAV header size
-                logger.warning("Invalid or empty WAV data")
-                return None
+    async def convert_to_wav(self, audio_data: bytes) -> Optional[bytes]:
+        """Decode any probed format to 16 kHz mono WAV using PyAV in the decode pool."""
+        return await self._decode(av_to_wav, audio_data)
 
-            wav_buffer = BytesIO(wav_data)
-            with sr.AudioFile(wav_buffer) as source:
-                # Adjust for ambient noise with shorter duration for short recordings
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.1)
-                
-                # Record the audio
-                audio = self.recognizer.record(source)
-                
-                # Try Google Speech Recognition with multiple attempts
-                try:
-                    text = self.recognizer.recognize_google(audio, language='en-US')
-                    logger.info(f"Successfully recognized: {text}")
-                    return text
-                except sr.UnknownValueError:
-                    # Try with different settings
-                    try:
-                        text = self.recognizer.recognize_google(audio, language='en-CA')
-                        logger.info(f"Successfully recognized (CA): {text}")
-                        return text
-                    except sr.UnknownValueError:
-                        logger.warning("Speech recognition could not understand audio")
-                        return None
-                    
-        except Exception as e:
-            logger.error(f"Error in WAV recognition: {e}")
-            return None
-
-    async def _process_raw_pcm(self, audio_data: bytes) -> Optional[str]:
-        """Process raw PCM audio data as a last resort."""
-        try:
-            # Try different sample rates
-            for sample_rate in [16000, 44100, 48000, 8000]:
-                wav_data = await self._create_wav_from_raw(audio_data, sample_rate)
-                if wav_data:
-                    text = await self._recognize_from_wav(wav_data)
-                    if text:
-                        logger.info(f"Successfully recognized with sample rate: {sample_rate}")
-                        return text
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error processing raw PCM: {e}")
-            return None
+    async def recognize_wav(self, wav_data: bytes) -> Optional[str]:
+        """Recognize speech from WAV audio data with the configured STT engine."""
+        return await self.stt.recognize(wav_data)
 
     async def _generate_answer(
         self,
@@ -304,11 +222,24 @@ class VoiceQnAService:
         lesson_context: str = "",
         grade_level: int = None
     ) -> Optional[str]:
-        """Generate an answer using Ollama/Gemma."""
+        """Generate an answer using Ollama/Gemma, degraded to match the current load."""
+        ladder = self.client.degradation
+        level = ladder.level_for(Priority.INTERACTIVE)
+        if level == DegradationLevel.FALLBACK:
+            logger.info("Model server overloaded, using canned voice answer")
+            return self.CANNED_ANSWER
+
         try:
             system_context = self._get_system_prompt(grade_level)
 
-            prompt = f"""
+            if level >= DegradationLevel.COMPACT_PROMPT:
+                prompt = f"""{system_context}
+Lesson: {lesson_context[:self.COMPACT_CONTEXT_CHARS]}
+Question: {question}
+Answer in at most 2 short, friendly sentences:
+"""
+            else:
+                prompt = f"""
 {system_context}
 
 Lesson Context: {lesson_context}
@@ -326,32 +257,34 @@ Answer:
 """
 
             payload = {
-                "model": self.model_name,
+                "model": ladder.model_for(level, self.model_name),
                 "prompt": prompt,
                 "stream": False,
-                "options": {
+                "options": ladder.apply_options(level, {
                     "temperature": 0.7,
                     "top_p": 0.9,
                     "max_tokens": 200
-                }
+                })
             }
 
-            async with aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=60)
-            ) as session:
-                async with session.post(
-                    f"{self.ollama_base_url}/api/generate",
-                    json=payload,
-                    headers={'Content-Type': 'application/json'}
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        answer = result.get('response', '').strip()
-                        return self._clean_answer_for_voice(answer)
-                    else:
-                        logger.error(f"Ollama API returned status {response.status}")
-                        return None
-
+            result = await self.client.generate_hedged(
+                payload, timeout=60, priority=Priority.INTERACTIVE, call_site="voice"
+            )
+            answer = result.get('response', '').strip()
+            matches = content_safety.scan(answer, grade_level, categories=("unsafe",))
+            if matches:
+                logger.warning(f"Voice answer failed safety check: {[m.term for m in matches]}")
+                return self.SAFE_REDIRECT_ANSWER
+            return self._clean_answer_for_voice(answer)
+
+        except CircuitOpenError as e:
+            logger.info(f"Using canned voice answer: {e}")
+            return self.CANNED_ANSWER
+        except LLMOverloadedError:
+            raise
+        except OllamaError as e:
+            logger.error(str(e))
+            return None
         except Exception as e:
             logger.error(f"Error generating answer: {e}")
             return None
@@ -383,22 +316,42 @@ Answer:
 
         return answer
 
+    def _tts_key(self, text: str) -> str:
+        return TTSCache.make_key(text, self.tts_language, self.tts_voice, "mp3")
+
     async def _text_to_speech(self, text: str) -> str:
-        """Convert text to speech and return base64 encoded audio."""
+        """Speech for ``text`` as base64 MP3, within the request deadline."""
         try:
-            # Create TTS object
-            tts = gTTS(text=text, lang='en', slow=False)
-
-            # Save to in-memory buffer
+            audio = await asyncio.wait_for(self.synthesize(text), deadlines.remaining())
+        except asyncio.TimeoutError:
+            logger.warning("Text to speech ran past the request deadline")
+            return ""
+        return base64.b64encode(audio).decode('utf-8') if audio else ""
+
+    async def synthesize(self, text: str) -> Optional[bytes]:
+        """MP3 speech for ``text``, from the TTS cache when possible; None on failure."""
+        text = TTSCache.normalize_text(text)
+        key = self._tts_key(text)
+        if self.tts_cache is not None:
+            audio = await self.tts_cache.get(key)
+            if audio is not None:
+                return audio
+        return await self._tts_flight.do(key, lambda: self._synthesize_and_store(key, text))
+
+    async def _synthesize_and_store(self, key: str, text: str) -> Optional[bytes]:
+        audio = await asyncio.to_thread(self._text_to_speech_sync, text)
+        if audio and self.tts_cache is not None:
+            await self.tts_cache.put(key, audio)
+        return audio
+
+    def _text_to_speech_sync(self, text: str) -> Optional[bytes]:
+        """Synthesize MP3 speech with gTTS; a blocking round trip to Google."""
+        try:
+            tts = gTTS(text=text, lang=self.tts_language, tld=self.tts_voice, slow=False)
             mp3_buffer = BytesIO()
             tts.write_to_fp(mp3_buffer)
-            mp3_buffer.seek(0)
-
-            # Read and encode as base64
-            audio_data = mp3_buffer.read()
-            base64_audio = base64.b64encode(audio_data).decode('utf-8')
-            return base64_audio
+            return mp3_buffer.getvalue()
 
         except Exception as e:
             logger.error(f"Error in text to speech: {e}")
-            return ""
+            return None
@@ -0,0 +1,494 @@
+# File: backend/app/services/voice_stream.py
+
+import asyncio
+import json
+import logging
+import threading
+import wave
+from io import BytesIO
+from typing import Dict, Any, Optional, List
+
+import av
+import numpy as np
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from ..core.config import settings
+from .audio_decode import AudioDecodeBusyError, TARGET_SAMPLE_RATE
+from .audio_probe import probe_audio
+from .deadlines import deadline_scope
+from .lesson_index import LessonChunkIndex
+from .voice_qna_service import VoiceQnAService
+
+logger = logging.getLogger(__name__)
+
+# Bytes per sample of the 16-bit mono PCM everything is decoded to
+SAMPLE_BYTES = 2
+
+
+def pcm_to_wav(pcm: bytes, sample_rate: int = TARGET_SAMPLE_RATE) -> bytes:
+    output = BytesIO()
+    with wave.open(output, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(SAMPLE_BYTES)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(pcm)
+    return output.getvalue()
+
+
+def _frame_bytes(frame: "av.AudioFrame") -> bytes:
+    # Planes can be padded past the last sample
+    return bytes(frame.planes[0])[:frame.samples * SAMPLE_BYTES]
+
+
+class PCMStreamDecoder:
+    """Raw s16le PCM at any rate and channel count -> 16 kHz mono s16le."""
+
+    def __init__(self, sample_rate: int = TARGET_SAMPLE_RATE, channels: int = 1):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self._layout = "mono" if channels == 1 else "stereo"
+        self._remainder = b""
+        self._resampler = None
+        if sample_rate != TARGET_SAMPLE_RATE or channels != 1:
+            self._resampler = av.AudioResampler(format="s16", layout="mono", rate=TARGET_SAMPLE_RATE)
+
+    def feed(self, chunk: bytes) -> bytes:
+        data = self._remainder + chunk
+        usable = len(data) - len(data) % (SAMPLE_BYTES * self.channels)
+        data, self._remainder = data[:usable], data[usable:]
+        if self._resampler is None or not data:
+            return data
+        frame = av.AudioFrame(format="s16", layout=self._layout, samples=usable // (SAMPLE_BYTES * self.channels))
+        frame.planes[0].update(data)
+        frame.sample_rate = self.sample_rate
+        return b"".join(_frame_bytes(f) for f in self._resampler.resample(frame))
+
+    def flush(self) -> bytes:
+        if self._resampler is None:
+            return b""
+        return b"".join(_frame_bytes(f) for f in self._resampler.resample(None))
+
+
+class ADTSStreamDecoder:
+    """ADTS AAC split into packets by the codec parser and decoded chunk by chunk."""
+
+    def __init__(self):
+        self._codec = av.CodecContext.create("aac", "r")
+        self._resampler = av.AudioResampler(format="s16", layout="mono", rate=TARGET_SAMPLE_RATE)
+
+    def _decode(self, packets) -> bytes:
+        out = []
+        for packet in packets:
+            for frame in self._codec.decode(packet):
+                out.extend(_frame_bytes(f) for f in self._resampler.resample(frame))
+        return b"".join(out)
+
+    def feed(self, chunk: bytes) -> bytes:
+        return self._decode(self._codec.parse(chunk))
+
+    def flush(self) -> bytes:
+        pcm = self._decode(self._codec.parse(None)) + self._decode([None])
+        return pcm + b"".join(_frame_bytes(f) for f in self._resampler.resample(None))
+
+
+class _ArrivingBytes:
+    """Non-seekable file for PyAV over bytes still arriving; ``read`` blocks until data or the end."""
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self._data = bytearray()
+        self._ended = False
+        self.waiting = False  # The reader consumed everything and waits for more
+
+    @property
+    def drained(self) -> bool:
+        return self.waiting and not self._data
+
+    def append(self, chunk: bytes) -> None:
+        with self.cond:
+            self._data.extend(chunk)
+            self.cond.notify_all()
+
+    def end(self) -> None:
+        with self.cond:
+            self._ended = True
+            self.cond.notify_all()
+
+    def read(self, size: int) -> bytes:
+        with self.cond:
+            while not self._data and not self._ended:
+                self.waiting = True
+                self.cond.notify_all()
+                self.cond.wait()
+            self.waiting = False
+            data = bytes(self._data[:size])
+            del self._data[:size]
+            return data
+
+
+class ContainerStreamDecoder:
+    """WebM, Ogg or fragmented MP4 demuxed and decoded by PyAV while it arrives.
+
+    The demuxer runs in its own thread and reads from a buffer that blocks
+    until more bytes come in, so ``feed`` returns the PCM of everything that
+    could be decoded so far. A file PyAV cannot read front to back (MP4 with
+    the index at the end) sets ``failed``; the caller then decodes it whole.
+    """
+
+    # Longest a feed waits for the demuxer to take up the new bytes
+    FEED_WAIT_SECONDS = 1.0
+
+    def __init__(self):
+        self._input = _ArrivingBytes()
+        self._pcm = bytearray()
+        self._done = False
+        self.failed = False
+        self._thread = threading.Thread(target=self._run, name="voice-stream-demux", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        resampler = av.AudioResampler(format="s16", layout="mono", rate=TARGET_SAMPLE_RATE)
+        try:
+            with av.open(self._input, mode="r") as container:
+                for frame in container.decode(container.streams.audio[0]):
+                    self._emit(resampler.resample(frame))
+                self._emit(resampler.resample(None))
+        except (av.FFmpegError, IndexError) as e:
+            logger.info(f"Audio stream cannot be decoded incrementally: {e}")
+            self.failed = True
+        finally:
+            with self._input.cond:
+                self._done = True
+                self._input.cond.notify_all()
+
+    def _emit(self, frames) -> None:
+        pcm = b"".join(_frame_bytes(f) for f in frames)
+        with self._input.cond:
+            self._pcm.extend(pcm)
+
+    def _take(self) -> bytes:
+        with self._input.cond:
+            pcm = bytes(self._pcm)
+            self._pcm.clear()
+        return pcm
+
+    def feed(self, chunk: bytes) -> bytes:
+        self._input.append(chunk)
+        with self._input.cond:
+            self._input.cond.wait_for(lambda: self._done or self._input.drained, self.FEED_WAIT_SECONDS)
+        return self._take()
+
+    def flush(self) -> bytes:
+        self._input.end()
+        self._thread.join(self.FEED_WAIT_SECONDS * 5)
+        return self._take()
+
+    def close(self) -> None:
+        """Stop the demuxer thread without waiting for it."""
+        self._input.end()
+
+
+class EnergyVAD:
+    """Energy-based voice activity detection on 16 kHz mono PCM.
+
+    A frame is speech when its RMS exceeds both ``threshold`` and the
+    adaptive noise floor times ``noise_ratio``. Speech starts after
+    ``min_speech_ms`` of speech frames and ends (the endpoint) after
+    ``end_silence_ms`` of silence. Offsets are in bytes of the PCM fed.
+    """
+
+    def __init__(
+        self,
+        frame_ms: int = 30,
+        threshold: Optional[float] = None,
+        noise_ratio: Optional[float] = None,
+        min_speech_ms: Optional[int] = None,
+        end_silence_ms: Optional[int] = None,
+    ):
+        self.frame_size = TARGET_SAMPLE_RATE * frame_ms // 1000 * SAMPLE_BYTES
+        self.threshold = threshold or settings.VOICE_STREAM_VAD_THRESHOLD
+        self.noise_ratio = noise_ratio or settings.VOICE_STREAM_VAD_NOISE_RATIO
+        self.min_speech_frames = max(1, (min_speech_ms or settings.VOICE_STREAM_MIN_SPEECH_MS) // frame_ms)
+        self.end_silence_frames = max(1, (end_silence_ms or settings.VOICE_STREAM_END_SILENCE_MS) // frame_ms)
+        self.reset()
+
+    def reset(self) -> None:
+        self._pending = b""
+        self._offset = 0  # Bytes of PCM analysed so far
+        self.noise_floor: Optional[float] = None
+        self.in_speech = False
+        self.speech_start: Optional[int] = None
+        self.endpoint: Optional[int] = None
+        self._speech_frames = 0
+        self._silence_frames = 0
+
+    def _frame_rms(self, data: bytes) -> "np.ndarray":
+        """RMS of every complete frame in ``data``, computed in one vectorized pass."""
+        frames = len(data) // self.frame_size
+        samples = np.frombuffer(data, dtype="<i2", count=frames * self.frame_size // SAMPLE_BYTES)
+        samples = samples.reshape(frames, self.frame_size // SAMPLE_BYTES).astype(np.float64)
+        return np.sqrt(np.mean(samples * samples, axis=1))
+
+    def feed(self, pcm: bytes) -> List[str]:
+        """Analyse more PCM; returns the events ("speech_start", "endpoint") it triggered."""
+        events = []
+        data = self._pending + pcm
+        pos = 0
+        for rms in self._frame_rms(data).tolist():
+            if self.endpoint is not None:
+                break
+            pos += self.frame_size
+            self._offset += self.frame_size
+            floor = self.noise_floor or 0.0
+            if rms >= max(self.threshold, floor * self.noise_ratio):
+                self._speech_frames += 1
+                self._silence_frames = 0
+                if not self.in_speech and self._speech_frames >= self.min_speech_frames:
+                    self.in_speech = True
+                    self.speech_start = self._offset - self._speech_frames * self.frame_size
+                    events.append("speech_start")
+            elif self.in_speech:
+                self._silence_frames += 1
+                if self._silence_frames >= self.end_silence_frames:
+                    self.endpoint = self._offset - self._silence_frames * self.frame_size
+                    events.append("endpoint")
+            else:
+                self._speech_frames = 0
+                self.noise_floor = rms if self.noise_floor is None else 0.95 * self.noise_floor + 0.05 * rms
+        self._pending = data[pos:]
+        return events
+
+
+class VoiceStreamSession:
+    """One WebSocket voice conversation.
+
+    Binary messages carry audio as it is recorded. Raw PCM, WAV, ADTS AAC
+    and the MediaRecorder containers (WebM, Ogg, fragmented MP4) are
+    decoded chunk by chunk and watched by the VAD, so speech recognition
+    starts as soon as the child stops talking. A container PyAV cannot
+    read front to back is decoded whole in the audio decode pool once the
+    client sends ``{"type": "end"}``, which also ends an utterance early
+    and closes the recording; the next binary message starts a new one.
+    Each utterance is answered on the same socket ("transcript", then
+    "answer"); audio arriving while an answer is being prepared is not
+    analysed, and ``{"type": "cancel"}`` abandons that answer.
+    """
+
+    # Audio kept before the detected speech start so the first syllable is not clipped
+    PRE_ROLL_MS = 300
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        voice_service: VoiceQnAService,
+        lesson_context: str = "",
+        grade_level: Optional[int] = None,
+        lesson_chunks: Optional[LessonChunkIndex] = None,
+        audio_format: str = "auto",
+        sample_rate: int = TARGET_SAMPLE_RATE,
+        channels: int = 1,
+    ):
+        self.websocket = websocket
+        self.voice_service = voice_service
+        self.lesson_context = lesson_context
+        self.grade_level = grade_level
+        self.lesson_chunks = lesson_chunks
+        self.audio_format = audio_format
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.max_pcm_bytes = int(settings.VOICE_STREAM_MAX_SECONDS * TARGET_SAMPLE_RATE) * SAMPLE_BYTES
+        self.pre_roll = TARGET_SAMPLE_RATE * self.PRE_ROLL_MS // 1000 * SAMPLE_BYTES
+
+        self.vad = EnergyVAD()
+        self._answer_task: Optional[asyncio.Task] = None
+        self._decoder = None
+        self._close_stream()
+
+    def _close_stream(self) -> None:
+        """Forget the decoder; the next binary message starts a new recording."""
+        if isinstance(self._decoder, ContainerStreamDecoder):
+            self._decoder.close()
+        self._decoder = None
+        self._container = False
+        self._raw: Optional[bytearray] = None  # Container bytes kept until they decode incrementally
+        self._skip_wav_header = False
+        self._reset_utterance()
+
+    def _reset_utterance(self) -> None:
+        """Drop buffered audio; a running stream continues with the next utterance."""
+        self._pcm = bytearray()
+        self._dropped = 0  # PCM bytes discarded before the speech start
+        self.vad.reset()
+
+    async def _send(self, message: Dict[str, Any]) -> None:
+        try:
+            await self.websocket.send_json(message)
+        except (WebSocketDisconnect, RuntimeError):
+            pass  # The client went away; the receive loop notices
+
+    def _open_decoder(self, chunk: bytes) -> Optional[str]:
+        """Pick the decode path from the first chunk; returns an error message or None."""
+        if self.audio_format == "pcm":
+            self._decoder = PCMStreamDecoder(self.sample_rate, self.channels)
+            return None
+        probed = probe_audio(chunk)
+        if probed is None:
+            return VoiceQnAService.UNSUPPORTED_AUDIO_ERROR
+        if probed.container == "adts":
+            self._decoder = ADTSStreamDecoder()
+        elif probed.container == "wav" and probed.codec == "pcm_s16le" and probed.sample_rate:
+            self._decoder = PCMStreamDecoder(probed.sample_rate, probed.channels or 1)
+            self._skip_wav_header = True
+        else:
+            self._decoder = ContainerStreamDecoder()
+            self._container = True
+            self._raw = bytearray()
+        return None
+
+    async def _decode(self, chunk: bytes) -> bytes:
+        if self._raw is not None:
+            self._raw.extend(chunk)
+        # PyAV decoding and resampling hold the CPU; keep them off the event loop
+        pcm = await asyncio.to_thread(self._decoder.feed, chunk)
+        if pcm:
+            self._raw = None  # The container decodes as it arrives
+        return pcm
+
+    async def _feed(self, chunk: bytes) -> List[str]:
+        if self._skip_wav_header:
+            self._skip_wav_header = False
+            data_at = chunk.find(b"data")
+            chunk = chunk[data_at + 8:] if data_at >= 0 else chunk[44:]
+
+        pcm = await self._decode(chunk)
+        if self._raw is not None and (self._decoder.failed or len(self._raw) > settings.MAX_FILE_SIZE):
+            # Nothing decodes before the end; wait for the client's "end"
+            return ["endpoint"] if len(self._raw) > settings.MAX_FILE_SIZE else []
+        self._pcm.extend(pcm)
+        events = self.vad.feed(pcm)
+        keep = self.pre_roll + self.vad.min_speech_frames * self.vad.frame_size
+        if not self.vad.in_speech and len(self._pcm) > keep:
+            # Nothing said yet: keep the pre-roll and any speech not yet confirmed
+            drop = len(self._pcm) - keep
+            del self._pcm[:drop]
+            self._dropped += drop
+        elif self.vad.in_speech and len(self._pcm) >= self.max_pcm_bytes and "endpoint" not in events:
+            events.append("endpoint")
+        return events
+
+    def _utterance_pcm(self) -> bytes:
+        """PCM from just before the speech start to the endpoint (or the end)."""
+        if self.vad.speech_start is None:
+            return b""
+        start = max(0, self.vad.speech_start - self.pre_roll - self._dropped)
+        end = len(self._pcm) if self.vad.endpoint is None else self.vad.endpoint - self._dropped
+        return bytes(self._pcm[start:end])
+
+    async def _finish_utterance(self, end_of_stream: bool = False) -> None:
+        """Hand the utterance to the answer task and get ready for the next one."""
+        if end_of_stream:
+            pcm = await asyncio.to_thread(self._decoder.flush)
+            if pcm and self._raw is not None and not self._decoder.failed:
+                self._raw = None
+            self.vad.feed(pcm)
+            self._pcm.extend(pcm)
+        # A container that never decoded incrementally is decoded whole
+        raw = bytes(self._raw) if self._raw is not None else None
+        pcm = self._utterance_pcm() if raw is None else b""
+        if end_of_stream or raw is not None:
+            self._close_stream()
+        else:
+            self._reset_utterance()
+
+        if raw is None and not self._has_speech(pcm):
+            await self._send({"type": "error", **self.voice_service.error_result(VoiceQnAService.UNRECOGNIZED_ERROR)})
+            return
+        await self._send({"type": "endpoint"})
+        with deadline_scope(settings.REQUEST_DEADLINE_VOICE_SECONDS):
+            self._answer_task = asyncio.create_task(self._answer(pcm, raw))
+
+    @staticmethod
+    def _has_speech(pcm: bytes) -> bool:
+        return len(pcm) >= TARGET_SAMPLE_RATE * SAMPLE_BYTES // 10  # At least 100 ms
+
+    async def _answer(self, pcm: bytes, container_data: Optional[bytes]) -> None:
+        service = self.voice_service
+        try:
+            if container_data is not None:
+                wav_data = await service.convert_to_wav(container_data) if container_data else None
+            else:
+                wav_data = pcm_to_wav(pcm)
+            question = await service.recognize_wav(wav_data) if wav_data else None
+            if not question:
+                await self._send({"type": "error", **service.error_result(service.UNRECOGNIZED_ERROR)})
+                return
+            await self._send({"type": "transcript", "text": question})
+
+            result = await service.answer_question(
+                question, self.lesson_context, self.grade_level, self.lesson_chunks
+            )
+            await self._send({"type": "answer", **result})
+        except AudioDecodeBusyError as e:
+            await self._send({"type": "error", **service.error_result(service.BUSY_ERROR, retry_after=e.retry_after)})
+        except asyncio.TimeoutError:
+            logger.warning("Streaming voice answer ran past the request deadline")
+            await self._send({"type": "error", **service.error_result(service.NO_ANSWER_ERROR)})
+        except Exception as e:
+            logger.error(f"Error in streaming voice Q&A: {e}")
+            await self._send({"type": "error", **service.error_result(service.GENERIC_ERROR)})
+
+    async def _control(self, text: str) -> None:
+        try:
+            control = json.loads(text).get("type")
+        except (ValueError, AttributeError):
+            await self._send({"type": "error", "error": "Unknown message"})
+            return
+        if control == "cancel" and self._busy():
+            self._answer_task.cancel()
+            await self._send({"type": "cancelled"})
+        elif control == "end" and self._decoder is not None:
+            if self._busy():
+                self._close_stream()  # The recording ended while its answer is prepared
+            else:
+                await self._finish_utterance(end_of_stream=True)
+
+    def _busy(self) -> bool:
+        return self._answer_task is not None and not self._answer_task.done()
+
+    async def run(self) -> None:
+        await self._send({"type": "ready"})
+        try:
+            while True:
+                message = await self.websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+
+                if message.get("text") is not None:
+                    await self._control(message["text"])
+                    continue
+
+                chunk = message.get("bytes") or b""
+                if not chunk:
+                    continue
+                if self._busy():
+                    if self._container:
+                        # Still answering; the demuxer needs every byte of the recording
+                        await self._decode(chunk)
+                    continue
+                if self._decoder is None:
+                    error = self._open_decoder(chunk)
+                    if error:
+                        await self._send({"type": "error", **self.voice_service.error_result(error)})
+                        continue
+
+                events = await self._feed(chunk)
+                if "speech_start" in events:
+                    await self._send({"type": "speech_start"})
+                if "endpoint" in events:
+                    await self._finish_utterance()
+        finally:
+            self._close_stream()
+            if self._busy():
+                # Client left mid-answer: stop the STT/LLM work done on its behalf
+                self._answer_task.cancel()
+                await asyncio.gather(self._answer_task, return_exceptions=True)
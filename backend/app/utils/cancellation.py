@@ -0,0 +1,52 @@
+# File: backend/app/utils/cancellation.py
+
+import asyncio
+import logging
+from typing import Awaitable, Optional, TypeVar
+
+from fastapi import HTTPException, Request
+
+from ..core.config import settings
+from ..services.deadlines import deadline_scope
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Header a client can send to say how long it will wait for the answer
+DEADLINE_HEADER = "X-Request-Timeout"
+
+
+def request_deadline(request: Request, default: float) -> float:
+    """Seconds the request may take: the client's header value, capped at ``default``."""
+    value = request.headers.get(DEADLINE_HEADER)
+    try:
+        return min(default, float(value)) if value else default
+    except ValueError:
+        return default
+
+
+async def run_until_disconnect(request: Request, work: Awaitable[T], deadline: Optional[float] = None) -> T:
+    """Await ``work`` under a request deadline and cancel it if the client goes away.
+
+    The work runs in its own task created inside ``deadline_scope``, so the
+    Ollama client sees the deadline. Every ``DISCONNECT_POLL_INTERVAL``
+    seconds the connection is checked; on disconnect the task is cancelled,
+    which aborts its upstream HTTP request and frees its scheduler slot,
+    and a 499 is raised.
+    """
+    with deadline_scope(deadline):
+        task = asyncio.ensure_future(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=settings.DISCONNECT_POLL_INTERVAL)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                logger.info(f"Client disconnected, cancelling {request.method} {request.url.path}")
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                raise HTTPException(status_code=499, detail="Client closed request")
+    finally:
+        if not task.done():
+            task.cancel()
@@ -1,8 +1,16 @@
-from fastapi import Depends, HTTPException
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from ..models.user import User
 from ..database import SessionLocal
+from ..services.ai_service import AIService
+from ..services.batch_generation import BatchTaskGenerator
+from ..services.ollama_client import OllamaClient
+from ..services.task_pool import TaskPregenerationPool
+from ..services.tutor_chat import TutorChatService
+from ..services.voice_qna_service import VoiceQnAService
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 SECRET_KEY = "YOUR_SECRET_KEY"
@@ -31,3 +39,28 @@ def get_current_user(token: str = Depends(oauth2_scheme), db=Depends(get_db)) ->
     if user is None:
         raise credentials_exception
     return user
+
+
+def get_ollama_client(request: Request) -> OllamaClient:
+    """The shared, connection-pooled Ollama client created in the app lifespan."""
+    return request.app.state.ollama_client
+
+def get_ai_service(request: Request) -> AIService:
+    """The app-scoped AIService bound to the shared Ollama client."""
+    return request.app.state.ai_service
+
+def get_task_pool(request: Request) -> Optional[TaskPregenerationPool]:
+    """The background task pre-generation pool, or None when it is disabled."""
+    return getattr(request.app.state, "task_pool", None)
+
+def get_batch_generator(request: Request) -> BatchTaskGenerator:
+    """The app-scoped runner for batch task generation jobs."""
+    return request.app.state.batch_generator
+
+def get_tutor_chat(request: Request) -> TutorChatService:
+    """The app-scoped tutoring chat service holding the chat sessions."""
+    return request.app.state.tutor_chat
+
+def get_voice_service(request: Request) -> VoiceQnAService:
+    """The app-scoped voice Q&A service and its audio decode pool."""
+    return request.app.state.voice_qna
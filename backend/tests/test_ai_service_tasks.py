@@ -0,0 +1,39 @@
+# File: backend/tests/test_ai_service_tasks.py
+
+import asyncio
+
+from app.services.ai_service import AIService
+from app.services.degradation import DegradationLadder
+from app.services.llm_scheduler import LLMScheduler
+
+
+class FakeClient:
+    """Stands in for OllamaClient, returning a fixed model reply."""
+
+    base_url = "http://ollama.test"
+
+    def __init__(self, response: str):
+        self.response = response
+        self.degradation = DegradationLadder(LLMScheduler(), enabled=False)
+        self.payloads = []
+
+    async def generate(self, payload, timeout=60, priority=None, call_site="other"):
+        self.payloads.append(payload)
+        return {"response": self.response}
+
+
+def generate_tasks(response: str, grade_level: int = 3, count: int = 5):
+    service = AIService(client=FakeClient(response))
+    return asyncio.run(service.generate_tasks_with_ollama("Plants need water.", grade_level, count))
+
+
+def test_truncated_reply_drops_the_task_without_description():
+    reply = '{"tasks": [{"title": "A", "description": "Water a plant."}, {"title": "B", "description": "Draw a leaf."}, {"title": "C", "descr'
+    assert generate_tasks(reply) == [
+        {"title": "A", "description": "Water a plant."},
+        {"title": "B", "description": "Draw a leaf."},
+    ]
+
+
+def test_unparseable_reply_gives_no_tasks():
+    assert generate_tasks("I cannot help with that.") == []
@@ -0,0 +1,127 @@
+# File: backend/tests/test_audio_probe.py
+
+import io
+import struct
+import wave
+
+import av
+import numpy as np
+import pytest
+
+from app.services.audio_probe import AudioFormat, probe_audio
+
+
+def tone(seconds=0.2, rate=16000):
+    t = np.arange(int(seconds * rate)) / rate
+    return (8000 * np.sin(2 * np.pi * 440 * t)).astype("<i2")
+
+
+def encode(container, codec, rate):
+    buffer = io.BytesIO()
+    with av.open(buffer, "w", format=container) as output:
+        stream = output.add_stream(codec, rate=rate, layout="mono")
+        samples = tone(rate=rate)
+        for start in range(0, len(samples), 960):
+            block = samples[start:start + 960]
+            frame = av.AudioFrame(format="s16", layout="mono", samples=len(block))
+            frame.planes[0].update(block.tobytes())
+            frame.sample_rate = rate
+            for packet in stream.encode(frame):
+                output.mux(packet)
+        for packet in stream.encode(None):
+            output.mux(packet)
+    return buffer.getvalue()
+
+
+def wav_file(channels=1, rate=16000, width=2):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as output:
+        output.setnchannels(channels)
+        output.setsampwidth(width)
+        output.setframerate(rate)
+        output.writeframes(b"\0" * 320 * channels * width)
+    return buffer.getvalue()
+
+
+def riff(*chunks):
+    body = b"WAVE" + b"".join(struct.pack("<4sI", cid, len(data)) + data + b"\0" * (len(data) & 1) for cid, data in chunks)
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def fmt_chunk(tag, channels, rate, bits, extension=b""):
+    block = channels * bits // 8
+    return struct.pack("<HHIIHH", tag, channels, rate, rate * block, block, bits) + extension
+
+
+def box(box_type, body):
+    return struct.pack(">I4s", 8 + len(body), box_type) + body
+
+
+def ogg_page(payload):
+    return b"OggS" + bytes(22) + bytes([1, len(payload)]) + payload
+
+
+@pytest.mark.parametrize("container, codec, rate, expected", [
+    ("webm", "libopus", 48000, AudioFormat("webm", "opus", 48000, 1)),
+    ("ogg", "libopus", 48000, AudioFormat("ogg", "opus", 48000, 1)),
+    ("mp4", "aac", 16000, AudioFormat("mp4", "aac", 16000, 1)),
+    ("adts", "aac", 22050, AudioFormat("adts", "aac", 22050, 1)),
+])
+def test_encoded_files_are_identified(container, codec, rate, expected):
+    assert probe_audio(encode(container, codec, rate)) == expected
+
+
+def test_wav_pcm_depths_and_channels():
+    mono = probe_audio(wav_file())
+    assert mono == AudioFormat("wav", "pcm_s16le", 16000, 1)
+    assert mono.is_pcm16_mono_wav
+    stereo = probe_audio(wav_file(channels=2, rate=44100))
+    assert stereo == AudioFormat("wav", "pcm_s16le", 44100, 2)
+    assert not stereo.is_pcm16_mono_wav
+    assert probe_audio(wav_file(width=1)).codec == "pcm_u8"
+
+
+def test_wav_chunks_before_fmt_are_skipped():
+    data = riff((b"LIST", b"INFOodd"), (b"fmt ", fmt_chunk(1, 1, 8000, 24)), (b"data", b""))
+    assert probe_audio(data) == AudioFormat("wav", "pcm_s24le", 8000, 1)
+
+
+def test_wav_format_tags():
+    assert probe_audio(riff((b"fmt ", fmt_chunk(7, 1, 8000, 8)))).codec == "pcm_mulaw"
+    assert probe_audio(riff((b"fmt ", fmt_chunk(0x1234, 1, 8000, 8)))).codec == "wav_0x1234"
+    # WAVE_FORMAT_EXTENSIBLE: the real tag starts the sub-format GUID
+    extension = struct.pack("<HHI", 22, 32, 4) + struct.pack("<H", 3) + bytes(14)
+    data = riff((b"fmt ", fmt_chunk(0xFFFE, 2, 48000, 32, extension)))
+    assert probe_audio(data) == AudioFormat("wav", "pcm_float", 48000, 2)
+
+
+def test_ogg_vorbis_header():
+    header = b"\x01vorbis" + struct.pack("<IBI", 0, 2, 44100) + bytes(12)
+    assert probe_audio(ogg_page(header)) == AudioFormat("ogg", "vorbis", 44100, 2)
+    assert probe_audio(ogg_page(b"unknown codec")) == AudioFormat("ogg")
+
+
+def test_mp4_sample_entry_after_the_media_data():
+    entry = bytes(6) + struct.pack(">H", 1) + bytes(8) + struct.pack(">HHHHI", 2, 16, 0, 0, 44100 << 16)
+    stsd = box(b"stsd", bytes(4) + struct.pack(">I", 1) + box(b"mp4a", entry))
+    moov = box(b"moov", box(b"trak", box(b"mdia", box(b"minf", box(b"stbl", stsd)))))
+    data = box(b"ftyp", b"M4A \0\0\0\0") + box(b"mdat", bytes(100)) + moov
+    assert probe_audio(data) == AudioFormat("mp4", "aac", 44100, 2)
+
+
+def test_truncated_headers_keep_the_container():
+    webm = encode("webm", "libopus", 48000)
+    assert probe_audio(webm[:webm.index(b"A_OPUS")]) == AudioFormat("webm")
+    assert probe_audio(encode("ogg", "libopus", 48000)[:30]) == AudioFormat("ogg")
+    assert probe_audio(riff((b"fmt ", fmt_chunk(1, 1, 8000, 16)))[:26]) == AudioFormat("wav")
+    assert probe_audio(box(b"ftyp", b"isom\0\0\0\0") + b"\0\0\1\0moov") == AudioFormat("mp4")
+    assert probe_audio(b"\x1a\x45\xdf\xa3" + b"\0" * 12) == AudioFormat("matroska")
+
+
+def test_unsupported_data_is_refused():
+    assert probe_audio(b"") is None
+    assert probe_audio(b"RIFF") is None
+    assert probe_audio(b"<html><body>not audio</body>") is None
+    assert probe_audio(b"ID3\x04" + bytes(20)) is None
+    # ADTS sync word with a reserved sampling frequency index
+    assert probe_audio(b"\xff\xf1\x3c\x80" + bytes(12)) is None
@@ -0,0 +1,86 @@
+# File: backend/tests/test_circuit_breaker.py
+
+import pytest
+
+from app.services import circuit_breaker
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", clock.monotonic)
+    return clock
+
+
+def make_breaker(**kwargs):
+    options = dict(window_size=4, failure_rate_threshold=0.5, minimum_calls=4, open_seconds=10)
+    options.update(kwargs)
+    return CircuitBreaker(**options, failure_exceptions=(RuntimeError,), ignored_exceptions=(KeyError,))
+
+
+def fail(breaker, error=RuntimeError):
+    with pytest.raises(error):
+        with breaker.call():
+            raise error("failed")
+
+
+def succeed(breaker):
+    with breaker.call():
+        pass
+
+
+def test_opens_once_the_failure_rate_is_reached(clock):
+    breaker = make_breaker()
+    succeed(breaker)
+    succeed(breaker)
+    fail(breaker)
+    assert breaker.state == CircuitState.CLOSED  # Fewer than minimum_calls
+    fail(breaker)
+    assert breaker.state == CircuitState.OPEN
+    with pytest.raises(CircuitOpenError) as error:
+        succeed(breaker)
+    assert error.value.retry_after == pytest.approx(10)
+    assert breaker.rejected == 1
+
+
+def test_ignored_and_unexpected_errors_do_not_count(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        fail(breaker, KeyError)
+        fail(breaker, ValueError)
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.failure_rate == 0.0
+
+
+def test_successful_probe_closes_the_circuit(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        fail(breaker)
+    clock.now += 10
+    succeed(breaker)
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.stats()["window_calls"] == 0
+
+
+def test_failed_probe_reopens_and_only_one_probe_runs(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        fail(breaker)
+    clock.now += 10
+    with pytest.raises(RuntimeError):
+        with breaker.call():
+            assert breaker.state == CircuitState.HALF_OPEN
+            with pytest.raises(CircuitOpenError):
+                succeed(breaker)  # A second probe is refused while the first runs
+            raise RuntimeError("still down")
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.times_opened == 2
@@ -0,0 +1,76 @@
+# File: backend/tests/test_content_safety.py
+
+import pytest
+
+from app.services.ai_service import AIService
+from app.services.content_safety import ContentSafetyEngine, content_safety, grade_band
+
+
+@pytest.mark.parametrize("grade, band", [(None, "early"), (1, "early"), (4, "elementary"), (7, "middle"), (11, "high")])
+def test_grade_bands(grade, band):
+    assert grade_band(grade) == band
+
+
+def test_unsafe_terms_match_whole_words_only():
+    assert [m.term for m in content_safety.scan("He hid a gun. Guns are not toys.", 3)] == ["gun", "guns"]
+    for text in ("Ask an adult to help.", "A scary, dangerous storm.", "Buy it at the drugstore.", "Gunther begun"):
+        assert content_safety.is_safe(text, 3), text
+
+
+def test_advanced_topics_depend_on_the_grade():
+    text = "Solve the equations with algebra."
+    assert [(m.term, m.category) for m in content_safety.scan(text, 4)] == [
+        ("equation", "too_advanced"), ("algebra", "too_advanced")
+    ]
+    assert content_safety.scan(text, 9) == []
+    assert content_safety.scan(text, 4, categories=("unsafe",)) == []
+
+
+def test_task_checks_only_refuse_advanced_topics_for_young_grades():
+    service = AIService.__new__(AIService)
+    assert not service._is_grade_appropriate("Equations", "Solve the equation.", 2)
+    assert service._is_grade_appropriate("Equations", "Solve the equation.", 7)
+    assert service._is_grade_appropriate("Equations", "Solve the equation.", None)
+    assert service._is_grade_appropriate("Counting", "Count the apples.", 2)
+
+
+TEXT = "The violent storm begun. Never touch a gun, said the teacher; gunpowder and guns"
+
+
+@pytest.mark.parametrize("split", range(1, len(TEXT)))
+def test_stream_finds_the_same_matches_wherever_the_text_is_split(split):
+    scanner = content_safety.scanner(3)
+    found = scanner.feed(TEXT[:split]) + scanner.feed(TEXT[split:]) + scanner.finish()
+    assert found == content_safety.scan(TEXT, 3)
+    assert [m.term for m in found] == ["violent", "gun", "guns"]
+
+
+def test_stream_reports_each_match_once_across_many_tokens():
+    scanner = content_safety.scanner(3)
+    found = []
+    for character in "a gun and a gun":
+        found.extend(scanner.feed(character))
+    found.extend(scanner.finish())
+    assert [(m.start, m.end) for m in found] == [(2, 5), (12, 15)]
+    assert not scanner.is_safe
+
+
+def test_stream_holds_back_a_word_that_may_go_on():
+    scanner = content_safety.scanner(3)
+    assert scanner.feed("He went to the gun") == []
+    assert scanner.feed("ther house") == []
+    assert scanner.finish() == []
+    assert scanner.is_safe
+
+
+def test_stream_category_filter():
+    scanner = content_safety.scanner(4, categories=("too_advanced",))
+    scanner.feed("A gun and an equation")
+    scanner.finish()
+    assert [m.term for m in scanner.matches] == ["equation"]
+
+
+def test_custom_term_lists():
+    engine = ContentSafetyEngine({band: {"unsafe": ("zombie",)} for band in ("early", "elementary", "middle", "high")})
+    assert not engine.is_safe("A ZOMBIE!", 10)
+    assert engine.is_safe("A gun", 10)
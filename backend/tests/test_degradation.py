@@ -0,0 +1,86 @@
+# File: backend/tests/test_degradation.py
+
+import pytest
+
+from app.services import degradation
+from app.services.degradation import DegradationLadder, DegradationLevel
+from app.services.llm_scheduler import LLMScheduler, Priority
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(degradation.time, "monotonic", clock.monotonic)
+    return clock
+
+
+def make_ladder(scheduler=None):
+    return DegradationLadder(
+        scheduler or LLMScheduler(max_concurrency=1, queue_limits={p: 50 for p in Priority}),
+        queue_thresholds=[2, 4, 8, 16],
+        slowdown_thresholds=[1.5, 2.0, 3.0, 4.0],
+        window_seconds=60,
+        enabled=True,
+    )
+
+
+def warm_up(ladder, call_site, seconds, calls=degradation.MIN_BASELINE_SAMPLES):
+    for _ in range(calls):
+        ladder.record_latency(seconds, call_site)
+
+
+def test_slow_calls_are_judged_against_their_own_call_site(clock):
+    ladder = make_ladder()
+    warm_up(ladder, "task_batch", 45.0)
+    warm_up(ladder, "voice_qna", 4.0)
+    assert ladder.level == DegradationLevel.NORMAL
+    # A long batch is normal for a batch; the same wait for a voice answer is not
+    ladder.record_latency(47.0, "task_batch")
+    assert ladder.level == DegradationLevel.NORMAL
+    ladder.record_latency(13.0, "voice_qna")
+    assert ladder.level == DegradationLevel.SMALL_MODEL
+
+
+def test_first_calls_of_a_call_site_only_build_the_baseline(clock):
+    ladder = make_ladder()
+    warm_up(ladder, "voice_qna", 60.0, calls=degradation.MIN_BASELINE_SAMPLES - 1)
+    assert ladder.stats()["signals"]["samples"] == 0
+    assert ladder.baseline("voice_qna") is None
+    assert ladder.level == DegradationLevel.NORMAL
+
+
+def test_slowdowns_age_out_of_the_window(clock):
+    ladder = make_ladder()
+    warm_up(ladder, "voice_qna", 4.0)
+    ladder.record_latency(20.0, "voice_qna")
+    assert ladder.level == DegradationLevel.FALLBACK
+    clock.now += 61
+    assert ladder.level == DegradationLevel.NORMAL
+    assert ladder.level_changes == 2
+
+
+def test_queue_depth_picks_the_step(clock):
+    scheduler = LLMScheduler(max_concurrency=1, queue_limits={p: 50 for p in Priority})
+    ladder = make_ladder(scheduler)
+    scheduler._queues[Priority.INTERACTIVE].extend([object()] * 4)
+    assert ladder.level == DegradationLevel.SHORT_OUTPUT
+    scheduler._queues[Priority.BACKGROUND].extend([object()] * 20)
+    assert ladder.level == DegradationLevel.SHORT_OUTPUT  # Background work is not counted
+    assert ladder.level_for(Priority.BACKGROUND) == DegradationLevel.NORMAL
+
+
+def test_options_and_model_follow_the_level(clock):
+    ladder = make_ladder()
+    ladder.num_predict, ladder.small_model = 160, "small"
+    assert ladder.apply_options(DegradationLevel.COMPACT_PROMPT, {"num_predict": 400}) == {"num_predict": 400}
+    assert ladder.apply_options(DegradationLevel.SHORT_OUTPUT, {"num_predict": 400}) == {"num_predict": 160}
+    assert ladder.model_for(DegradationLevel.SHORT_OUTPUT, "big") == "big"
+    assert ladder.model_for(DegradationLevel.SMALL_MODEL, "big") == "small"
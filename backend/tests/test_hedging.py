@@ -0,0 +1,82 @@
+# File: backend/tests/test_hedging.py
+
+from app.services.hedging import MIN_SAMPLES, HedgePolicy
+
+
+def make_policy(**kwargs):
+    kwargs.setdefault("percentile", 90)
+    kwargs.setdefault("min_delay", 0.5)
+    kwargs.setdefault("max_delay", 5.0)
+    kwargs.setdefault("max_ratio", 0.25)
+    return HedgePolicy(**kwargs)
+
+
+def test_delay_is_the_maximum_until_enough_samples():
+    policy = make_policy()
+    for _ in range(MIN_SAMPLES - 1):
+        policy.record_first_token(1.0)
+    assert policy.delay() == 5.0
+    policy.record_first_token(1.0)
+    assert policy.delay() == 1.0
+
+
+def test_delay_follows_the_percentile_within_bounds():
+    policy = make_policy()
+    for i in range(1, 21):
+        policy.record_first_token(i / 10)  # 0.1 .. 2.0
+    assert policy.delay() == 1.9
+
+    fast = make_policy()
+    for _ in range(MIN_SAMPLES):
+        fast.record_first_token(0.1)
+    assert fast.delay() == 0.5
+
+    slow = make_policy()
+    for _ in range(MIN_SAMPLES):
+        slow.record_first_token(30.0)
+    assert slow.delay() == 5.0
+
+
+def test_delay_uses_a_window_of_recent_samples():
+    policy = make_policy(window=MIN_SAMPLES)
+    for _ in range(MIN_SAMPLES):
+        policy.record_first_token(4.0)
+    for _ in range(MIN_SAMPLES):
+        policy.record_first_token(1.0)
+    assert policy.delay() == 1.0
+
+
+def test_burst_is_spent_then_hedges_are_rate_limited():
+    policy = make_policy(burst=2.0)
+    assert policy.try_hedge()
+    assert policy.try_hedge()
+    assert not policy.try_hedge()
+    assert (policy.hedges, policy.rate_limited) == (2, 1)
+
+
+def test_bucket_refills_by_the_ratio_per_request():
+    policy = make_policy(burst=2.0, max_ratio=0.25)
+    policy.try_hedge()
+    policy.try_hedge()
+    hedged = 0
+    for _ in range(100):
+        policy.note_request()
+        hedged += policy.try_hedge()
+    assert hedged == 25
+    assert policy.requests == 100
+
+
+def test_bucket_never_holds_more_than_the_burst():
+    policy = make_policy(burst=2.0, max_ratio=0.25)
+    for _ in range(100):
+        policy.note_request()
+    assert [policy.try_hedge() for _ in range(3)] == [True, True, False]
+
+
+def test_refund_returns_the_token():
+    policy = make_policy(burst=1.0)
+    assert policy.try_hedge()
+    policy.refund()
+    assert policy.hedges == 0
+    assert policy.try_hedge()
+    assert not policy.try_hedge()
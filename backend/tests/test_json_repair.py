@@ -0,0 +1,46 @@
+# File: backend/tests/test_json_repair.py
+
+import pytest
+
+from app.services.json_repair import parse_json
+
+
+def test_valid_json_is_parsed_unchanged():
+    assert parse_json('{"title": "A", "description": "x"}') == {"title": "A", "description": "x"}
+
+
+def test_code_fence_and_trailing_comma():
+    assert parse_json('```json\n{"title": "A", "description": "x",}\n```') == {"title": "A", "description": "x"}
+
+
+def test_prose_around_the_value_is_ignored():
+    text = 'Sure! Here it is: {"title": "A", "description": "x"} Hope this helps {"b": 1}'
+    assert parse_json(text) == {"title": "A", "description": "x"}
+
+
+def test_truncated_inside_a_string_is_closed():
+    assert parse_json('{"title": "A", "description": "cut off here') == {"title": "A", "description": "cut off here"}
+
+
+def test_truncated_after_a_key_gets_null():
+    assert parse_json('{"a": ') == {"a": None}
+
+
+def test_truncated_array_drops_dangling_comma():
+    assert parse_json("[1, 2, 3,") == [1, 2, 3]
+
+
+def test_escapes_survive_and_dangling_backslash_is_dropped():
+    assert parse_json('{"title": "Say \\"hi\\"", "description": "a\\') == {"title": 'Say "hi"', "description": "a"}
+
+
+def test_truncated_task_list_keeps_the_partial_last_task():
+    # The partial object is returned as is; callers validate required fields
+    data = parse_json('{"tasks": [{"title": "A", "description": "a"}, {"title": "C", "descr')
+    assert data == {"tasks": [{"title": "A", "description": "a"}, {"title": "C"}]}
+
+
+@pytest.mark.parametrize("text", ["no json here", "", None])
+def test_unrecoverable_output_raises_value_error(text):
+    with pytest.raises(ValueError):
+        parse_json(text)
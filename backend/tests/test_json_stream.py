@@ -0,0 +1,48 @@
+# File: backend/tests/test_json_stream.py
+
+from app.services.json_stream import IncrementalJSONFieldParser
+
+
+def feed_all(parser, fragments):
+    deltas = []
+    for fragment in fragments:
+        deltas.extend(parser.feed(fragment))
+    return deltas
+
+
+def test_fields_are_emitted_as_they_stream_in():
+    parser = IncrementalJSONFieldParser(("title", "description"))
+    assert parser.feed('{"ti') == []
+    assert parser.feed('tle": "Hel') == [("title", "Hel")]
+    assert parser.feed('lo", "description": "World"}') == [("title", "lo"), ("description", "World")]
+    assert parser.values == {"title": "Hello", "description": "World"}
+    assert parser.completed == ["title", "description"]
+    assert parser.closed
+
+
+def test_escapes_split_across_fragments_are_decoded():
+    parser = IncrementalJSONFieldParser(("title",))
+    feed_all(parser, ['{"title": "a\\', 'nb \\u00', 'e9 \\ud83d', '\\ude00"}'])
+    assert parser.values["title"] == "a\nb é 😀"
+
+
+def test_nested_and_unwatched_values_are_skipped():
+    parser = IncrementalJSONFieldParser(("title",))
+    deltas = feed_all(parser, ['{"meta": {"title": "nested"}, "other": "x", "title": "top"}'])
+    assert deltas == [("title", "top")]
+    assert parser.values == {"title": "top"}
+
+
+def test_text_after_the_object_is_ignored():
+    parser = IncrementalJSONFieldParser(("title",))
+    feed_all(parser, ['{"title": "A"}', ' {"title": "B"}'])
+    assert parser.closed
+    assert parser.values == {"title": "A"}
+
+
+def test_unfinished_field_is_not_completed():
+    parser = IncrementalJSONFieldParser(("title", "description"))
+    feed_all(parser, ['{"title": "A", "description": "half'])
+    assert parser.values == {"title": "A", "description": "half"}
+    assert parser.completed == ["title"]
+    assert not parser.closed
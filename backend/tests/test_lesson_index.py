@@ -0,0 +1,139 @@
+# File: backend/tests/test_lesson_index.py
+
+import json
+
+from app.models import Lesson, LessonSummary
+from app.services.lesson_index import (
+    LessonChunkIndex, LessonIndexRegistry, chunk_text, content_hash, estimate_tokens, tokenize,
+)
+
+LESSON = (
+    "Plants need sunlight to grow. Green leaves catch the sunlight.\n\n"
+    "Roots drink water from soil. Water moves up the stem.\n\n"
+    "Bees carry pollen between flowers. Pollen helps flowers make seeds.\n\n"
+    "Seeds travel on the wind. Seeds travel in animal fur."
+)
+
+
+def make_index(content: str = LESSON, chunk_words: int = 10) -> LessonChunkIndex:
+    return LessonChunkIndex("Plants", content, chunk_words)
+
+
+def test_tokenize_drops_stopwords_and_punctuation():
+    assert tokenize("What is the Sun's job, and why?") == ["sun", "s", "job"]
+
+
+def test_chunks_keep_whole_sentences():
+    assert chunk_text("One two three. Four five six. Seven.", chunk_words=4) == [
+        "One two three. Four five six.", "Seven."
+    ]
+    assert chunk_text("A  short\nline.\n\nNext   paragraph", chunk_words=100) == [
+        "A short line. Next paragraph"
+    ]
+    assert chunk_text("   ", chunk_words=10) == []
+
+
+def test_search_ranks_chunks_by_bm25():
+    index = make_index()
+    assert len(index.chunks) == 4
+    # "pollen" is only in chunk 2, twice
+    assert [i for _, i in index.search("Which bees carry pollen?", 3)] == [2]
+    # "seeds" occurs twice in chunk 3 and once in chunk 2
+    ranked = index.search("seeds", 3)
+    assert [i for _, i in ranked] == [3, 2]
+    assert ranked[0][0] > ranked[1][0]
+
+
+def test_rare_terms_outweigh_common_ones():
+    index = LessonChunkIndex("", "cat dog. cat bird. cat fish. cat cow.", chunk_words=2)
+    ranked = index.search("cat fish", 4)
+    assert ranked[0][1] == 2
+    assert len(ranked) == 4
+
+
+def test_longer_chunks_score_lower_for_the_same_term_count():
+    index = LessonChunkIndex("", "moon rocks. moon rocks dust craters orbit tides.", chunk_words=2)
+    assert [i for _, i in index.search("moon", 2)] == [0, 1]
+
+
+def test_search_ignores_unknown_words_and_respects_k():
+    index = make_index()
+    assert index.search("volcano", 3) == []
+    assert index.search("the and of", 3) == []
+    assert len(index.search("seeds water sunlight pollen", 2)) == 2
+
+
+def test_context_keeps_lesson_order_within_the_budget():
+    index = make_index()
+    budget = estimate_tokens("Plants") + estimate_tokens(index.chunks[3]) + estimate_tokens(index.chunks[2])
+    context = index.context_for("seeds", top_k=3, token_budget=budget)
+    assert context == f"{index.chunks[2]} {index.chunks[3]}"
+    # One chunk short of the budget: only the best match fits
+    context = index.context_for("seeds", top_k=3, token_budget=budget - 1)
+    assert context == index.chunks[3]
+
+
+def test_context_always_includes_the_best_chunk():
+    index = make_index()
+    assert index.context_for("seeds", top_k=3, token_budget=1) == index.chunks[3]
+
+
+def test_context_without_a_match_opens_the_lesson():
+    index = make_index()
+    assert index.context_for("volcano", top_k=2, token_budget=1000) == f"{index.chunks[0]} {index.chunks[1]}"
+    assert index.context_for(top_k=1, token_budget=1000) == index.chunks[0]
+
+
+def test_summary_comes_first_and_counts_against_the_budget():
+    index = make_index()
+    summary = "Plants grow from seeds."
+    assert index.context_for("volcano", top_k=3, token_budget=1000, summary=summary) == summary
+    assert index.context_for("seeds", top_k=3, token_budget=1000, summary=summary) == (
+        f"{summary} {index.chunks[2]} {index.chunks[3]}"
+    )
+    # No room left after the summary: the matching chunks are dropped
+    assert index.context_for("seeds", top_k=3, token_budget=1, summary=summary) == summary
+
+
+def make_lesson(**kwargs) -> Lesson:
+    kwargs.setdefault("id", 1)
+    kwargs.setdefault("title", "Plants")
+    kwargs.setdefault("content", LESSON)
+    kwargs.setdefault("grade", 3)
+    return Lesson(**kwargs)
+
+
+def test_registry_rebuilds_when_the_lesson_changes():
+    registry = LessonIndexRegistry()
+    lesson = make_lesson()
+    first = registry.get(lesson)
+    assert registry.get(lesson) is first
+    lesson.content = "Something new entirely."
+    second = registry.get(lesson)
+    assert second is not first
+    assert second.chunks == ["Something new entirely."]
+    assert (registry.builds, registry.hits) == (2, 1)
+    registry.invalidate(lesson.id)
+    assert registry.stats()["lessons"] == 0
+
+
+def test_registry_uses_only_a_current_summary():
+    registry = LessonIndexRegistry()
+    lesson = make_lesson()
+    lesson.summary = LessonSummary(
+        content_hash=content_hash(lesson), summary="Plants grow.", key_terms=json.dumps(["roots", "seeds"])
+    )
+    assert registry.summary_for(lesson) == "Plants grow. Key terms: roots, seeds."
+    assert registry.context_for(lesson) == "Plants grow. Key terms: roots, seeds."
+    # A question adds the matching lesson text after the summary
+    assert registry.context_for(lesson, "pollen") == f"Plants grow. Key terms: roots, seeds. {' '.join(LESSON.split())}"
+
+    lesson.grade = 4  # The summary was written for another revision
+    assert registry.summary_for(lesson) == ""
+    assert registry.context_for(lesson).startswith("Plants need sunlight")
+
+
+def test_registry_without_content_uses_the_title():
+    registry = LessonIndexRegistry()
+    assert registry.context_for(make_lesson(content="")) == "Plants"
+    assert registry.context_for(make_lesson(content="", title="")) == "General learning activity"
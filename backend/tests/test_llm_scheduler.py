@@ -0,0 +1,95 @@
+# File: backend/tests/test_llm_scheduler.py
+
+import asyncio
+
+import pytest
+
+from app.services.llm_scheduler import LLMOverloadedError, LLMScheduler, Priority
+
+
+def make_scheduler(max_concurrency=1, queue_limit=5, queue_timeout=5.0):
+    return LLMScheduler(
+        max_concurrency=max_concurrency,
+        queue_limits={p: queue_limit for p in Priority},
+        queue_timeouts={p: queue_timeout for p in Priority},
+    )
+
+
+def test_waiters_are_admitted_by_priority_then_fifo():
+    async def scenario():
+        scheduler, order = make_scheduler(), []
+        await scheduler.acquire(Priority.TASK)
+
+        async def call(priority, name):
+            async with scheduler.slot(priority):
+                order.append(name)
+
+        waiters = [
+            asyncio.create_task(call(Priority.BACKGROUND, "background")),
+            asyncio.create_task(call(Priority.TASK, "task-1")),
+            asyncio.create_task(call(Priority.INTERACTIVE, "interactive")),
+            asyncio.create_task(call(Priority.TASK, "task-2")),
+        ]
+        await asyncio.sleep(0.01)
+        scheduler.release(Priority.TASK)
+        await asyncio.gather(*waiters)
+        return order, scheduler
+
+    order, scheduler = asyncio.run(scenario())
+    assert order == ["interactive", "task-1", "task-2", "background"]
+    assert scheduler.active == 0
+
+
+def test_full_queue_sheds_immediately():
+    async def scenario():
+        scheduler = make_scheduler(queue_limit=1)
+        await scheduler.acquire(Priority.TASK)
+        queued = asyncio.create_task(scheduler.acquire(Priority.TASK))
+        await asyncio.sleep(0.01)
+        with pytest.raises(LLMOverloadedError) as error:
+            await scheduler.acquire(Priority.TASK)
+        queued.cancel()
+        await asyncio.gather(queued, return_exceptions=True)
+        return error.value, scheduler
+
+    error, scheduler = asyncio.run(scenario())
+    assert error.reason == "queue full"
+    assert error.retry_after >= 1
+    assert scheduler.shed[Priority.TASK] == 1
+    assert scheduler.queue_depth() == 0
+
+
+def test_waiting_past_the_queue_deadline_is_shed():
+    async def scenario():
+        scheduler = make_scheduler()
+        await scheduler.acquire(Priority.INTERACTIVE)
+        with pytest.raises(LLMOverloadedError) as error:
+            await scheduler.acquire(Priority.INTERACTIVE, queue_timeout=0.02)
+        return error.value, scheduler
+
+    error, scheduler = asyncio.run(scenario())
+    assert error.reason == "queue deadline exceeded"
+    assert scheduler.expired[Priority.INTERACTIVE] == 1
+    assert scheduler.queue_depth() == 0
+
+
+def test_cancelled_waiter_does_not_leak_its_slot():
+    async def scenario():
+        scheduler = make_scheduler()
+        await scheduler.acquire(Priority.TASK)
+
+        async def call():
+            async with scheduler.slot(Priority.TASK):
+                await asyncio.sleep(0.01)
+
+        waiter = asyncio.create_task(call())
+        await asyncio.sleep(0.01)
+        # Hand the slot over and cancel the waiter before it resumes
+        scheduler.release(Priority.TASK)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        return scheduler
+
+    scheduler = asyncio.run(scenario())
+    assert scheduler.active == 0
+    assert scheduler.try_acquire(Priority.TASK)
@@ -0,0 +1,81 @@
+# File: backend/tests/test_model_residency.py
+
+import asyncio
+
+from app.services.model_residency import ModelResidencyManager
+
+
+class FakeBackends:
+    def healthy_backends(self):
+        return ["http://ollama.test"]
+
+
+class FakeClient:
+    """Records the order of unload requests and generations."""
+
+    def __init__(self, unload_seconds=0.05):
+        self.backends = FakeBackends()
+        self.unload_seconds = unload_seconds
+        self.events = []
+
+    async def generate_on(self, backend, payload, timeout=60):
+        self.events.append("unload started")
+        await asyncio.sleep(self.unload_seconds)
+        self.events.append("unload done")
+        return {}
+
+
+def make_manager(client):
+    return ModelResidencyManager(
+        client, primary_model="big", keep_alive="30m", secondary_keep_alive="1m", secondary_idle_seconds=0.01
+    )
+
+
+def test_model_counts_as_loaded_only_after_a_response():
+    manager = make_manager(FakeClient())
+    payload = manager.prepare({"model": "small", "prompt": "hi"})
+    assert payload["keep_alive"] == "1m"
+    assert not manager.models["small"].loaded
+    manager.observe("small", {"load_duration": 2 * 10**9})
+    stats = manager.models["small"].as_dict()
+    assert stats["loaded"] and stats["loads"] == 1
+
+
+def test_request_starting_during_an_unload_waits_for_it():
+    async def scenario():
+        client = FakeClient()
+        manager = make_manager(client)
+        manager.observe("small", {})
+
+        async def request():
+            async with manager.in_use("small"):
+                client.events.append("request")
+
+        unload = asyncio.create_task(manager.unload("small"))
+        await asyncio.sleep(0.01)
+        await asyncio.gather(unload, request())
+        return client.events
+
+    assert asyncio.run(scenario()) == ["unload started", "unload done", "request"]
+
+
+def test_idle_loop_skips_models_in_use():
+    async def scenario():
+        client = FakeClient(unload_seconds=0)
+        manager = make_manager(client)
+        manager.observe("small", {})
+        manager.observe("big", {})
+        await manager.start(warmup=False)
+        try:
+            async with manager.in_use("small"):
+                await asyncio.sleep(1.2)  # Longer than the idle interval
+                busy_unloads = manager.models["small"].unloads
+            await asyncio.sleep(1.2)
+        finally:
+            await manager.stop()
+        return busy_unloads, manager.models
+
+    busy_unloads, models = asyncio.run(scenario())
+    assert busy_unloads == 0
+    assert models["small"].unloads == 1 and not models["small"].loaded
+    assert models["big"].unloads == 0  # The primary model stays resident
@@ -0,0 +1,79 @@
+# File: backend/tests/test_ollama_failover.py
+
+import asyncio
+import socket
+
+import aiohttp
+from aiohttp import web
+
+from app.services import deadlines
+from app.services.llm_scheduler import Priority
+from app.services.ollama_backends import BackendPool
+from app.services.ollama_client import OllamaClient
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def start_server(delay: float = 0.0):
+    calls = []
+
+    async def generate(request):
+        calls.append(await request.json())
+        await asyncio.sleep(delay)
+        return web.json_response({"response": "ok", "done": True})
+
+    app = web.Application()
+    app.router.add_post("/api/generate", generate)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    port = free_port()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner, f"http://127.0.0.1:{port}", calls
+
+
+def run_against(first_url_of, delay, timeout, deadline=None, sock_read=None):
+    """Generate once with ``first_url_of(server_url)`` as the first backend and the server second."""
+    async def scenario():
+        runner, url, calls = await start_server(delay)
+        pool = BackendPool([first_url_of(url), url], eject_after=1)
+        client = OllamaClient(backends=pool)
+        if sock_read is not None:
+            # A read timeout shorter than the total makes aiohttp raise SocketTimeoutError
+            client._timeout = lambda total: aiohttp.ClientTimeout(total=total, sock_read=sock_read)
+        try:
+            with deadlines.deadline_scope(deadline):
+                try:
+                    result = await client.generate({"model": "m", "prompt": "p"}, timeout, Priority.TASK)
+                except Exception as e:
+                    result = e
+            return result, calls, [b.failures for b in pool.backends]
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    return asyncio.run(scenario())
+
+
+def test_unreachable_backend_fails_over():
+    result, calls, failures = run_against(lambda url: f"http://127.0.0.1:{free_port()}", 0.0, 5)
+    assert result["response"] == "ok"
+    assert len(calls) == 1
+    assert failures == [1, 0]
+
+
+def test_read_timeout_is_not_retried_elsewhere():
+    result, calls, failures = run_against(lambda url: url, 1.0, 5, sock_read=0.2)
+    assert isinstance(result, aiohttp.SocketTimeoutError)
+    assert len(calls) == 1
+    assert failures == [1, 0]
+
+
+def test_expired_deadline_does_not_count_against_the_backend():
+    result, calls, failures = run_against(lambda url: url, 1.0, 5, deadline=0.2)
+    assert isinstance(result, deadlines.DeadlineExceededError)
+    assert len(calls) == 1
+    assert failures == [0, 0]
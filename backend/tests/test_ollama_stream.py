@@ -0,0 +1,75 @@
+# File: backend/tests/test_ollama_stream.py
+
+import asyncio
+import json
+import socket
+from contextlib import aclosing
+
+from aiohttp import web
+
+from app.services.ollama_backends import BackendPool
+from app.services.ollama_client import OllamaClient
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def start_server(pieces):
+    async def generate(request):
+        response = web.StreamResponse()
+        await response.prepare(request)
+        for piece in pieces:
+            await response.write((json.dumps({"response": piece, "done": False}) + "\n").encode())
+            await asyncio.sleep(0.01)
+        done = {"response": "", "done": True, "eval_count": len(pieces), "total_duration": 10**9}
+        await response.write((json.dumps(done) + "\n").encode())
+        return response
+
+    app = web.Application()
+    app.router.add_post("/api/generate", generate)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    port = free_port()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def stream(read_chunks):
+    """Read ``read_chunks`` chunks of a ten-chunk stream, then close it."""
+    async def scenario():
+        runner, url = await start_server([f"t{i}" for i in range(10)])
+        client = OllamaClient(backends=BackendPool([url]))
+        try:
+            received = []
+            async with aclosing(client.generate_stream({"model": "m", "prompt": "p"}, call_site="task_stream")) as chunks:
+                async for chunk in chunks:
+                    received.append(chunk)
+                    if len(received) == read_chunks:
+                        break
+            return received, client
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    return asyncio.run(scenario())
+
+
+def test_stream_read_to_the_end_records_the_final_chunk():
+    received, client = stream(read_chunks=None)
+    assert received[-1]["done"]
+    telemetry = client.telemetry.stats()["by_call_site"]["task_stream"]
+    assert telemetry["calls"] == 1 and telemetry["eval_tokens"] == 10
+    assert "task_stream" in client.degradation.stats()["baseline_seconds"]
+
+
+def test_stream_closed_early_still_records_telemetry_and_success():
+    received, client = stream(read_chunks=3)
+    assert len(received) == 3
+    telemetry = client.telemetry.stats()["by_call_site"]["task_stream"]
+    assert telemetry["calls"] == 1 and telemetry["eval_tokens"] == 3
+    assert "task_stream" in client.degradation.stats()["baseline_seconds"]
+    breaker = client.breaker.stats()
+    assert breaker["window_calls"] == 1 and breaker["failure_rate"] == 0.0
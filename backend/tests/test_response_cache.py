@@ -0,0 +1,118 @@
+# File: backend/tests/test_response_cache.py
+
+import asyncio
+
+import pytest
+
+from app.services import response_cache
+from app.services.response_cache import ResponseCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(response_cache.time, "time", clock.time)
+    return clock
+
+
+@pytest.fixture
+def make_cache(tmp_path):
+    caches = []
+
+    def make(**kwargs):
+        kwargs.setdefault("memory_entries", 10)
+        kwargs.setdefault("ttl_seconds", 60)
+        kwargs.setdefault("max_rows", 100)
+        cache = ResponseCache(str(tmp_path / "cache.db"), **kwargs)
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        cache.close()
+
+
+def test_keys_ignore_whitespace_and_case_but_not_settings():
+    key = ResponseCache.make_key("Plants  need\nwater.", "early", "llama", {"temperature": 0.7})
+    assert key == ResponseCache.make_key("plants need water.", "early", "llama", {"temperature": 0.7})
+    assert key != ResponseCache.make_key("plants need water.", "middle", "llama", {"temperature": 0.7})
+    assert key != ResponseCache.make_key("plants need water.", "early", "llama", {"temperature": 0.2})
+
+
+def test_memory_tier_evicts_the_least_recently_used(clock, make_cache):
+    cache = make_cache(memory_entries=2)
+
+    async def scenario():
+        await cache.set("a", {"v": "a"})
+        await cache.set("b", {"v": "b"})
+        await cache.get("a")  # "b" is now the least recently used
+        await cache.set("c", {"v": "c"})
+        assert list(cache._memory) == ["a", "c"]
+        # The evicted entry is still served from SQLite and promoted again
+        assert await cache.get("b") == {"v": "b"}
+        assert list(cache._memory) == ["c", "b"]
+
+    asyncio.run(scenario())
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (1, 1, 0)
+    assert stats["evictions"] == 2
+
+
+def test_entries_expire_in_both_tiers(clock, make_cache):
+    cache = make_cache(ttl_seconds=60)
+
+    async def scenario():
+        await cache.set("a", {"v": "a"})
+        clock.now += 60
+        assert await cache.get("a") == {"v": "a"}
+        clock.now += 1
+        assert await cache.get("a") is None
+        assert "a" not in cache._memory
+        assert cache._db_get("a") is None
+
+    asyncio.run(scenario())
+    assert cache.stats()["misses"] == 1
+
+
+def test_disk_tier_is_trimmed_by_last_access(clock, make_cache):
+    cache = make_cache(memory_entries=1, max_rows=2)
+
+    async def scenario():
+        await cache.set("a", {"v": "a"})
+        clock.now += 1
+        await cache.set("b", {"v": "b"})
+        clock.now += 1
+        cache._memory.clear()
+        assert await cache.get("a") == {"v": "a"}  # Refreshes its last access on disk
+        clock.now += 1
+        await cache.set("c", {"v": "c"})
+        cache._memory.clear()
+        assert await cache.get("b") is None
+        assert await cache.get("a") == {"v": "a"}
+        assert await cache.get("c") == {"v": "c"}
+
+    asyncio.run(scenario())
+
+
+def test_entries_survive_a_restart(clock, make_cache):
+    asyncio.run(make_cache().set("a", {"v": "a"}))
+    assert asyncio.run(make_cache().get("a")) == {"v": "a"}
+
+
+def test_returned_values_are_copies(clock, make_cache):
+    cache = make_cache()
+
+    async def scenario():
+        await cache.set("a", {"v": "a"})
+        (await cache.get("a"))["v"] = "changed"
+        assert await cache.get("a") == {"v": "a"}
+
+    asyncio.run(scenario())
@@ -0,0 +1,104 @@
+# File: backend/tests/test_single_flight.py
+
+import asyncio
+
+from app.services import deadlines
+from app.services.deadlines import DeadlineExceededError
+from app.services.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_execution():
+    async def scenario():
+        flight, calls = SingleFlight(), []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        results = await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+        return results, calls, flight.stats()
+
+    results, calls, stats = asyncio.run(scenario())
+    assert results == ["ok"] * 5
+    assert len(calls) == 1
+    assert stats["executions"] == 1 and stats["coalesced"] == 4 and stats["in_flight"] == 0
+
+
+def test_errors_reach_every_caller():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        return await asyncio.gather(flight.do("k", work), flight.do("k", work), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_shared_work_ignores_the_first_callers_deadline():
+    async def scenario():
+        flight, seen = SingleFlight(), []
+
+        async def work():
+            seen.append(deadlines.remaining())
+            await asyncio.sleep(0.2)
+            return "ok"
+
+        async def caller(seconds):
+            with deadlines.deadline_scope(seconds):
+                return await flight.do("k", work)
+
+        results = await asyncio.gather(caller(0.05), caller(5), return_exceptions=True)
+        return results, seen
+
+    (short, long), seen = asyncio.run(scenario())
+    assert isinstance(short, DeadlineExceededError)
+    assert long == "ok"
+    assert seen == [None]
+
+
+def test_shared_work_is_cancelled_when_every_caller_leaves():
+    async def scenario():
+        flight, finished = SingleFlight(), []
+
+        async def work():
+            await asyncio.sleep(1)
+            finished.append(1)
+
+        callers = [asyncio.create_task(flight.do("k", work)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        callers[0].cancel()
+        await asyncio.sleep(0.01)
+        still_running = flight.stats()["in_flight"]
+        callers[1].cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0.01)
+        return still_running, flight.stats()["in_flight"], finished
+
+    still_running, in_flight, finished = asyncio.run(scenario())
+    assert still_running == 1
+    assert in_flight == 0
+    assert finished == []
+
+
+def test_a_cancelled_caller_does_not_affect_the_others():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        first = asyncio.create_task(flight.do("k", work))
+        second = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await asyncio.gather(first, second, return_exceptions=True)
+
+    first, second = asyncio.run(scenario())
+    assert isinstance(first, asyncio.CancelledError)
+    assert second == "ok"
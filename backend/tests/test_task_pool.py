@@ -0,0 +1,80 @@
+# File: backend/tests/test_task_pool.py
+
+import asyncio
+
+from app.services.task_pool import TaskPregenerationPool
+
+
+class FakeClient:
+    def is_idle(self, idle_seconds):
+        return True
+
+
+class FakeAIService:
+    """Makes tasks that name the lesson text they were generated from."""
+
+    def __init__(self, delay=0.0):
+        self.client = FakeClient()
+        self.delay = delay
+        self.calls = []
+
+    async def generate_tasks_with_ollama(self, lesson_content, grade_level, count, priority):
+        self.calls.append(lesson_content)
+        await asyncio.sleep(self.delay)
+        return [{"title": f"Task {i}", "description": lesson_content} for i in range(count)]
+
+
+async def drain(pool):
+    await asyncio.wait_for(pool._queue.join(), 1)
+
+
+def run_pool(scenario, delay=0.0):
+    async def main():
+        pool = TaskPregenerationPool(FakeAIService(delay), depth=2, refill_concurrency=1, idle_seconds=0)
+        pool._workers = [asyncio.create_task(pool._worker())]
+        try:
+            return await scenario(pool)
+        finally:
+            await pool.stop()
+
+    return asyncio.run(main())
+
+
+def test_take_serves_pregenerated_tasks_and_refills():
+    async def scenario(pool):
+        assert pool.take(1, 3, "plants v1") is None
+        await drain(pool)
+        first = pool.take(1, 3, "plants v1")
+        await drain(pool)
+        return first, pool.stats()
+
+    first, stats = run_pool(scenario)
+    assert first["description"] == "plants v1"
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["ready_tasks"] == 2
+
+
+def test_changed_lesson_text_drops_stale_tasks():
+    async def scenario(pool):
+        pool.request_refill(1, 3, "plants v1")
+        await drain(pool)
+        task = pool.take(1, 3, "plants v2 with summary")
+        await drain(pool)
+        return task, pool.take(1, 3, "plants v2 with summary"), pool.stats()
+
+    stale_take, fresh, stats = run_pool(scenario)
+    assert stale_take is None
+    assert fresh["description"] == "plants v2 with summary"
+    assert stats["stale_dropped"] == 2
+
+
+def test_batch_generated_from_old_text_is_discarded():
+    async def scenario(pool):
+        pool.request_refill(1, 3, "plants v1")
+        await asyncio.sleep(0.01)  # The worker is generating from v1
+        pool.request_refill(1, 3, "plants v2")
+        await drain(pool)
+        return [pool.take(1, 3, "plants v2")["description"] for _ in range(2)], pool.stats()
+
+    descriptions, stats = run_pool(scenario, delay=0.05)
+    assert descriptions == ["plants v2", "plants v2"]
+    assert stats["stale_dropped"] == 2
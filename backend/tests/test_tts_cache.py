@@ -0,0 +1,130 @@
+# File: backend/tests/test_tts_cache.py
+
+import asyncio
+import os
+
+from app.services.tts_cache import TTSCache
+
+
+def clip(size: int, fill: bytes = b"a") -> bytes:
+    return fill * size
+
+
+def test_keys_ignore_whitespace_but_not_wording_or_voice():
+    key = TTSCache.make_key("Great  job!\n", "en", "default", "mp3")
+    assert key == TTSCache.make_key("Great job!", "en", "default", "mp3")
+    assert key != TTSCache.make_key("great job!", "en", "default", "mp3")
+    assert key != TTSCache.make_key("Great job.", "en", "default", "mp3")
+    assert key != TTSCache.make_key("Great job!", "es", "default", "mp3")
+    assert key != TTSCache.make_key("Great job!", "en", "default", "wav")
+
+
+def test_memory_tier_evicts_by_bytes_least_recently_used(tmp_path):
+    cache = TTSCache(str(tmp_path), memory_bytes=25, disk_bytes=1000)
+
+    async def scenario():
+        await cache.put("a", clip(10))
+        await cache.put("b", clip(10))
+        assert cache.peek("a") is not None  # "b" is now the least recently used
+        await cache.put("c", clip(10))
+        assert list(cache._memory) == ["a", "c"]
+        # Still on disk, and promoted back into memory
+        assert await cache.get("b") == clip(10)
+        assert list(cache._memory) == ["c", "b"]
+
+    asyncio.run(scenario())
+    stats = cache.stats()
+    assert (stats["memory_bytes"], stats["disk_entries"], stats["disk_bytes"]) == (20, 3, 30)
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (0, 1, 0)
+
+
+def test_a_clip_larger_than_the_memory_budget_is_kept_alone(tmp_path):
+    cache = TTSCache(str(tmp_path), memory_bytes=10, disk_bytes=1000)
+
+    async def scenario():
+        await cache.put("a", clip(5))
+        await cache.put("big", clip(50))
+        assert list(cache._memory) == ["big"]
+
+    asyncio.run(scenario())
+
+
+def test_disk_tier_is_trimmed_least_recently_used(tmp_path):
+    cache = TTSCache(str(tmp_path), memory_bytes=1, disk_bytes=25)
+
+    async def scenario():
+        await cache.put("a", clip(10))
+        await cache.put("b", clip(10))
+        assert await cache.get("a") == clip(10)
+        await cache.put("c", clip(10))
+        assert await cache.get("b") is None
+
+    asyncio.run(scenario())
+    assert sorted(os.listdir(tmp_path)) == ["a.mp3", "c.mp3"]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_pinned_clips_are_never_evicted(tmp_path):
+    cache = TTSCache(str(tmp_path), memory_bytes=15, disk_bytes=15)
+    cache.pin("hello")
+
+    async def scenario():
+        await cache.put("hello", clip(10))
+        for key in ("x", "y", "z"):
+            await cache.put(key, clip(10))
+        assert cache.peek("hello") == clip(10)
+        assert await cache.get("hello") == clip(10)
+
+    asyncio.run(scenario())
+    # The pinned clip fills the budget, so only it is left on disk
+    assert sorted(os.listdir(tmp_path)) == ["hello.mp3"]
+    assert cache.stats()["pinned"] == 1
+
+
+def test_replacing_a_clip_keeps_the_byte_counts(tmp_path):
+    cache = TTSCache(str(tmp_path), memory_bytes=100, disk_bytes=100)
+
+    async def scenario():
+        await cache.put("a", clip(10))
+        await cache.put("a", clip(20, b"b"))
+        assert await cache.get("a") == clip(20, b"b")
+
+    asyncio.run(scenario())
+    stats = cache.stats()
+    assert (stats["memory_bytes"], stats["disk_bytes"], stats["disk_entries"]) == (20, 20, 1)
+
+
+def test_files_deleted_behind_the_cache_are_misses(tmp_path):
+    cache = TTSCache(str(tmp_path), memory_bytes=1, disk_bytes=100)
+
+    async def scenario():
+        await cache.put("a", clip(10))
+        cache._memory.clear()
+        os.remove(tmp_path / "a.mp3")
+        assert await cache.get("a") is None
+
+    asyncio.run(scenario())
+    stats = cache.stats()
+    assert (stats["disk_entries"], stats["disk_bytes"], stats["misses"]) == (0, 0, 1)
+
+
+def test_start_indexes_earlier_files_within_the_budget(tmp_path):
+    for i, key in enumerate(("old", "mid", "new")):
+        path = tmp_path / f"{key}.mp3"
+        path.write_bytes(clip(10))
+        os.utime(path, (1000 + i, 1000 + i))
+    (tmp_path / "partial.mp3.123.tmp").write_bytes(b"x")
+
+    cache = TTSCache(str(tmp_path), memory_bytes=100, disk_bytes=25)
+    asyncio.run(cache.start())
+    assert list(cache._disk) == ["mid", "new"]
+    assert sorted(os.listdir(tmp_path)) == ["mid.mp3", "new.mp3"]
+    assert asyncio.run(cache.get("new")) == clip(10)
+
+
+def test_peek_never_reads_the_disk(tmp_path):
+    cache = TTSCache(str(tmp_path), memory_bytes=1, disk_bytes=100)
+    asyncio.run(cache.put("a", clip(10)))
+    cache._memory.clear()
+    assert cache.peek("a") is None
+    assert cache.stats()["misses"] == 0
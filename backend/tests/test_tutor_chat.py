@@ -0,0 +1,32 @@
+# File: backend/tests/test_tutor_chat.py
+
+import asyncio
+
+import aiohttp
+import pytest
+
+from app.services.degradation import DegradationLadder
+from app.services.llm_scheduler import LLMScheduler
+from app.services.ollama_backends import NoHealthyBackendError
+from app.services.tutor_chat import TutorChatService
+
+
+class FailingClient:
+    def __init__(self, error: Exception):
+        self.error = error
+        self.degradation = DegradationLadder(LLMScheduler(), enabled=False)
+
+    async def generate(self, payload, timeout=60, priority=None, call_site="other"):
+        raise self.error
+
+
+@pytest.mark.parametrize("error", [
+    aiohttp.ClientConnectionError("Connection refused"),
+    NoHealthyBackendError("No healthy Ollama backend available"),
+    aiohttp.ServerDisconnectedError(),
+])
+def test_unreachable_model_server_gives_no_answer(error):
+    service = TutorChatService(client=FailingClient(error))
+    session = service.create_session("Plants need water.", grade_level=3)
+    assert asyncio.run(service.ask(session, "Why do plants need water?")) is None
+    assert session.turn_count == 0
@@ -0,0 +1,98 @@
+# File: backend/tests/test_voice_stream.py
+
+import io
+
+import av
+import numpy as np
+
+from app.services.voice_stream import SAMPLE_BYTES, ContainerStreamDecoder, EnergyVAD
+
+RATE = 16000
+
+
+def pcm(*parts, rate=RATE):
+    """16-bit mono PCM from ("tone" | "silence", seconds) parts."""
+    chunks = []
+    for kind, seconds in parts:
+        t = np.arange(int(seconds * rate)) / rate
+        amplitude = 8000 if kind == "tone" else 20
+        chunks.append((amplitude * np.sin(2 * np.pi * 440 * t)).astype("<i2"))
+    return np.concatenate(chunks).tobytes()
+
+
+def encode(audio, container, codec, rate=48000, **options):
+    buffer = io.BytesIO()
+    with av.open(buffer, "w", format=container, options=options) as output:
+        stream = output.add_stream(codec, rate=rate, layout="mono")
+        samples = np.frombuffer(audio, dtype="<i2")
+        for start in range(0, len(samples), 960):
+            block = samples[start:start + 960]
+            frame = av.AudioFrame(format="s16", layout="mono", samples=len(block))
+            frame.planes[0].update(block.tobytes())
+            frame.sample_rate = rate
+            for packet in stream.encode(frame):
+                output.mux(packet)
+        for packet in stream.encode(None):
+            output.mux(packet)
+    return buffer.getvalue()
+
+
+def make_vad():
+    return EnergyVAD(frame_ms=30, threshold=500, noise_ratio=3.0, min_speech_ms=90, end_silence_ms=300)
+
+
+def offset_seconds(offset):
+    return offset / SAMPLE_BYTES / RATE
+
+
+def test_speech_start_and_endpoint_are_located():
+    vad = make_vad()
+    events = vad.feed(pcm(("silence", 0.6), ("tone", 1.0), ("silence", 0.6)))
+    assert events == ["speech_start", "endpoint"]
+    assert abs(offset_seconds(vad.speech_start) - 0.6) <= 0.03
+    assert abs(offset_seconds(vad.endpoint) - 1.6) <= 0.03
+
+
+def test_tiny_chunks_give_the_same_result():
+    audio = pcm(("silence", 0.6), ("tone", 1.0), ("silence", 0.6))
+    whole, pieces = make_vad(), make_vad()
+    whole.feed(audio)
+    events = []
+    for start in range(0, len(audio), 333):  # Odd size: frames and samples straddle chunks
+        events.extend(pieces.feed(audio[start:start + 333]))
+    assert events == ["speech_start", "endpoint"]
+    assert (pieces.speech_start, pieces.endpoint) == (whole.speech_start, whole.endpoint)
+
+
+def test_short_blips_and_pauses_do_not_trigger():
+    vad = make_vad()
+    assert vad.feed(pcm(("silence", 0.5), ("tone", 0.03), ("silence", 0.5))) == []
+    assert vad.feed(pcm(("tone", 0.5), ("silence", 0.2), ("tone", 0.5))) == ["speech_start"]
+    assert vad.endpoint is None
+
+
+def decode_in_chunks(data, chunk_size=2000):
+    decoder = ContainerStreamDecoder()
+    before_end = b"".join(decoder.feed(data[i:i + chunk_size]) for i in range(0, len(data), chunk_size))
+    return decoder, before_end, decoder.flush()
+
+
+def test_browser_containers_decode_while_they_arrive():
+    audio = pcm(("silence", 0.5), ("tone", 1.0), ("silence", 0.5), rate=48000)
+    for container, codec, options in (
+        ("webm", "libopus", {}),
+        ("ogg", "libopus", {}),
+        ("mp4", "aac", {"movflags": "frag_keyframe+empty_moov"}),
+    ):
+        decoder, before_end, rest = decode_in_chunks(encode(audio, container, codec, **options))
+        assert not decoder.failed, container
+        # Nearly all of the two seconds is available before the recording ends
+        assert offset_seconds(len(before_end)) >= 1.5, container
+        assert abs(offset_seconds(len(before_end + rest)) - 2.0) <= 0.1, container
+
+
+def test_mp4_with_the_index_at_the_end_is_reported_as_failed():
+    audio = pcm(("tone", 1.0), rate=48000)
+    decoder, before_end, rest = decode_in_chunks(encode(audio, "mp4", "aac"))
+    assert before_end == b"" and rest == b""
+    assert decoder.failed